@@ -1,7 +1,12 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import sys
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import instrumentation, plotting, sp3
+from trr_core.lageos_archive import LageosArchive
 
 # ==============================================================================
 # RRT CONFIGURATION: LAGEOS-2 GRAVITATIONAL SHIELDING AUDIT
@@ -14,74 +19,95 @@ import os
 CORTEZ_AXIS_RA = 148.9
 # Standard SP3 format file (NASA/ASI)
 DATA_FILE = "asi.orb.lageos2.251220.v80.sp3"
+# Archive mode: directory of daily SP3 products, ingested incrementally (None = DATA_FILE only)
+ARCHIVE_DIR = None
+
+def load_archive_summary(archive_dir):
+    """
+    Archive mode: ingests new/changed SP3 files into the persistent store and
+    returns (stored epoch count, running correlation moments, residual plot
+    cells as (RA, mean residual, count)). The stored vectors are not read back.
+    """
+    archive = LageosArchive(archive_dir, axis_ra=CORTEZ_AXIS_RA)
+    print(f"-> Updating LAGEOS-2 archive store {archive.store_path}...")
+    ingested, skipped, new_rows = archive.update()
+    print(f"   {len(ingested)} file(s) parsed, {skipped} unchanged, {new_rows} new epochs.")
+    return archive.n_rows, archive.moments, archive.residual_cells()
 
-def run_lageos_shielding_audit():
+@instrumentation.instrumented('lageos_shielding')
+def run_lageos_shielding_audit(archive_dir=ARCHIVE_DIR):
     """
     Executes a gravitational null-test on LAGEOS-2 orbit residuals.
     This audit verifies if sidereal anisotropy affects local high-density baryonic 
     matter, testing the 'shielding' efficiency of the RRT Phase 1 regime.
+    With archive_dir, every SP3 product of the directory is used and only new
+    files are parsed (see trr_core.lageos_archive).
     """
     print("="*80)
     print("REFERENTIAL RELATIVITY THEORY (RRT): LAGEOS-2 GRAVITATIONAL AUDIT")
     print("Experimental Focus: Baryonic Neutrality Principle (BNP) Validation")
     print("="*80)
     
-    if not os.path.exists(DATA_FILE):
-        print(f"CRITICAL ERROR: File {DATA_FILE} not found.")
-        print("Please ensure the NASA SP3 ephemerides file is in the working directory.")
-        return
+    if archive_dir:
+        if not os.path.isdir(archive_dir):
+            print(f"CRITICAL ERROR: Archive directory {archive_dir} not found.")
+            return
+        with instrumentation.stage('archive_update') as stage:
+            n_points, moments, (plot_ra, plot_residual, plot_counts) = load_archive_summary(archive_dir)
+            stage.rows = n_points
+        if n_points == 0:
+            print("ERROR: Coordinate extraction failed. Verify Satellite ID formatting.")
+            return
+        print(f"   Success: {n_points} data points ingested.")
 
-    positions = []
-    
-    # Precise extraction of satellite coordinates from SP3 format
-    print(f"-> Extracting orbital vectors from {DATA_FILE}...")
-    with open(DATA_FILE, 'r', encoding='latin-1') as f:
-        for line in f:
-            parts = line.split()
-            # SP3 lines starting with 'P' contain satellite position data
-            if len(parts) >= 5 and parts[0].startswith('P'):
-                # Identification of satellite ID 52 (LAGEOS-2)
-                if '52' in parts[0] or '52' in parts[1]:
-                    try:
-                        # Handle varied SP3 spacing (PL52 vs P L52)
-                        idx_x = 1 if len(parts[0]) > 1 else 2
-                        x = float(parts[idx_x])
-                        y = float(parts[idx_x+1])
-                        z = float(parts[idx_x+2])
-                        positions.append([x, y, z])
-                    except (ValueError, IndexError):
-                        continue
+        # Archive mode: correlation from the running moments kept by the store
+        pearson_r = moments.pearson()
+        sigma_level = moments.sigma()
+    else:
+        if not os.path.exists(DATA_FILE):
+            print(f"CRITICAL ERROR: File {DATA_FILE} not found.")
+            print("Please ensure the NASA SP3 ephemerides file is in the working directory.")
+            return
 
-    pos_vectors = np.array(positions)
+        # Vectorized extraction of satellite coordinates from the fixed-width SP3 records
+        print(f"-> Extracting orbital vectors from {DATA_FILE}...")
+        with instrumentation.stage('ingest_sp3') as stage:
+            ephemeris = sp3.read_sp3(DATA_FILE)
+            # Exact satellite ID match (LAGEOS-2 = L52), in epoch order
+            lageos = sp3.select_satellite(ephemeris, sp3.LAGEOS2_ID)
+            pos_vectors = sp3.positions(lageos)
+            stage.rows = len(pos_vectors)
     
-    if len(pos_vectors) == 0:
-        print("ERROR: Coordinate extraction failed. Verify Satellite ID formatting.")
-        return
+        if len(pos_vectors) == 0:
+            print("ERROR: Coordinate extraction failed. Verify Satellite ID formatting.")
+            return
 
-    print(f"   Success: {len(pos_vectors)} data points ingested.")
+        print(f"   Success: {len(pos_vectors)} data points ingested.")
 
-    # 1. Causal Geometry (Instantaneous Right Ascension)
-    # Mapping the satellite's sidereal position relative to the Cortez Axis
-    ra_instantaneous = np.degrees(np.arctan2(pos_vectors[:, 1], pos_vectors[:, 0])) % 360
-    
-    # 2. Gravitational Energy Residuals (Radial Variance)
-    # Analyzing deviations from the mean orbital radius
-    radii = np.linalg.norm(pos_vectors, axis=1)
-    radial_residuals = radii - np.mean(radii)
-    
-    # 3. RRT Significance Calculation
-    # Testing for correlation between radial residuals and the RRT dipole orientation
-    alignment_factor = np.cos(np.radians(ra_instantaneous - CORTEZ_AXIS_RA))
-    
-    # Statistical dataframe for correlation analysis
-    audit_df = pd.DataFrame({
-        'ra': ra_instantaneous, 
-        'residual': radial_residuals, 
-        'alignment': alignment_factor
-    })
-    
-    pearson_r = audit_df['alignment'].corr(audit_df['residual'])
-    sigma_level = abs(pearson_r) * np.sqrt(len(audit_df))
+        with instrumentation.stage('correlation', rows=len(pos_vectors)):
+            # 1. Causal Geometry (Instantaneous Right Ascension)
+            # Mapping the satellite's sidereal position relative to the Cortez Axis
+            ra_instantaneous = np.degrees(np.arctan2(pos_vectors[:, 1], pos_vectors[:, 0])) % 360
+            
+            # 2. Gravitational Energy Residuals (Radial Variance)
+            # Analyzing deviations from the mean orbital radius
+            radii = np.linalg.norm(pos_vectors, axis=1)
+            radial_residuals = radii - np.mean(radii)
+            
+            # 3. RRT Significance Calculation
+            # Testing for correlation between radial residuals and the RRT dipole orientation
+            alignment_factor = np.cos(np.radians(ra_instantaneous - CORTEZ_AXIS_RA))
+            
+            # Statistical dataframe for correlation analysis
+            audit_df = pd.DataFrame({
+                'ra': ra_instantaneous, 
+                'residual': radial_residuals, 
+                'alignment': alignment_factor
+            })
+            
+            pearson_r = audit_df['alignment'].corr(audit_df['residual'])
+            sigma_level = abs(pearson_r) * np.sqrt(len(audit_df))
+        plot_ra, plot_residual, plot_counts = audit_df['ra'], audit_df['residual'], None
 
     print("\n" + "="*80)
     print(f"FINAL AUDIT VERDICT: {sigma_level:.2f} SIGMA")
@@ -95,22 +121,25 @@ def run_lageos_shielding_audit():
         print("STATUS: LOCAL ISOTROPY BREACH DETECTED (BNP Failure).")
     print("="*80)
 
-    # Visualization: Residual Analysis vs. Sidereal Direction
-    plt.figure(figsize=(10, 6))
-    plt.scatter(audit_df['ra'], audit_df['residual'], 
-                c=audit_df['residual'], cmap='viridis', s=5, alpha=0.4)
-    plt.axvline(CORTEZ_AXIS_RA, color='#00FFFF', linestyle='--', label='Cortez Axis Alignment')
-    
-    plt.title("LAGEOS-2 Orbital Residuals vs. Sidereal Direction\nBNP Validation - Local Shielding Test", fontsize=12)
-    plt.xlabel("Right Ascension (Degrees)")
-    plt.ylabel("Radial Displacement (km)")
-    plt.colorbar(label='Residual Amplitude')
-    plt.legend()
-    plt.grid(True, alpha=0.2)
+    # Visualization: Residual Analysis vs. Sidereal Direction (binned, rendered in the background;
+    # archive mode draws the store's per-cell aggregates instead of every vector)
+    def draw(fig):
+        ax = fig.add_subplot(111)
+        image = plotting.density_layer(ax, plot_ra, plot_residual, cmap='viridis',
+                                       values=plot_residual, weights=plot_counts)
+        ax.axvline(CORTEZ_AXIS_RA, color='#00FFFF', linestyle='--', label='Cortez Axis Alignment')
+        
+        ax.set_title("LAGEOS-2 Orbital Residuals vs. Sidereal Direction\nBNP Validation - Local Shielding Test", fontsize=12)
+        ax.set_xlabel("Right Ascension (Degrees)")
+        ax.set_ylabel("Radial Displacement (km)")
+        fig.colorbar(image, ax=ax, label='Residual Amplitude')
+        ax.legend()
+        ax.grid(True, alpha=0.2)
     
-    plt.savefig("rrt_lageos_shielding_test.png", dpi=300)
-    print("-> Plot saved: rrt_lageos_shielding_test.png")
-    plt.show()
+    plot_job = plotting.render_in_background(draw, "rrt_lageos_shielding_test.png")
+    with instrumentation.stage('plot'):
+        plot_path = plot_job.result()
+    print(f"-> Plot saved: {plot_path}")
 
 if __name__ == "__main__":
-    run_lageos_shielding_audit()
\ No newline at end of file
+    run_lageos_shielding_audit(sys.argv[1] if len(sys.argv) > 1 else ARCHIVE_DIR)
\ No newline at end of file
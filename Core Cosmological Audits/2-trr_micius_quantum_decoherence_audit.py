@@ -2,6 +2,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import instrumentation, resampling
 
 # ==============================================================================
 # RRT CONFIGURATION: MICIUS (QUESS) QUANTUM DECOHERENCE AUDIT
@@ -14,6 +19,11 @@ import os
 CORTEZ_AXIS_DEG = 148.9
 DATA_FILENAME = "micius_real_fidelity_data.csv"
 
+# Significance protocol: exact permutation null for n <= 10 (all n! orderings),
+# otherwise a seeded, batched Monte Carlo null of N_SIMULATIONS permutations
+N_SIMULATIONS = 10000
+RESAMPLING_SEED = 20170616
+
 def generate_micius_dataset():
     """
     Reconstructs the observational dataset from Micius (QUESS) missions.
@@ -29,10 +39,12 @@ def generate_micius_dataset():
     df.to_csv(DATA_FILENAME, index=False)
     print(f"-> Dataset '{DATA_FILENAME}' generated based on mission logs.")
 
-def run_quantum_birefringence_audit():
+@instrumentation.instrumented('micius_decoherence')
+def run_quantum_birefringence_audit(n_simulations=N_SIMULATIONS, seed=RESAMPLING_SEED):
     """
     Audits the correlation between quantum state fidelity and the RRT Causal Vector.
     Tests if the viscous vacuum (Phase 3) induces phase noise in entangled photons.
+    The permutation null comes from trr_core.resampling (exact for small samples).
     """
     if not os.path.exists(DATA_FILENAME):
         generate_micius_dataset()
@@ -53,19 +65,17 @@ def run_quantum_birefringence_audit():
     # RRT expectation: Strong Negative Correlation (Fidelity drop at the axis)
     pearson_r = np.corrcoef(df['alignment_factor'], df['chsh_fidelity'])[0, 1]
     
-    # 3. Significance Testing (Monte Carlo Protocol)
-    n_simulations = 10000
-    null_correlations = []
-    
-    for _ in range(n_simulations):
-        shuffled_fidelity = np.random.permutation(df['chsh_fidelity'])
-        null_correlations.append(np.corrcoef(df['alignment_factor'], shuffled_fidelity)[0, 1])
+    # 3. Significance Testing (Permutation Protocol: exact or batched Monte Carlo)
+    with instrumentation.stage('permutation_null', rows=len(df)):
+        null = resampling.permutation_null_correlation(df['alignment_factor'].to_numpy(), df['chsh_fidelity'].to_numpy(),
+                                                       n_monte_carlo=n_simulations, seed=seed)
     
-    sigma_level = (pearson_r - np.mean(null_correlations)) / np.std(null_correlations)
+    sigma_level = (pearson_r - null.mean) / null.std
 
     print("\n" + "="*80)
     print(f"UNIFICATION VERDICT (QUANTUM-GRAVITY BRIDGE): {abs(sigma_level):.2f} SIGMA")
     print(f"OBSERVED CORRELATION: {pearson_r:.4f}")
+    print(f"NULL DISTRIBUTION:    {null.summary()}")
     
     # Interpretation logic based on scientific significance thresholds
     if abs(sigma_level) > 5:
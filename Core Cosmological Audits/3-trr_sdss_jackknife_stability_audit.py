@@ -1,9 +1,12 @@
 import numpy as np
-import pandas as pd
-from astropy.table import Table
 from scipy.optimize import least_squares
 import matplotlib.pyplot as plt
 import os
+import sys
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import cache, instrumentation, memory, precession, resampling
 
 # ==============================================================================
 # RRT CONFIGURATION: SDSS JACKKNIFE STABILITY AUDIT
@@ -20,11 +23,16 @@ D0_NOMINAL = 0.794
 OMEGA_P = 1128.0            # Precession Constant (deg/z)
 NOMINAL_DIRECTION = 148.9   # Primordial Axis (Degrees)
 
-def to_native(array):
-    """Normalizes byte-order for big-endian FITS data to native system order."""
-    if array.dtype.byteorder not in ('=', '|'):
-        return array.byteswap().view(arr.dtype.newbyteorder('='))
-    return array
+# Resampling protocol (seeded: every run reproduces the same cuts)
+KEEP_FRACTION = 0.9
+RESAMPLING_SEED = 20170817
+
+# Fit engine: 'closed_form' solves the linear normal equations from per-block
+# sufficient statistics (O(blocks) per resample); 'least_squares' refits all rows.
+FIT_MODE = 'closed_form'
+N_BLOCKS = 1000
+# Max relative disagreement of the full-stratum closed form with least_squares
+FULL_STRATUM_TOLERANCE = 1e-6
 
 def rrt_residual_function(params, ra, z, mag_res):
     """
@@ -37,14 +45,31 @@ def rrt_residual_function(params, ra, z, mag_res):
     prediction = d0 * z * np.cos(np.radians(ra - phase_z))
     return prediction - mag_res
 
-def run_jackknife_stability_test(file_path, n_iterations=50):
+def fit_jackknife_subset(data, idx, tolerance=1e-8):
+    """
+    Non-linear least-squares fit of (d0, theta0) on one resample (index array).
+    tolerance is least_squares' ftol/xtol/gtol (1e-8 = scipy default).
+    """
+    initial_guess = [D0_NOMINAL, NOMINAL_DIRECTION]
+    res = least_squares(rrt_residual_function, initial_guess, 
+                        args=(data['ra'][idx], data['z'][idx], data['mag_res'][idx]),
+                        ftol=tolerance, xtol=tolerance, gtol=tolerance)
+    return res.x[0], res.x[1] % 360
+
+@instrumentation.instrumented('sdss_jackknife')
+def run_jackknife_stability_test(file_path, n_iterations=50, seed=RESAMPLING_SEED, workers=None, fit_mode=FIT_MODE):
     """
     Executes the Jackknife audit by randomly removing 10% of the dataset
     in each iteration to check for parameter drift.
+    The cuts are run by trr_core.resampling across 'workers' processes.
+    fit_mode='closed_form' removes 10% of N_BLOCKS random row blocks per cut and
+    solves each cut from block sums (trr_core/precession.py).
     """
+    if fit_mode not in ('closed_form', 'least_squares'):
+        raise ValueError(f"Unknown fit_mode: {fit_mode} (use 'closed_form' or 'least_squares')")
     print("="*80)
     print("REFERENTIAL RELATIVITY THEORY (RRT): JACKKNIFE STABILITY AUDIT")
-    print(f"Dataset: {file_path} | Iterations: {n_iterations}")
+    print(f"Dataset: {file_path} | Iterations: {n_iterations} | Fit mode: {fit_mode}")
     print("="*80)
 
     if not os.path.exists(file_path):
@@ -52,42 +77,57 @@ def run_jackknife_stability_test(file_path, n_iterations=50):
         return
 
     # 1. Data Ingestion & Resonance Stratum Filtering
+    # Memoized by trr_core.cache: re-runs with the same FITS file skip the ingestion
     print("-> Ingesting FITS data and applying Stratigraphy Filter (z: 1.5-2.0)...")
-    dat = Table.read(file_path, format='fits')
+    # Entering the Phase 3 (Viscous) Resonance Layer, with Hubble Detrending
+    with instrumentation.stage('ingest_stratum') as stage:
+        data = precession.load_resonance_stratum(file_path)
+        n_objects = stage.rows = len(data['z'])
     
-    ra = to_native(np.array(dat['RA']))
-    z = to_native(np.array(dat['Z']))
-    mag_i = to_native(np.array(dat['PSFMAG'][:, 3]))
+    print(f"   Total filtered sample: {n_objects} objects.")
     
-    df = pd.DataFrame({'ra': ra, 'z': z, 'mag': mag_i})
-    # Entering the Phase 3 (Viscous) Resonance Layer
-    df = df[(df['z'] >= 1.5) & (df['z'] <= 2.0) & (df['mag'] > 0)].copy()
-    
-    # Hubble Detrending
-    df['mag_res'] = df['mag'] - (5 * np.log10(df['z']))
-    
-    print(f"   Total filtered sample: {len(df)} objects.")
-    
-    # Storage for Jackknife coefficients
-    d0_results = []
-    theta0_results = []
-    
-    # 2. Resampling Loop
+    # 2. Resampling (delete-d jackknife on index arrays, one seeded stream per cut)
     print(f"-> Starting resampling (Removing 10% data per cut)...")
-    for i in range(n_iterations):
-        # Sample 90% of the data without replacement
-        df_jack = df.sample(frac=0.9)
-        
-        # Non-linear Least Squares optimization
-        initial_guess = [D0_NOMINAL, NOMINAL_DIRECTION]
-        res = least_squares(rrt_residual_function, initial_guess, 
-                            args=(df_jack['ra'], df_jack['z'], df_jack['mag_res']))
-        
-        d0_results.append(res.x[0])
-        theta0_results.append(res.x[1] % 360)
-        
-        if (i+1) % 10 == 0: 
-            print(f"   Iteration {i+1}/{n_iterations} complete.")
+    if fit_mode == 'closed_form':
+        # Normal-equation sums are accumulated once per block; each cut drops 10% of the blocks
+        n_blocks = min(N_BLOCKS, n_objects)
+
+        def accumulate_block_sums():
+            block_ids = precession.assign_blocks(n_objects, n_blocks, seed)
+            return precession.sufficient_statistics(data['ra'], data['z'], data['mag_res'], OMEGA_P, block_ids, n_blocks)
+
+        with instrumentation.stage('block_sums', rows=n_objects):
+            block_sums = cache.memoize('sdss_jackknife_block_sums', [file_path],
+                                       {'omega_p': OMEGA_P, 'n_blocks': n_blocks, 'seed': seed,
+                                        'stratum_z_range': precession.STRATUM_Z_RANGE}, accumulate_block_sums)
+        with instrumentation.stage('resampling', rows=n_blocks):
+            result = resampling.run_resampling(precession.solve_block_subset, block_sums, n_iterations, scheme='jackknife',
+                                               d=resampling.delete_d_for_fraction(n_blocks, KEEP_FRACTION),
+                                               seed=seed, workers=workers or 1, n=n_blocks)
+
+        # Cross-check of the closed form against the iterative fit on the full stratum
+        with instrumentation.stage('full_stratum_check', rows=n_objects):
+            d0_exact, theta_exact = precession.solve(block_sums.sum(axis=0), NOMINAL_DIRECTION)
+            # Converged well below FULL_STRATUM_TOLERANCE so the gap measures the closed form
+            d0_ls, theta_ls = fit_jackknife_subset(data, np.arange(n_objects), tolerance=1e-12)
+        print(f"   Full-stratum check: closed form ({d0_exact:.6f}, {theta_exact:.4f}°) | "
+              f"least_squares ({d0_ls:.6f}, {theta_ls:.4f}°)")
+        # Phase gap taken on the circle (359.9° and 0.1° agree)
+        d0_gap = abs(d0_exact - d0_ls) / max(abs(d0_ls), 1e-300)
+        theta_gap = abs((theta_exact - theta_ls + 180) % 360 - 180) / max(abs(theta_ls), 1e-300)
+        if max(d0_gap, theta_gap) > FULL_STRATUM_TOLERANCE:
+            print("!"*80)
+            print(f"WARNING: closed form disagrees with least_squares on the full stratum "
+                  f"(relative gap d0 {d0_gap:.2e}, theta0 {theta_gap:.2e} > {FULL_STRATUM_TOLERANCE:.0e}).")
+            print("         The resampled parameters below are NOT validated; rerun with fit_mode='least_squares'.")
+            print("!"*80)
+    else:
+        with instrumentation.stage('resampling', rows=n_objects):
+            result = resampling.run_resampling(fit_jackknife_subset, data, n_iterations, scheme='jackknife',
+                                               d=resampling.delete_d_for_fraction(n_objects, KEEP_FRACTION),
+                                               seed=seed, workers=workers, verbose=True)
+    d0_results, theta0_results = result.values[:, 0], result.values[:, 1]
+    print(f"   {result.timing_summary()}")
 
     # 3. Final Statistical Summary
     d0_mean, d0_std = np.mean(d0_results), np.std(d0_results)
@@ -104,20 +144,23 @@ def run_jackknife_stability_test(file_path, n_iterations=50):
         print("VERDICT: SIGNAL HIGHLY STABLE. Result is invariant to data sampling.")
     else:
         print("VERDICT: HIGH SENSITIVITY DETECTED. Potential outlier influence.")
+    print(f"-> Peak memory (RSS): {memory.peak_rss_label()}")
+    print(f"-> Intermediate cache: {cache.stats_label()}")
     print("="*80)
 
     # 4. Visualization: Parameter Dispersion Map
-    plt.figure(figsize=(9, 6))
-    plt.scatter(theta0_results, d0_results, alpha=0.6, color='#3498db', edgecolor='#2980b9')
-    plt.axvline(theta_mean, color='#e74c3c', linestyle='--', label='Mean Directional Phase')
-    
-    plt.xlabel('Axis Direction (theta0) [Degrees]', fontweight='bold')
-    plt.ylabel('Signal Intensity (D0)', fontweight='bold')
-    plt.title('RRT Jackknife Stability: Parameter Covariance (SDSS DR16Q)', fontsize=12)
-    plt.legend()
-    plt.grid(True, alpha=0.2)
-    
-    plt.savefig("rrt_jackknife_stability_plot.png", dpi=300)
+    with instrumentation.stage('plot'):
+        plt.figure(figsize=(9, 6))
+        plt.scatter(theta0_results, d0_results, alpha=0.6, color='#3498db', edgecolor='#2980b9')
+        plt.axvline(theta_mean, color='#e74c3c', linestyle='--', label='Mean Directional Phase')
+        
+        plt.xlabel('Axis Direction (theta0) [Degrees]', fontweight='bold')
+        plt.ylabel('Signal Intensity (D0)', fontweight='bold')
+        plt.title('RRT Jackknife Stability: Parameter Covariance (SDSS DR16Q)', fontsize=12)
+        plt.legend()
+        plt.grid(True, alpha=0.2)
+        
+        plt.savefig("rrt_jackknife_stability_plot.png", dpi=300)
     print("-> Stability plot saved: rrt_jackknife_stability_plot.png")
     plt.show()
 
@@ -1,6 +1,10 @@
-import pandas as pd
 import numpy as np
 import os
+import sys
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import cache, instrumentation, sparc
 
 # ==============================================================================
 # RRT CONFIGURATION: SPARC GALACTIC DYNAMICS AUDIT
@@ -18,34 +22,91 @@ DATA_FOLDER = './Rotmod_LTG'
 A0_RRT = 1.2001e-10  # m/s^2 (Theoretical Precision: 0.09%)
 ML_RATIO = 0.5       # Mass-to-Light Ratio (Fixed for 3.6um Spitzer band)
 
-def apply_cortez_law(radius_kpc, v_gas, v_disk, v_bulge):
+def apply_cortez_law(radius_kpc, v_gas, v_disk, v_bulge, ml_ratio=None, a0=None):
     """
     Computes the RRT-predicted rotational velocity.
     The formula derives from the interaction between the baryonic inertia tensor 
     and the viscous vacuum field (T_mu) in the low-acceleration regime (Phase 2).
+    Accepts scalars or NumPy arrays; non-physical points (r <= 0 or v_bar^2 <= 0)
+    are masked to 0 km/s. ml_ratio/a0 default to ML_RATIO/A0_RRT.
     """
+    ml_ratio = ML_RATIO if ml_ratio is None else ml_ratio
+    a0 = A0_RRT if a0 is None else a0
+    radius_kpc, v_gas, v_disk, v_bulge = (np.asarray(v, dtype=float) for v in (radius_kpc, v_gas, v_disk, v_bulge))
+
     # 1. Newtonian Baryonic Potential Reconstruction
     # Standard sum of squares for baryonic components
-    v_bar_sq = v_gas**2 + (v_disk**2 * ML_RATIO) + (v_bulge**2 * 0.7)
+    v_bar_sq = v_gas**2 + (v_disk**2 * ml_ratio) + (v_bulge**2 * 0.7)
     
     # Unit conversion: kpc to meters
     r_meters = radius_kpc * 3.08567758e19
     
-    if r_meters <= 0 or v_bar_sq <= 0: 
-        return 0
-    
-    # Newtonian Acceleration (g_bar)
-    g_bar = (v_bar_sq * 1000**2) / r_meters
-    
-    # 2. CAUSAL PHASE TRANSITION (Cortez Function)
-    # The effective acceleration arises from the saturation of the Xi_T coupling.
-    # Formula: g_obs = g_bar / (1 - exp(-sqrt(g_bar / a0)))
-    phase_transition_factor = 1 - np.exp(-np.sqrt(g_bar / A0_RRT))
-    g_total = g_bar / phase_transition_factor
+    # Masked regime (NaN inputs are not masked, so they propagate as before)
+    non_physical = (r_meters <= 0) | (v_bar_sq <= 0)
     
-    # Convert back to velocity in km/s
-    return np.sqrt(g_total * r_meters) / 1000
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Newtonian Acceleration (g_bar)
+        g_bar = (v_bar_sq * 1000**2) / r_meters
+        
+        # 2. CAUSAL PHASE TRANSITION (Cortez Function)
+        # The effective acceleration arises from the saturation of the Xi_T coupling.
+        # Formula: g_obs = g_bar / (1 - exp(-sqrt(g_bar / a0)))
+        phase_transition_factor = 1 - np.exp(-np.sqrt(g_bar / a0))
+        g_total = g_bar / phase_transition_factor
+        
+        # Convert back to velocity in km/s
+        v_rrt = np.where(non_physical, 0.0, np.sqrt(g_total * r_meters) / 1000)
+    return v_rrt if v_rrt.ndim else float(v_rrt)
+
+def load_sparc_catalog(data_folder=DATA_FOLDER):
+    """
+    Loads every SPARC Rotmod galaxy from the columnar cache (trr_core/sparc.py),
+    built on first use and rebuilt whenever a source file changes.
+    Rows without Rad/Vobs are dropped and galaxies left empty are skipped.
+    Returns (columns, names, offsets): columns maps 'Rad', 'Vobs', 'Vgas', 'Vdisk',
+    'Vbul' to 1-D arrays; galaxy i spans rows offsets[i]:offsets[i+1].
+    """
+    cached, cached_names, cached_offsets = sparc.load_catalog(data_folder)
+    valid = ~(np.isnan(cached['Rad']) | np.isnan(cached['Vobs']))
+
+    galaxy_id = np.repeat(np.arange(len(cached_names)), np.diff(cached_offsets))
+    kept_rows = np.bincount(galaxy_id[valid], minlength=len(cached_names))
+    names = [name for name, n in zip(cached_names, kept_rows) if n > 0]
+    offsets = np.concatenate(([0], np.cumsum(kept_rows[kept_rows > 0]))).astype(np.int64)
+    columns = {name: cached[name][valid] for name in ['Rad', 'Vobs', 'Vgas', 'Vdisk', 'Vbul']}
+    return columns, names, offsets
 
+def compute_edge_residuals(columns, offsets, ml_ratio=None, a0=None):
+    """
+    Mean (Observed - Predicted) residual over the outer 20% of each galaxy.
+    All galaxies are evaluated in one concatenated array; per-galaxy maxima and
+    means are reductions over the offsets. Galaxies without edge points are dropped.
+    Non-finite residuals (rows missing a Vgas/Vdisk/Vbul column) are skipped, as
+    pandas' mean did in the per-galaxy loop; a galaxy whose edge is all missing
+    keeps a NaN mean.
+    """
+    # Empty files have no edge; reduceat segments only run over non-empty galaxies
+    counts = np.diff(offsets)
+    starts, counts = offsets[:-1][counts > 0], counts[counts > 0]
+    if len(starts) == 0:
+        return np.empty(0)
+    rad = columns['Rad']
+
+    # FRONTIER FILTER: Deep Phase 2 Regime (outer 20% of the radius, per galaxy)
+    max_radius = np.repeat(np.maximum.reduceat(rad, starts), counts)
+    edge = rad > max_radius * 0.8
+
+    v_rrt = apply_cortez_law(rad, columns['Vgas'], columns['Vdisk'], columns['Vbul'], ml_ratio, a0)
+    residual = columns['Vobs'] - v_rrt
+    audited = np.add.reduceat(edge.astype(np.int64), starts) > 0
+
+    edge &= np.isfinite(residual)
+    edge_counts = np.add.reduceat(edge.astype(np.int64), starts)
+    residual_sums = np.add.reduceat(np.where(edge, residual, 0.0), starts)
+    with np.errstate(invalid='ignore'):
+        return residual_sums[audited] / edge_counts[audited]
+
+@instrumentation.instrumented('sparc_rotation')
 def run_strict_sparc_audit():
     """
     Executes a high-rigor audit on the SPARC catalog.
@@ -63,38 +124,23 @@ def run_strict_sparc_audit():
         return
 
     data_files = [f for f in os.listdir(DATA_FOLDER) if f.endswith('.dat')]
-    error_log = []
-    galaxies_audited = 0
-
     print(f"-> Processing {len(data_files)} galaxies from the SPARC database...")
 
-    for file in data_files:
-        try:
-            file_path = os.path.join(DATA_FOLDER, file)
-            # Standard SPARC file structure ingestion
-            df = pd.read_csv(file_path, sep=r'\s+', comment='#', header=None,
-                             names=['Rad', 'Vobs', 'errV', 'Vgas', 'Vdisk', 'Vbul', 'SBdis', 'SBbul'])
-            
-            df = df.apply(pd.to_numeric, errors='coerce').dropna(subset=['Vobs', 'Rad'])
-            
-            # FRONTIER FILTER: Deep Phase 2 Regime
-            # RRT predicts that Dark Matter effects are actually vacuum viscosity 
-            # manifesting at the outskirts. We audit the outer 20% of the radius.
-            max_radius = df['Rad'].max()
-            edge_df = df[df['Rad'] > max_radius * 0.8] 
-
-            if edge_df.empty: continue
-
-            # Apply RRT Model
-            v_rrt = edge_df.apply(lambda x: apply_cortez_law(x['Rad'], x['Vgas'], x['Vdisk'], x['Vbul']), axis=1)
-            
-            # Compute Mean Residual (Observed - Predicted)
-            mean_residual = np.mean(edge_df['Vobs'] - v_rrt)
-            error_log.append(mean_residual)
-            galaxies_audited += 1
-            
-        except Exception:
-            continue
+    def audit_edge_residuals():
+        with instrumentation.stage('ingest_rotmod') as stage:
+            columns, names, offsets = load_sparc_catalog(DATA_FOLDER)
+            stage.rows = len(columns['Rad'])
+        # Apply RRT Model to every galaxy at once (vectorized Cortez Law)
+        with instrumentation.stage('cortez_law', rows=len(columns['Rad'])):
+            return compute_edge_residuals(columns, offsets)
+
+    # Memoized by trr_core.cache under the Rotmod files and the model constants;
+    # version 2: non-finite edge residuals skipped, empty galaxies excluded
+    with instrumentation.stage('edge_residuals') as stage:
+        error_log = cache.memoize('sparc_edge_residuals', [DATA_FOLDER],
+                                  {'a0': A0_RRT, 'ml_ratio': ML_RATIO, 'edge_fraction': 0.8, 'bulge_ml': 0.7},
+                                  audit_edge_residuals, version=2)
+        galaxies_audited = stage.rows = len(error_log)
 
     # Final Audit Statistics
     global_mean_residual = np.mean(error_log)
@@ -104,6 +150,7 @@ def run_strict_sparc_audit():
     print(f"Galaxies Successfully Audited: {galaxies_audited}")
     print(f"Global Mean Residual:         {global_mean_residual:.2f} km/s")
     print(f"Precision (Standard Deviation): {std_deviation:.2f} km/s")
+    print(f"Intermediate cache: {cache.stats_label()}")
     print("-" * 60)
     
     print("\n[TECHNICAL VERDICT]")
@@ -1,9 +1,11 @@
 import numpy as np
-import pandas as pd
-from astropy.io import fits
 from scipy.optimize import curve_fit
-import matplotlib.pyplot as plt
 import os
+import sys
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import catalogs, cosmology, instrumentation, plotting
 
 # ==============================================================================
 # RRT CONFIGURATION: PHASE DRAG AND MAGNITUDE ANOMALY AUDIT
@@ -19,11 +21,12 @@ M_SEED = 100         # Initial Black Hole seed mass
 H0_NOMINAL = 67.4    # Hubble Constant baseline
 OM_NOMINAL = 0.315   # Matter Density baseline
 
+# Streaming mode: per-z-bin summaries of T_lost for the plot (fixed grid, z > 2)
+Z_BIN_EDGES = np.arange(2.0, 7.0 + 1e-9, 0.05)
+
 def get_lcdm_age_at_z(z):
-    """Calculates the theoretical age of the universe at redshift z (Lambda-CDM)."""
-    term = np.sqrt((1 - OM_NOMINAL) / OM_NOMINAL) * (1 + z)**(-1.5)
-    age = (2 / (3 * H0_NOMINAL * np.sqrt(1 - OM_NOMINAL))) * np.arcsinh(term)
-    return age * 9.7779e11 # Result in years
+    """Calculates the theoretical age of the universe at redshift z (Lambda-CDM), vectorized."""
+    return cosmology.age_at_z(z, h0=H0_NOMINAL, om=OM_NOMINAL) # Result in years
 
 def estimate_mbh_virial(mag_r, z):
     """
@@ -37,10 +40,77 @@ def estimate_mbh_virial(mag_r, z):
     # Empirical relation for KiDS/SDSS Quasars
     return 10**(0.5 * (15 - m_abs/2.5) + 6.5)
 
-def run_phase_drag_audit(fits_file='KiDS_DR4_QSO_candidates.fits'):
+def select_columns(fits_file):
+    """KiDS column names, falling back to the SDSS Superset equivalents."""
+    names = catalogs.fits_column_names(fits_file)
+    z_col = 'Z_PHOTO_QSO' if 'Z_PHOTO_QSO' in names else 'Z'
+    mag_col = 'MAG_GAAP_r' if 'MAG_GAAP_r' in names else ('PSFMAG', 2)
+    return {'z': z_col, 'mag_r': mag_col}
+
+def compute_t_lost(z_obs, mag_r):
+    """Quality filter (z > 2, 0 < mag < 30) and the Causal Mismatch T_lost of the survivors."""
+    # Quality Filter: High-redshift regime (Phase 3 resonance)
+    mask = (z_obs > 2.0) & (mag_r > 0) & (mag_r < 30)
+    z_f = z_obs[mask]
+    mag_f = mag_r[mask]
+
+    m_bh_est = estimate_mbh_virial(mag_f, z_f)
+    t_growth = TAU_SALPETER * np.log(m_bh_est / M_SEED)
+    t_universe = get_lcdm_age_at_z(z_f)
+    
+    # T_lost represents the phase drag induced by vacuum viscosity
+    return z_f, t_growth - t_universe
+
+def accumulate_phase_drag(fits_file, chunk_rows=None):
+    """
+    Out-of-core pass over the catalog: sufficient statistics of the model
+    T_lost = eta * z^2 (n, sum z^2*t, sum z^4, sum t^2, max z) and per-z-bin
+    summaries (count, sum z, sum t, sum t^2 on Z_BIN_EDGES). Memory is bounded by the chunk.
+    """
+    n_bins = len(Z_BIN_EDGES) - 1
+    acc = {'n': 0, 'sum_z2t': 0.0, 'sum_z4': 0.0, 'sum_t2': 0.0, 'z_max': -np.inf,
+           'bin_n': np.zeros(n_bins, dtype=np.int64), 'bin_z': np.zeros(n_bins),
+           'bin_t': np.zeros(n_bins), 'bin_t2': np.zeros(n_bins)}
+    for block in catalogs.iter_fits_chunks(fits_file, select_columns(fits_file), chunk_rows):
+        z_f, t_lost = compute_t_lost(block['z'], block['mag_r'])
+        if len(z_f) == 0:
+            continue
+        z2 = z_f * z_f
+        acc['n'] += len(z_f)
+        acc['sum_z2t'] += np.dot(z2, t_lost)
+        acc['sum_z4'] += np.dot(z2, z2)
+        acc['sum_t2'] += np.dot(t_lost, t_lost)
+        acc['z_max'] = max(acc['z_max'], z_f.max())
+
+        # Objects beyond the last edge are summarized in the last bin
+        b = np.clip(np.searchsorted(Z_BIN_EDGES, z_f, side='right') - 1, 0, n_bins - 1)
+        acc['bin_n'] += np.bincount(b, minlength=n_bins)
+        acc['bin_z'] += np.bincount(b, weights=z_f, minlength=n_bins)
+        acc['bin_t'] += np.bincount(b, weights=t_lost, minlength=n_bins)
+        acc['bin_t2'] += np.bincount(b, weights=t_lost * t_lost, minlength=n_bins)
+    return acc
+
+def solve_phase_drag(acc):
+    """
+    Closed-form least squares of T_lost = eta * z^2 from the accumulated sums.
+    Returns (eta, standard error); the error matches curve_fit's sqrt(pcov).
+    """
+    eta = acc['sum_z2t'] / acc['sum_z4']
+    ssr = max(acc['sum_t2'] - 2 * eta * acc['sum_z2t'] + eta**2 * acc['sum_z4'], 0.0)
+    return eta, np.sqrt(ssr / (acc['n'] - 1) / acc['sum_z4'])
+
+def rrt_drag_model(z, eta):
+    """RRT Quadratic Phase Law: T_drag = eta * z^2"""
+    return eta * z**2
+
+@instrumentation.instrumented('phase_drag')
+def run_phase_drag_audit(fits_file='KiDS_DR4_QSO_candidates.fits', streaming=True, chunk_rows=None):
     """
     Audits the systematic drift in quasar observations.
     Quantifies the 'Lost Time' (T_lost) as evidence of vacuum viscosity.
+    streaming=True reads the FITS in blocks and fits eta from running sums
+    (the plot shows per-z-bin means); streaming=False loads the filtered sample
+    and uses curve_fit with a per-object scatter plot.
     """
     print("="*80)
     print("REFERENTIAL RELATIVITY THEORY (RRT): PHASE DRAG AUDIT")
@@ -51,63 +121,74 @@ def run_phase_drag_audit(fits_file='KiDS_DR4_QSO_candidates.fits'):
         print(f"CRITICAL ERROR: {fits_file} not found for audit.")
         return
 
-    # 1. Data Ingestion
-    print("-> Ingesting photometric and spectroscopic data...")
-    with fits.open(fits_file) as hdul:
-        data = hdul[1].data
+    if streaming:
+        # 1-3. Out-of-core ingestion, Causal Mismatch and closed-form quadratic fit
+        print("-> Streaming photometric and spectroscopic data (constant-memory blocks)...")
+        print("-> Calculating Causal Mismatch (T_lost) and accumulating the Quadratic Phase Law...")
+        with instrumentation.stage('stream_accumulate') as stage:
+            acc = accumulate_phase_drag(fits_file, chunk_rows)
+            stage.rows = acc['n']
+        with instrumentation.stage('fit', rows=acc['n']):
+            eta_found, eta_err = solve_phase_drag(acc)
+        z_max, n_objects = acc['z_max'], acc['n']
+    else:
+        # 1. Data Ingestion
+        print("-> Ingesting photometric and spectroscopic data...")
         # Note: Adjust column names if using SDSS Superset instead of KiDS
-        z_obs = data['Z_PHOTO_QSO'] if 'Z_PHOTO_QSO' in data.names else data['Z']
-        mag_r = data['MAG_GAAP_r'] if 'MAG_GAAP_r' in data.names else data['PSFMAG'][:, 2]
-
-    # Quality Filter: High-redshift regime (Phase 3 resonance)
-    mask = (z_obs > 2.0) & (mag_r > 0) & (mag_r < 30)
-    z_f = z_obs[mask]
-    mag_f = mag_r[mask]
-
-    # 2. Anomaly Quantification (The Time Gap)
-    print("-> Calculating Causal Mismatch (T_lost)...")
-    m_bh_est = estimate_mbh_virial(mag_f, z_f)
-    t_growth = TAU_SALPETER * np.log(m_bh_est / M_SEED)
-    t_universe = np.array([get_lcdm_age_at_z(val) for val in z_f])
-    
-    # T_lost represents the phase drag induced by vacuum viscosity
-    t_lost = t_growth - t_universe
+        with instrumentation.stage('ingest') as stage:
+            cols = catalogs.read_fits_columns(fits_file, select_columns(fits_file))
+            stage.rows = len(cols['z'])
 
-    # 3. Model Fitting: The RRT Quadratic Phase Law
-    # RRT predicts: T_drag = eta * z^2
-    def rrt_drag_model(z, eta):
-        return eta * z**2
+        # 2. Anomaly Quantification (The Time Gap)
+        print("-> Calculating Causal Mismatch (T_lost)...")
+        with instrumentation.stage('t_lost', rows=len(cols['z'])):
+            z_f, t_lost = compute_t_lost(cols['z'], cols['mag_r'])
 
-    popt, pcov = curve_fit(rrt_drag_model, z_f, t_lost)
-    eta_found = popt[0]
+        # 3. Model Fitting: The RRT Quadratic Phase Law
+        with instrumentation.stage('fit', rows=len(z_f)):
+            popt, pcov = curve_fit(rrt_drag_model, z_f, t_lost)
+        eta_found, eta_err = popt[0], np.sqrt(pcov[0, 0])
+        z_max, n_objects = np.max(z_f), len(z_f)
     
     print(f"\n[AUDIT RESULTS]")
-    print(f"-> Detected Phase Drag Coefficient (eta): {eta_found:.4e} years/z^2")
+    print(f"-> Objects in the z > 2 regime: {n_objects}")
+    print(f"-> Detected Phase Drag Coefficient (eta): {eta_found:.4e} +/- {eta_err:.2e} years/z^2")
     print(f"-> Meaning: Light from z=2 suffers a systematic phase delay of {eta_found*4/1e6:.2f} Myr.")
 
-    # 4. Visualization: The Quadratic Drift
-    plt.figure(figsize=(10, 6))
-    plt.scatter(z_f, t_lost / 1e9, alpha=0.1, color='gray', label='Observed Residuals')
-    
-    z_range = np.linspace(2, np.max(z_f), 100)
-    plt.plot(z_range, rrt_drag_model(z_range, eta_found) / 1e9, color='red', lw=2, 
-             label=f'RRT Phase Drag Model (η={eta_found:.2e})')
-    
-    plt.title("RRT Phase Drag Audit: Redshift-Dependent Time Drift", fontsize=12)
-    plt.xlabel("Redshift (z)", fontweight='bold')
-    plt.ylabel("Time Anomaly (Gyr)", fontweight='bold')
-    plt.legend()
-    plt.grid(True, alpha=0.2)
+    # 4. Visualization: The Quadratic Drift (rendered in the background)
+    def draw(fig):
+        ax = fig.add_subplot(111)
+        if streaming:
+            filled = acc['bin_n'] > 0
+            bin_n = acc['bin_n'][filled]
+            bin_mean = acc['bin_t'][filled] / bin_n
+            bin_std = np.sqrt(np.maximum(acc['bin_t2'][filled] / bin_n - bin_mean**2, 0.0))
+            ax.errorbar(acc['bin_z'][filled] / bin_n, bin_mean / 1e9, yerr=bin_std / 1e9, fmt='o', ms=3,
+                        color='gray', alpha=0.6, label='Observed Residuals (z-bin mean ± 1σ)')
+        else:
+            # Object density image instead of one marker per quasar
+            plotting.density_layer(ax, z_f, t_lost / 1e9, color='gray', label='Observed Residuals')
+        
+        z_range = np.linspace(2, z_max, 100)
+        ax.plot(z_range, rrt_drag_model(z_range, eta_found) / 1e9, color='red', lw=2, 
+                label=f'RRT Phase Drag Model (η={eta_found:.2e})')
+        
+        ax.set_title("RRT Phase Drag Audit: Redshift-Dependent Time Drift", fontsize=12)
+        ax.set_xlabel("Redshift (z)", fontweight='bold')
+        ax.set_ylabel("Time Anomaly (Gyr)", fontweight='bold')
+        ax.legend()
+        ax.grid(True, alpha=0.2)
     
-    plt.savefig("rrt_phase_drag_audit.png", dpi=300)
-    print("-> Plot saved: rrt_phase_drag_audit.png")
+    plot_job = plotting.render_in_background(draw, "rrt_phase_drag_audit.png")
 
     print("\n" + "="*80)
     print("TECHNICAL VERDICT: SYSTEMIC REFRACTION DETECTED")
     print("The quadratic drift in time residuals confirms the non-neutrality of the vacuum.")
     print("This 'Lost Time' is the optical signature of Phase 3 Causal Viscosity.")
     print("="*80)
-    plt.show()
+    with instrumentation.stage('plot'):
+        plot_path = plot_job.result()
+    print(f"-> Plot saved: {plot_path}")
 
 if __name__ == "__main__":
     run_phase_drag_audit()
\ No newline at end of file
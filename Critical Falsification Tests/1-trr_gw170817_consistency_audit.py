@@ -1,5 +1,13 @@
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
+import os
+import sys
+import time
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import cosmology, instrumentation
 
 # ==============================================================================
 # RRT CONFIGURATION: GW170817 MULTI-MESSENGER CONSISTENCY AUDIT
@@ -8,6 +16,32 @@ import matplotlib.pyplot as plt
 # while predicting measurable divergence for cosmological distances (z > 0.5).
 # ==============================================================================
 
+# RRT Calibrated Parameters (From Vol. IV)
+CORTEZ_AXIS_RA = 168.0
+CORTEZ_AXIS_DEC = -7.0
+XI_VISCOSITY = 0.308  # Causal Coupling Constant
+ANISOTROPY_A = 0.45   # Dipole Amplitude
+
+# Catalog mode: CSV (or Parquet) with one event per row (GWTC release or simulated population)
+# Required columns: ra, dec, z, d_em, d_gw, d_gw_err (degrees, Mpc); optional: name, d_em_err
+CATALOG_COLUMNS = ['ra', 'dec', 'z', 'd_em', 'd_gw', 'd_gw_err']
+CATALOG_OUTPUT = 'rrt_gw_catalog_results.csv'
+# Large simulated populations are written as Parquet (a 10^6-row CSV takes ~30 s to format)
+SIMULATION_OUTPUT = 'rrt_gw_simulated_results.parquet'
+SIMULATION_SEED = 20170817
+
+def axis_cos_theta(ra_deg, dec_deg):
+    """Cosine of the angular separation from the Cortez Axis (spherical law of cosines)."""
+    r_ra, r_dec = np.radians(ra_deg), np.radians(dec_deg)
+    ax_ra, ax_dec = np.radians(CORTEZ_AXIS_RA), np.radians(CORTEZ_AXIS_DEC)
+    return (np.sin(r_dec) * np.sin(ax_dec) +
+            np.cos(r_dec) * np.cos(ax_dec) * np.cos(r_ra - ax_ra))
+
+def rrt_damping_factor(z, cos_theta):
+    """RRT viscous damping D_GW / D_EM = exp( (Xi/2) * z * (1 + A * cos_theta) )."""
+    return np.exp((XI_VISCOSITY / 2) * z * (1 + ANISOTROPY_A * cos_theta))
+
+@instrumentation.instrumented('gw170817_consistency')
 def run_gw170817_consistency_test():
     """
     Executes a safety audit using the benchmark event GW170817.
@@ -30,20 +64,9 @@ def run_gw170817_consistency_test():
     dist_gw_obs = 40.0  # Observed Gravitational Distance (LIGO) (Mpc)
     ligo_uncertainty = 8.0 # Statistical error margin (Mpc)
     
-    # 2. RRT Calibrated Parameters (From Vol. IV)
-    CORTEZ_AXIS_RA = 168.0
-    CORTEZ_AXIS_DEC = -7.0
-    XI_VISCOSITY = 0.308  # Causal Coupling Constant
-    ANISOTROPY_A = 0.45   # Dipole Amplitude
-    
-    # 3. Geometric Projection (Mapping the event onto the Causal Flow)
-    # Convert to radians for trigonometric computation
-    r_ev = np.radians([ra_event, dec_event])
-    r_ax = np.radians([CORTEZ_AXIS_RA, CORTEZ_AXIS_DEC])
-    
+    # 2. Geometric Projection (Mapping the event onto the Causal Flow)
     # Cosine Theta: Angular separation from the Causal Viscosity Axis
-    cos_theta = (np.sin(r_ev[1]) * np.sin(r_ax[1]) + 
-                 np.cos(r_ev[1]) * np.cos(r_ax[1]) * np.cos(r_ev[0] - r_ax[0]))
+    cos_theta = axis_cos_theta(ra_event, dec_event)
     
     angular_dist_deg = np.degrees(np.arccos(cos_theta))
     
@@ -55,11 +78,10 @@ def run_gw170817_consistency_test():
     else:
         print("Status:          Safe Zone (Low theoretical drag potential).")
 
-    # 4. RRT Mathematical Prediction
+    # 3. RRT Mathematical Prediction
     # Formula: D_GW_pred = D_EM * exp( (Xi/2) * z * (1 + A * cos_theta) )
     # At low redshift (z=0.009), the causal drag is mathematically suppressed.
-    damping_term = (XI_VISCOSITY / 2) * z_event * (1 + ANISOTROPY_A * cos_theta)
-    rrt_factor = np.exp(damping_term)
+    rrt_factor = rrt_damping_factor(z_event, cos_theta)
     
     predicted_gw_dist = dist_em_obs * rrt_factor
     predicted_divergence_pct = (rrt_factor - 1) * 100
@@ -70,7 +92,7 @@ def run_gw170817_consistency_test():
     print(f"RRT Predicted GW Distance:       {predicted_gw_dist:.2f} Mpc")
     print(f"Predicted RRT Bias:              +{predicted_divergence_pct:.2f}% (Viscous Damping)")
     
-    # 5. Consistency Verdict
+    # 4. Consistency Verdict
     upper_limit_ligo = dist_gw_obs + ligo_uncertainty 
     
     print("-" * 50)
@@ -83,14 +105,13 @@ def run_gw170817_consistency_test():
         print("❌ VERDICT: FAILURE.")
         print("RRT predicted excessive damping for a local event.")
 
-    # 6. Cosmological Extrapolation (The "Hunt" for O4/LISA)
+    # 5. Cosmological Extrapolation (The "Hunt" for O4/LISA)
     # Projecting the effect for z=1.0 where RRT is the dominant signal.
     print("=" * 80)
     print("RRT COSMOLOGICAL PREDICTION (FALSIFIABILITY TARGET)")
     print("Projection for high-redshift mergers (z=1.0) within the Cortez Corridor:")
     z_future = 1.0
-    future_term = (XI_VISCOSITY / 2) * z_future * (1 + ANISOTROPY_A * cos_theta)
-    future_factor = np.exp(future_term)
+    future_factor = rrt_damping_factor(z_future, cos_theta)
     future_divergence = (future_factor - 1) * 100
     
     print(f"Expected Luminosity Distance Divergence: +{future_divergence:.2f}%")
@@ -98,5 +119,141 @@ def run_gw170817_consistency_test():
     print("This spatial-dependent bias is the definitive test for RRT.")
     print("="*80)
 
+def _is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+def load_gw_catalog(csv_path):
+    """Reads an event CSV or Parquet file (case-insensitive column names) and checks the required columns."""
+    catalog = pd.read_parquet(csv_path) if _is_parquet(csv_path) else pd.read_csv(csv_path)
+    catalog.columns = [c.strip().lower() for c in catalog.columns]
+    missing = [c for c in CATALOG_COLUMNS if c not in catalog.columns]
+    if missing:
+        raise ValueError(f"Catalog {csv_path} is missing columns: {', '.join(missing)}")
+    return catalog
+
+def simulate_gw_catalog(n_events, seed=SIMULATION_SEED, inject_rrt=False, z_max=1.5,
+                        gw_error_fraction=0.15, em_error_fraction=0.05):
+    """
+    Synthetic event population: isotropic sky, z drawn uniformly in (Euclidean)
+    volume up to z_max, Planck LCDM luminosity distances with fractional errors.
+    With inject_rrt the GW distances carry the RRT damping; otherwise GR holds.
+    """
+    rng = np.random.default_rng(seed)
+    ra = rng.uniform(0, 360, n_events)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n_events)))
+    z = z_max * rng.uniform(0, 1, n_events) ** (1 / 3)
+    d_true = cosmology.luminosity_distance(z)
+    if inject_rrt:
+        d_true_gw = d_true * rrt_damping_factor(z, axis_cos_theta(ra, dec))
+    else:
+        d_true_gw = d_true
+    d_em = d_true * (1 + em_error_fraction * rng.standard_normal(n_events))
+    d_gw = d_true_gw * (1 + gw_error_fraction * rng.standard_normal(n_events))
+    return pd.DataFrame({'ra': ra, 'dec': dec, 'z': z,
+                         'd_em': d_em, 'd_em_err': em_error_fraction * d_true,
+                         'd_gw': d_gw, 'd_gw_err': gw_error_fraction * d_true_gw})
+
+def evaluate_gw_catalog(catalog):
+    """
+    Vectorized consistency audit of every event in the catalog.
+    Same test as the GW170817 benchmark: the RRT-predicted GW distance must not
+    exceed the measured GW distance plus its error. Returns the results table.
+    """
+    cols = {c: catalog[c].to_numpy(dtype=np.float64) for c in CATALOG_COLUMNS}
+    cos_theta = axis_cos_theta(cols['ra'], cols['dec'])
+    rrt_factor = rrt_damping_factor(cols['z'], cos_theta)
+    predicted_gw_dist = cols['d_em'] * rrt_factor
+    upper_limit = cols['d_gw'] + cols['d_gw_err']
+
+    results = pd.DataFrame({
+        'ra': cols['ra'], 'dec': cols['dec'], 'z': cols['z'],
+        'cos_theta': cos_theta,
+        'rrt_factor': rrt_factor,
+        'predicted_divergence_pct': (rrt_factor - 1) * 100,
+        'd_em': cols['d_em'], 'd_gw': cols['d_gw'], 'd_gw_err': cols['d_gw_err'],
+        'predicted_d_gw': predicted_gw_dist,
+        'passed': predicted_gw_dist <= upper_limit,
+    })
+    if 'name' in catalog.columns:
+        results.insert(0, 'name', catalog['name'].to_numpy())
+    if 'd_em_err' in catalog.columns:
+        # Combined error of the prediction (propagated EM error) and the GW measurement
+        error = np.hypot(cols['d_gw_err'], rrt_factor * catalog['d_em_err'].to_numpy(dtype=np.float64))
+        results['tension_sigma'] = (predicted_gw_dist - cols['d_gw']) / error
+    return results
+
+def summarize_gw_catalog(results):
+    """Summary statistics of a results table (printed by the catalog audit)."""
+    aligned = results['cos_theta'] > 0.5
+    summary = {
+        'events': len(results),
+        'passed': int(results['passed'].sum()),
+        'pass_fraction': float(results['passed'].mean()) if len(results) else np.nan,
+        'aligned_events': int(aligned.sum()),
+        'aligned_pass_fraction': float(results.loc[aligned, 'passed'].mean()) if aligned.any() else np.nan,
+        'median_divergence_pct': float(results['predicted_divergence_pct'].median()),
+        'max_divergence_pct': float(results['predicted_divergence_pct'].max()),
+    }
+    if 'tension_sigma' in results.columns:
+        summary['mean_tension_sigma'] = float(results['tension_sigma'].mean())
+        summary['events_above_3_sigma'] = int((results['tension_sigma'] > 3).sum())
+    return summary
+
+@instrumentation.instrumented('gw_catalog')
+def run_gw_catalog_audit(csv_path=None, n_simulated=None, output=None):
+    """
+    Catalog mode: audits every event of a local CSV (e.g. a GWTC release) or of a
+    simulated population of n_simulated events, and writes the results table.
+    """
+    print("="*80)
+    print("REFERENTIAL RELATIVITY THEORY (RRT): GW CATALOG CONSISTENCY AUDIT")
+    print("="*80)
+    start = time.perf_counter()
+    if csv_path:
+        if not os.path.exists(csv_path):
+            print(f"CRITICAL ERROR: Catalog {csv_path} not found.")
+            return None
+        with instrumentation.stage('load_catalog') as stage:
+            catalog = load_gw_catalog(csv_path)
+            stage.rows = len(catalog)
+        print(f"-> Catalog: {csv_path} ({len(catalog)} events)")
+    else:
+        with instrumentation.stage('simulate_catalog', rows=n_simulated):
+            catalog = simulate_gw_catalog(n_simulated)
+        print(f"-> Simulated population: {n_simulated} events (seed {SIMULATION_SEED}, GR distances)")
+
+    output = output or (CATALOG_OUTPUT if csv_path else SIMULATION_OUTPUT)
+    with instrumentation.stage('evaluate', rows=len(catalog)):
+        results = evaluate_gw_catalog(catalog)
+    elapsed = time.perf_counter() - start
+    summary = summarize_gw_catalog(results)
+
+    print("-" * 50)
+    print(f"Events audited:                  {summary['events']} ({elapsed:.2f} s)")
+    print(f"Consistent with GW distance:     {summary['passed']} ({summary['pass_fraction']:.2%})")
+    print(f"High-alignment events (cos>0.5): {summary['aligned_events']} "
+          f"(pass rate {summary['aligned_pass_fraction']:.2%})")
+    print(f"Predicted RRT Bias:              median +{summary['median_divergence_pct']:.2f}%, "
+          f"max +{summary['max_divergence_pct']:.2f}%")
+    if 'mean_tension_sigma' in summary:
+        print(f"Prediction vs. GW tension:       mean {summary['mean_tension_sigma']:.2f} sigma, "
+              f"{summary['events_above_3_sigma']} events above 3 sigma")
+
+    with instrumentation.stage('write_results', rows=len(results)):
+        if _is_parquet(output):
+            results.to_parquet(output, index=False)
+        else:
+            results.to_csv(output, index=False)
+    print(f"-> Results table saved as '{output}'.")
+    print("="*80)
+    return results
+
 if __name__ == "__main__":
-    run_gw170817_consistency_test()
\ No newline at end of file
+    # Catalog mode: pass a CSV of events, or --simulate N for a synthetic population
+    args = sys.argv[1:]
+    if args and args[0] == '--simulate':
+        run_gw_catalog_audit(n_simulated=int(args[1]) if len(args) > 1 else 1000000)
+    elif args:
+        run_gw_catalog_audit(args[0])
+    else:
+        run_gw170817_consistency_test()
\ No newline at end of file
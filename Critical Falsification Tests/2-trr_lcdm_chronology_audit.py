@@ -1,7 +1,11 @@
 import numpy as np
 import pandas as pd
-from astropy.table import Table
 import os
+import sys
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import catalogs, cosmology, instrumentation, memory, sparc
 
 # ==============================================================================
 # RRT CONFIGURATION: LCDM CHRONOLOGY STRESS TEST (AUDIT MODE)
@@ -26,8 +30,9 @@ def get_lcdm_age_at_z(z):
     Returns the Age of the Universe (Gyr) at a given redshift under Lambda-CDM.
     Standard approximation: t(z) ≈ 13.8 / (1 + z)^(1.5)
     """
-    return 13.8 / (1 + z)**1.5
+    return cosmology.age_at_z_power_law(z, t0_gyr=13.8)
 
+@instrumentation.instrumented('lcdm_chronology')
 def run_chronology_stress_audit():
     """
     Executes the triple-audit protocol: Causality, Dynamics, and Phase Anomalies.
@@ -41,10 +46,10 @@ def run_chronology_stress_audit():
     # --- TEST 1: SMBH CAUSALITY (THE "MONSTER" QUASAR PROBLEM) ---
     if os.path.exists(SDSS_DATA):
         print("\n[AUDIT 1] SMBH Growth Causality (SDSS Catalog)...")
-        tbl = Table.read(SDSS_DATA, format='fits')
-        # Filter for scalar columns only for pandas compatibility
-        valid_cols = [n for n in tbl.colnames if len(tbl[n].shape) <= 1]
-        df = tbl[valid_cols].to_pandas()
+        # Memory-mapped FITS: only the redshift columns used by Tests 1 and 3 are read
+        with instrumentation.stage('ingest_sdss') as stage:
+            df = pd.DataFrame(catalogs.read_fits_columns(SDSS_DATA, ['Z', 'Z_MGII', 'Z_VI']))
+            stage.rows = len(df)
         
         # Focusing on high-redshift targets where Lambda-CDM breaks
         subset = df[df['Z'] > 5.0].copy()
@@ -53,7 +58,7 @@ def run_chronology_stress_audit():
         min_detectable_mass = 10**9 
         
         subset['t_required'] = calculate_eddington_time(min_detectable_mass)
-        subset['t_available'] = subset['Z'].apply(get_lcdm_age_at_z)
+        subset['t_available'] = get_lcdm_age_at_z(subset['Z'].to_numpy())
         
         # Violation: When growth time exceeds the age of the universe
         violations = subset[subset['t_required'] > subset['t_available']]
@@ -68,31 +73,27 @@ def run_chronology_stress_audit():
     # --- TEST 2: GALACTIC DYNAMICS (SPARC - DISK RELAXATION) ---
     print("\n[AUDIT 2] Galactic Disk Relaxation (SPARC Database)...")
     if os.path.exists(SPARC_DIR):
-        files = [f for f in os.listdir(SPARC_DIR) if os.path.isfile(os.path.join(SPARC_DIR, f))]
+        # Columnar cache (trr_core/sparc.py): parsed once, memory-mapped afterwards
+        with instrumentation.stage('ingest_sparc') as stage:
+            columns, names, offsets = sparc.load_catalog(SPARC_DIR)
+            stage.rows = len(columns['Rad'])
+        starts, counts = offsets[:-1], np.diff(offsets)
         
-        success_count = 0
-        inconsistent_count = 0
+        # SPARC Structure: Radius(kpc) Vobs(km/s) ... ; a curve needs at least 2 rows
+        usable = counts >= 2
+        # Segments must run over every non-empty galaxy, or a kept galaxy would
+        # extend into the excluded ones after it; the usable ones are picked after
+        nonempty = counts > 0
+        r_max = np.maximum.reduceat(columns['Rad'], starts[nonempty])[usable[nonempty]] if usable.any() else np.empty(0)
+        v_max = columns['Vobs'][offsets[1:][usable] - 1]
         
-        for f in files:
-            try:
-                path = os.path.join(SPARC_DIR, f)
-                # SPARC Structure: Radius(kpc) Vobs(km/s) ...
-                data = np.genfromtxt(path, skip_header=3, invalid_raise=False)
-                
-                if data.ndim == 2 and data.shape[1] >= 2:
-                    r_max = np.max(data[:, 0])
-                    v_max = data[-1, 1]
-                    
-                    if v_max > 0:
-                        # Time for one full rotation (Gyr)
-                        t_rot = (2 * np.pi * r_max * 3.086e16) / v_max / (3.154e7 * 1e9)
-                        # Dynamical stability requires ~10 rotations.
-                        # LCDM Age at z=10 is only ~0.5 Gyr.
-                        if (t_rot * 10) > 1.0:
-                            inconsistent_count += 1
-                        success_count += 1
-            except:
-                continue
+        rotating = v_max > 0
+        # Time for one full rotation (Gyr)
+        t_rot = (2 * np.pi * r_max[rotating] * 3.086e16) / v_max[rotating] / (3.154e7 * 1e9)
+        # Dynamical stability requires ~10 rotations.
+        # LCDM Age at z=10 is only ~0.5 Gyr.
+        inconsistent_count = int(np.count_nonzero((t_rot * 10) > 1.0))
+        success_count = int(np.count_nonzero(rotating))
         
         print(f"-> Galaxies processed:        {success_count}")
         print(f"-> Impossible Relaxation Time: {inconsistent_count}")
@@ -108,13 +109,14 @@ def run_chronology_stress_audit():
         anomalies = df[(df['delta_z'] > 0.05) & (df['Z_VI'] > 2.0)]
         
         print(f"-> Total Quasars analyzed:    {len(df)}")
-        print(f"-> Confirmed Phase Anomalies: {len(anomalias)}")
+        print(f"-> Confirmed Phase Anomalies: {len(anomalies)}")
         print("RRT INTERPRETATION: Viscous vacuum 'drags' metal-line photons differently.")
 
     print("\n" + "="*80)
     print("TECHNICAL VERDICT: CAUSAL RUPTURE CONFIRMED")
     print("The Lambda-CDM timeline is insufficient to support observed baryonic structures.")
     print("RRT resolves this without 'ad hoc' substances via Causal Maturity (Tc).")
+    print(f"-> Peak memory (RSS): {memory.peak_rss_label()}")
     print("="*80)
 
 if __name__ == "__main__":
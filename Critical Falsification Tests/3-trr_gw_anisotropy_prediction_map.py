@@ -1,5 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+import sys
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import gw_cube, instrumentation
 
 # ==============================================================================
 # RRT CONFIGURATION: GRAVITATIONAL WAVE ANISOTROPY PREDICTION MAP
@@ -9,6 +15,13 @@ import matplotlib.pyplot as plt
 # distances due to vacuum viscosity (Causal Fatigue).
 # ==============================================================================
 
+# Cube mode (python 3-trr_gw_anisotropy_prediction_map.py --cube): the same
+# prediction on a HEALPix RING grid for a whole redshift vector (trr_core.gw_cube)
+CUBE_FILE = 'rrt_gw_divergence_cube.npy'
+CUBE_NSIDE = 2048
+CUBE_Z_VALUES = np.linspace(0.05, 5.0, 100)
+
+@instrumentation.instrumented('gw_prediction_map')
 def generate_rrt_prediction_map():
     """
     Generates a Mollweide projection map showing the predicted divergence 
@@ -39,7 +52,7 @@ def generate_rrt_prediction_map():
     K_z05 = 0.15 
     A_anisotropy = 0.45
     
-    divergence = (np.exp(K_z05 * (1 + A_anisotropy * cos_theta)) - 1) * 100
+    divergence = gw_cube.divergence_percent(K_z05, cos_theta, A_anisotropy)
     
     # 5. Visualization (Mollweide Projection)
     plt.figure(figsize=(12, 8))
@@ -77,5 +90,28 @@ def generate_rrt_prediction_map():
     print("="*80)
     plt.show()
 
+@instrumentation.instrumented('gw_prediction_cube')
+def generate_rrt_prediction_cube(output=CUBE_FILE, nside=CUBE_NSIDE, z_values=CUBE_Z_VALUES):
+    """
+    Writes the divergence prediction for every HEALPix pixel and every redshift
+    of z_values as a cube for alert matching (stored as its cos_theta and k(z)
+    factors; gw_cube.load_cube indexes it like float32[npix, n_z]).
+    """
+    print("="*80)
+    print("RRT PREDICTION ENGINE: HEALPIX DIVERGENCE CUBE")
+    npix = gw_cube.nside_to_npix(nside)
+    print(f"Grid: nside {nside} ({npix} pixels) x {len(z_values)} redshifts "
+          f"(z = {z_values[0]:.2f} ... {z_values[-1]:.2f}), {gw_cube.disk_bytes(nside) / 1024**3:.2f} GB on disk")
+    print("="*80)
+    with instrumentation.stage('generate_cube', rows=npix * len(z_values)):
+        gw_cube.generate_cube(output, nside, z_values, verbose=True)
+    cube, meta = gw_cube.load_cube(output)
+    print(f"-> Cube saved as '{output}' (metadata: '{gw_cube.metadata_path(output)}').")
+    print(f"-> Peak divergence at z = {meta['z'][-1]:.2f}: {cube.peak(-1):.2f}%")
+    print("="*80)
+
 if __name__ == "__main__":
-    generate_rrt_prediction_map()
\ No newline at end of file
+    if '--cube' in sys.argv[1:]:
+        generate_rrt_prediction_cube()
+    else:
+        generate_rrt_prediction_map()
\ No newline at end of file
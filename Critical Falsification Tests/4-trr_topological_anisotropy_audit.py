@@ -1,9 +1,13 @@
 import numpy as np
 import pandas as pd
-from astropy.table import Table
 import os
+import sys
 import matplotlib.pyplot as plt
 
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import axis_scan, catalogs, healpix, instrumentation, memory, plotting
+
 # ==============================================================================
 # RRT CONFIGURATION: TOPOLOGICAL ANISOTROPY AUDIT
 # Target: SDSS DR16Q (Deep Redshift Phase Anomalies)
@@ -19,16 +23,86 @@ SDSS_DATA = "DR16Q_Superset_v3.fits"
 CORTEZ_RA = 168.0 
 CORTEZ_DEC = -7.0
 
+# Streaming mode: rows per FITS block (None = sized by trr_core.catalogs.DEFAULT_CHUNK_BYTES)
+CHUNK_ROWS = None
+N_ANGULAR_BINS = 10
+
+# Axis-scan mode (--axis-scan): every HEALPix pixel centre at AXIS_NSIDE is a candidate
+# axis (nside 16 = 3072 axes, ~3.7 deg); objects are counted in DATA_NSIDE pixels (~0.9 deg)
+AXIS_NSIDE = 16
+DATA_NSIDE = 64
+N_NULL_SCANS = 100
+AXIS_SCAN_SEED = 20200101
+
 def calculate_angular_separation(ra1, dec1, ra2, dec2):
     """Calculates angular distance (cos theta) between two celestial points."""
     r1, d1 = np.radians(ra1), np.radians(dec1)
     r2, d2 = np.radians(ra2), np.radians(dec2)
     return np.sin(d1) * np.sin(d2) + np.cos(d1) * np.cos(d2) * np.cos(r1 - r2)
 
-def run_topological_alignment_audit():
+def compute_anomaly_rates(df):
+    """
+    In-memory reference path: per-bin anomaly rate (%) over 10 cos(theta) bins.
+    Expects a DataFrame with RA, DEC, Z_VI and Z_MGII.
+    """
+    # 1. Define Causal Anomaly (Phase Drag)
+    # Discrepancy between Magnesium-II (Chemical) and Visual (Geometric) redshifts
+    df['delta_z'] = np.abs(df['Z_MGII'] - df['Z_VI'])
+    df['is_anomaly'] = df['delta_z'] > 0.05
+    
+    # 2. Calculate position relative to the Cortez Axis (Cos Theta)
+    df['cos_theta'] = calculate_angular_separation(df['RA'], df['DEC'], CORTEZ_RA, CORTEZ_DEC)
+    
+    # Creating 10 angular bins across the sky
+    df['angular_bin'] = pd.cut(df['cos_theta'], bins=N_ANGULAR_BINS)
+    return df.groupby('angular_bin', observed=True)['is_anomaly'].mean() * 100
+
+def stream_anomaly_rates(fits_file, chunk_rows=CHUNK_ROWS):
+    """
+    Streaming path: same rates as compute_anomaly_rates() without building the table.
+    Pass 1 finds the cos(theta) range (pd.cut bins span the data min/max);
+    pass 2 accumulates per-bin totals and anomaly counts in fixed-size arrays.
+    Each pass reads the next FITS block while the current one is reduced.
+    """
+    # Pass 1: global cos(theta) range
+    cos_min, cos_max = np.inf, -np.inf
+    with instrumentation.stage('pass1_cos_theta_range'):
+        for block in catalogs.iter_fits_chunks(fits_file, ['RA', 'DEC'], chunk_rows):
+            cos_theta = calculate_angular_separation(block['RA'], block['DEC'], CORTEZ_RA, CORTEZ_DEC)
+            if np.any(~np.isnan(cos_theta)):
+                cos_min = min(cos_min, np.nanmin(cos_theta))
+                cos_max = max(cos_max, np.nanmax(cos_theta))
+    if not np.isfinite(cos_min):
+        return pd.Series(dtype=float)
+
+    # Exactly the edges and interval labels pd.cut derives from that range
+    categories, edges = pd.cut(np.array([cos_min, cos_max]), bins=N_ANGULAR_BINS, retbins=True)
+    intervals = categories.categories
+
+    # Pass 2: per-bin totals and anomaly counts (right-closed bins, as in pd.cut)
+    totals = np.zeros(N_ANGULAR_BINS, dtype=np.int64)
+    anomalies = np.zeros(N_ANGULAR_BINS, dtype=np.int64)
+    with instrumentation.stage('pass2_bin_counts') as stage:
+        for block in catalogs.iter_fits_chunks(fits_file, ['RA', 'DEC', 'Z_VI', 'Z_MGII'], chunk_rows):
+            cos_theta = calculate_angular_separation(block['RA'], block['DEC'], CORTEZ_RA, CORTEZ_DEC)
+            is_anomaly = np.abs(block['Z_MGII'] - block['Z_VI']) > 0.05
+            bin_index = np.searchsorted(edges, cos_theta, side='left') - 1
+            inside = (bin_index >= 0) & (bin_index < N_ANGULAR_BINS) & ~np.isnan(cos_theta)
+            totals += np.bincount(bin_index[inside], minlength=N_ANGULAR_BINS)
+            anomalies += np.bincount(bin_index[inside & is_anomaly], minlength=N_ANGULAR_BINS)
+        stage.rows = totals.sum()
+
+    observed = totals > 0
+    rates = anomalies[observed] / totals[observed] * 100
+    return pd.Series(rates, index=pd.CategoricalIndex(intervals[observed], categories=intervals, name='angular_bin'), name='is_anomaly')
+
+@instrumentation.instrumented('topological_anisotropy')
+def run_topological_alignment_audit(streaming=True, chunk_rows=CHUNK_ROWS):
     """
     Audits the distribution of chemical phase anomalies across the celestial sphere.
     Proves that the 'Vacuum Drag' is directionally dependent, falsifying isotropy.
+    streaming=True reduces the catalog block by block (constant memory);
+    streaming=False loads the projected columns and uses pd.cut/groupby.
     """
     print("="*80)
     print("REFERENTIAL RELATIVITY THEORY (RRT): TOPOLOGICAL ANISOTROPY AUDIT")
@@ -39,24 +113,20 @@ def run_topological_alignment_audit():
         print(f"CRITICAL ERROR: {SDSS_DATA} not found.")
         return
 
-    print("-> Loading spatial and spectral datasets...")
-    tbl = Table.read(SDSS_DATA, format='fits')
-    # Optimizing memory usage by selecting key columns
-    df = tbl['RA', 'DEC', 'Z_VI', 'Z_MGII'].to_pandas()
-    
-    print("-> Computing Phase Drag metrics and Causal Alignment...")
-    # 1. Define Causal Anomaly (Phase Drag)
-    # Discrepancy between Magnesium-II (Chemical) and Visual (Geometric) redshifts
-    df['delta_z'] = np.abs(df['Z_MGII'] - df['Z_VI'])
-    df['is_anomaly'] = df['delta_z'] > 0.05
-    
-    # 2. Calculate position relative to the Cortez Axis (Cos Theta)
-    df['cos_theta'] = calculate_angular_separation(df['RA'], df['DEC'], CORTEZ_RA, CORTEZ_DEC)
-    
-    print("-> Analyzing spatial correlation clusters...")
-    # Creating 10 angular bins across the sky
-    df['angular_bin'] = pd.cut(df['cos_theta'], bins=10)
-    stats = df.groupby('angular_bin', observed=True)['is_anomaly'].mean() * 100
+    if streaming:
+        print("-> Streaming spatial and spectral datasets (constant-memory blocks)...")
+        print("-> Computing Phase Drag metrics, Causal Alignment and spatial clusters...")
+        with instrumentation.stage('stream_anomaly_rates'):
+            stats = stream_anomaly_rates(SDSS_DATA, chunk_rows)
+    else:
+        print("-> Loading spatial and spectral datasets...")
+        # Memory-mapped FITS with column projection: only the key columns are read
+        with instrumentation.stage('ingest') as stage:
+            df = pd.DataFrame(catalogs.read_fits_columns(SDSS_DATA, ['RA', 'DEC', 'Z_VI', 'Z_MGII']))
+            stage.rows = len(df)
+        print("-> Computing Phase Drag metrics, Causal Alignment and spatial clusters...")
+        with instrumentation.stage('anomaly_rates', rows=len(df)):
+            stats = compute_anomaly_rates(df)
     
     print("\nSPATIAL DISTRIBUTION RESULTS:")
     print("-" * 50)
@@ -82,20 +152,110 @@ def run_topological_alignment_audit():
         print("Anomalies appear uniformly distributed across the celestial sphere.")
 
     # 5. Visualization: The Cortez Dipole Distribution
-    plt.figure(figsize=(10, 6))
-    stats.plot(kind='bar', color='#1a2a6c')
-    
-    plt.title("Chemical Phase Anomaly Rate vs. Celestial Orientation\nAudit of Vacuum Drag Alignment (Cortez Axis)", fontsize=12)
-    plt.xlabel("Directional Alignment (Cos Theta: 1=Aligned, -1=Opposite)", fontweight='bold')
-    plt.ylabel("% of Quasars with Phase Drag (> 0.05 dz)", fontweight='bold')
-    plt.xticks(rotation=45)
-    plt.grid(axis='y', linestyle='--', alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig("rrt_topological_anisotropy_audit.png", dpi=300)
+    with instrumentation.stage('plot'):
+        plt.figure(figsize=(10, 6))
+        stats.plot(kind='bar', color='#1a2a6c')
+        
+        plt.title("Chemical Phase Anomaly Rate vs. Celestial Orientation\nAudit of Vacuum Drag Alignment (Cortez Axis)", fontsize=12)
+        plt.xlabel("Directional Alignment (Cos Theta: 1=Aligned, -1=Opposite)", fontweight='bold')
+        plt.ylabel("% of Quasars with Phase Drag (> 0.05 dz)", fontweight='bold')
+        plt.xticks(rotation=45)
+        plt.grid(axis='y', linestyle='--', alpha=0.3)
+        
+        plt.tight_layout()
+        plt.savefig("rrt_topological_anisotropy_audit.png", dpi=300)
     print(f"\n-> Audit plot saved: 'rrt_topological_anisotropy_audit.png'")
+    print(f"-> Peak memory (RSS): {memory.peak_rss_label()}")
     print("="*80)
     plt.show()
 
+def accumulate_axis_statistics(fits_file, chunk_rows=CHUNK_ROWS, data_nside=DATA_NSIDE):
+    """
+    One streaming pass reducing the catalog to the axis-scan sufficient statistics:
+    dipole moments of the anomaly field and per-pixel totals / anomaly counts.
+    """
+    moments = axis_scan.DipoleMoments()
+    npix = healpix.nside_to_npix(data_nside)
+    totals = np.zeros(npix, dtype=np.int64)
+    anomalies = np.zeros(npix, dtype=np.int64)
+    for block in catalogs.iter_fits_chunks(fits_file, ['RA', 'DEC', 'Z_VI', 'Z_MGII'], chunk_rows):
+        valid = np.isfinite(block['RA']) & np.isfinite(block['DEC'])
+        vectors = healpix.radec_to_vec(block['RA'][valid], block['DEC'][valid])
+        is_anomaly = (np.abs(block['Z_MGII'] - block['Z_VI']) > 0.05)[valid]
+        moments.add(vectors, is_anomaly)
+        pix = healpix.vec2pix(data_nside, vectors)
+        totals += np.bincount(pix, minlength=npix)
+        anomalies += np.bincount(pix[is_anomaly], minlength=npix)
+    return moments, totals, anomalies
+
+@instrumentation.instrumented('topological_axis_scan')
+def run_axis_scan_audit(chunk_rows=CHUNK_ROWS, axis_nside=AXIS_NSIDE, data_nside=DATA_NSIDE,
+                        n_null=N_NULL_SCANS, seed=AXIS_SCAN_SEED):
+    """
+    All-sky version of the audit: the anomaly-rate contrast of every candidate axis,
+    the best axis and its look-elsewhere-corrected significance. The Cortez Axis is
+    ranked against all other directions instead of being tested alone.
+    """
+    print("="*80)
+    print("REFERENTIAL RELATIVITY THEORY (RRT): ALL-SKY AXIS SCAN")
+    print("Focus: Is the Cortez Axis special among all candidate directions?")
+    print("="*80)
+
+    if not os.path.exists(SDSS_DATA):
+        print(f"CRITICAL ERROR: {SDSS_DATA} not found.")
+        return None
+
+    print("-> Reducing the catalog to dipole moments and per-pixel counts (one streaming pass)...")
+    with instrumentation.stage('accumulate_axis_statistics') as stage:
+        moments, totals, anomalies = accumulate_axis_statistics(SDSS_DATA, chunk_rows, data_nside)
+        stage.rows = totals.sum()
+    n_axes = healpix.nside_to_npix(axis_nside)
+    print(f"-> Scanning {n_axes} candidate axes (+ {n_null} null scans for the look-elsewhere correction)...")
+    with instrumentation.stage('scan_axes', rows=n_axes):
+        result = axis_scan.scan_axes(moments, totals, anomalies, data_nside, axis_nside, N_ANGULAR_BINS, n_null, seed)
+
+    best_ra, best_dec = result.best_contrast_radec()
+    cortez_rank, cortez_contrast = result.axis_percentile(CORTEZ_RA, CORTEZ_DEC)
+    dipole_ra, dipole_dec = result.dipole_radec()
+
+    print("\nAXIS SCAN RESULTS:")
+    print("-" * 50)
+    print(f"Objects:                     {result.n_objects} ({anomalies.sum()} anomalies)")
+    print(f"Best binned axis:            RA {best_ra:.1f}°, Dec {best_dec:.1f}° "
+          f"(Inter-Axial Variation {result.contrast.max():.2f}%)")
+    print(f"  Look-elsewhere p-value:    {result.contrast_p_global:.3f} ({n_null} relabelled null scans)")
+    print(f"Cortez Axis:                 Variation {cortez_contrast:.2f}% "
+          f"(above {cortez_rank:.1f}% of all axes)")
+    print(f"Best dipole axis:            RA {dipole_ra:.1f}°, Dec {dipole_dec:.1f}° "
+          f"(local {abs(result.dipole_local_sigma):.2f} sigma)")
+    print(f"  Look-elsewhere (chi2, 3 dof): p = {result.dipole_p_global:.3e} "
+          f"({axis_scan.p_to_sigma(result.dipole_p_global):.2f} sigma global)")
+
+    # Best-axis map (Mollweide), rendered in the background
+    def draw(fig):
+        ax = fig.add_subplot(111, projection='mollweide')
+        wrap = lambda ra: np.radians((np.asarray(ra) + 180) % 360 - 180)
+        points = ax.scatter(wrap(result.ra), np.radians(result.dec), c=result.contrast, s=4, cmap='RdYlBu_r')
+        ax.scatter(wrap(CORTEZ_RA), np.radians(CORTEZ_DEC), marker='*', s=300, color='gold',
+                   edgecolor='black', label='Cortez Axis', zorder=10)
+        ax.scatter(wrap(best_ra), np.radians(best_dec), marker='X', s=150, color='black',
+                   label='Best binned axis', zorder=10)
+        fig.colorbar(points, ax=ax, orientation='horizontal', pad=0.08, aspect=50,
+                     label='Inter-Axial Variation of the anomaly rate (%)')
+        ax.set_title("All-Sky Axis Scan: Phase Anomaly Rate Contrast per Candidate Axis", fontsize=12, pad=20)
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.legend(loc='upper left', fontsize=9)
+
+    plot_job = plotting.render_in_background(draw, "rrt_topological_axis_scan.png", figsize=(12, 7))
+    with instrumentation.stage('plot'):
+        plot_path = plot_job.result()
+    print(f"\n-> Axis-scan map saved: '{plot_path}'")
+    print(f"-> Peak memory (RSS): {memory.peak_rss_label()}")
+    print("="*80)
+    return result
+
 if __name__ == "__main__":
-    run_topological_alignment_audit()
\ No newline at end of file
+    if '--axis-scan' in sys.argv[1:]:
+        run_axis_scan_audit()
+    else:
+        run_topological_alignment_audit()
\ No newline at end of file
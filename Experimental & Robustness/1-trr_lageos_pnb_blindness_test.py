@@ -1,61 +1,71 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import sys
+
+# Núcleos compartilhados da TRR (trr_core) ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import instrumentation, plotting, sp3
+from trr_core.lageos_archive import LageosArchive
 
 # CONFIGURAÇÃO TRR
 EIXO_CORTEZ_RA = 148.9
 ARQUIVO = "asi.orb.lageos2.251220.v80.sp3"
+# Modo arquivo histórico: diretório de produtos SP3 diários, ingeridos incrementalmente (None = só ARQUIVO)
+DIRETORIO_SP3 = None
 
-def auditoria_lageos_v3():
+@instrumentation.instrumented('exp_lageos_blindness')
+def auditoria_lageos_v3(diretorio=DIRETORIO_SP3):
     print(f"--- TRR: AUDITORIA GRAVITACIONAL LAGEOS-2 (ID: L52) ---")
     
-    if not os.path.exists(ARQUIVO):
-        print(f"ERRO: Arquivo {ARQUIVO} não encontrado.")
-        return
+    if diretorio:
+        # Só os arquivos novos (ou alterados) são lidos; o resto vem do armazenamento persistente
+        arquivo_hist = LageosArchive(diretorio, axis_ra=EIXO_CORTEZ_RA)
+        with instrumentation.stage('archive_update') as etapa:
+            lidos, inalterados, novas = arquivo_hist.update()
+            etapa.rows = novas
+        print(f"Arquivo histórico: {len(lidos)} arquivo(s) lido(s), {inalterados} inalterado(s), {novas} épocas novas.")
+        if arquivo_hist.n_rows == 0:
+            print("ERRO: Ainda não foi possível extrair coordenadas. Verifique o ID nas linhas de posição.")
+            return
+        print(f"Sucesso: {arquivo_hist.n_rows} pontos de dados extraídos.")
 
-    posicoes = []
-    
-    # Lendo o arquivo com o ID correto identificado na sua amostra
-    with open(ARQUIVO, 'r', encoding='latin-1') as f:
-        for linha in f:
-            partes = linha.split()
-            # Procuramos linhas que começam com P e identificam o satélite 52 ou L52
-            if len(partes) >= 5 and partes[0].startswith('P'):
-                if '52' in partes[0] or '52' in partes[1]:
-                    try:
-                        # O formato SP3: P ID X Y Z
-                        # Se o ID estiver grudado no P (ex: PL52), o X é partes[1]
-                        # Se houver espaço (ex: P L52), o X é partes[2]
-                        idx_x = 1 if len(partes[0]) > 1 else 2
-                        x = float(partes[idx_x])
-                        y = float(partes[idx_x+1])
-                        z = float(partes[idx_x+2])
-                        posicoes.append([x, y, z])
-                    except (ValueError, IndexError):
-                        continue
+        # Correlação a partir dos momentos acumulados e gráfico a partir das células agregadas
+        # do armazenamento (os vetores gravados não são relidos)
+        momentos = arquivo_hist.moments
+        r_obs, sigma = momentos.pearson(), momentos.sigma()
+        ra_graf, residuo_graf, contagens_graf = arquivo_hist.residual_cells()
+    else:
+        if not os.path.exists(ARQUIVO):
+            print(f"ERRO: Arquivo {ARQUIVO} não encontrado.")
+            return
 
-    pos = np.array(posicoes)
+        # Leitura vetorizada dos registros de largura fixa do SP3 (ID exato: L52)
+        with instrumentation.stage('ingest_sp3') as etapa:
+            efemerides = sp3.read_sp3(ARQUIVO)
+            pos = sp3.positions(sp3.select_satellite(efemerides, sp3.LAGEOS2_ID))
+            etapa.rows = len(pos)
     
-    if len(pos) == 0:
-        print("ERRO: Ainda não foi possível extrair coordenadas. Verifique o ID nas linhas de posição.")
-        return
+        if len(pos) == 0:
+            print("ERRO: Ainda não foi possível extrair coordenadas. Verifique o ID nas linhas de posição.")
+            return
 
-    print(f"Sucesso: {len(pos)} pontos de dados extraídos.")
+        print(f"Sucesso: {len(pos)} pontos de dados extraídos.")
 
-    # 1. Geometria Causal (Ângulo de Ascensão Reta)
-    ra_inst = np.degrees(np.arctan2(pos[:, 1], pos[:, 0])) % 360
-    
-    # 2. Resíduos de Energia Gravitacional (Variação do Raio)
-    raios = np.linalg.norm(pos, axis=1)
-    residuos_r = raios - np.mean(raios)
-    
-    # 3. Cálculo da Significância TRR
-    alinhamento = np.cos(np.radians(ra_inst - EIXO_CORTEZ_RA))
-    df = pd.DataFrame({'ra': ra_inst, 'residuo': residuos_r, 'alinhamento': alinhamento})
-    
-    r_obs = df['alinhamento'].corr(df['residuo'])
-    sigma = abs(r_obs) * np.sqrt(len(df))
+        # 1. Geometria Causal (Ângulo de Ascensão Reta)
+        ra_inst = np.degrees(np.arctan2(pos[:, 1], pos[:, 0])) % 360
+        
+        # 2. Resíduos de Energia Gravitacional (Variação do Raio)
+        raios = np.linalg.norm(pos, axis=1)
+        residuos_r = raios - np.mean(raios)
+        
+        # 3. Cálculo da Significância TRR
+        alinhamento = np.cos(np.radians(ra_inst - EIXO_CORTEZ_RA))
+        df = pd.DataFrame({'ra': ra_inst, 'residuo': residuos_r, 'alinhamento': alinhamento})
+        
+        r_obs = df['alinhamento'].corr(df['residuo'])
+        sigma = abs(r_obs) * np.sqrt(len(df))
+        ra_graf, residuo_graf, contagens_graf = df['ra'], df['residuo'], None
 
     print("\n" + "="*60)
     print(f"VEREDITO LAGEOS-2 (UNIFICAÇÃO MACRO): {sigma:.2f} SIGMA")
@@ -63,16 +73,22 @@ def auditoria_lageos_v3():
     print(f"RESULTADO: {'QUEBRA DE ISOTROPIA CONFIRMADA' if sigma > 5 else 'ISOTROPIA DE EINSTEIN PREVALECE'}")
     print("="*60)
 
-    # Gráfico de Dispersão para sua tese
-    plt.figure(figsize=(10,6))
-    plt.scatter(df['ra'], df['residuo'], c=df['residuo'], cmap='magma', s=5, alpha=0.5)
-    plt.axvline(EIXO_CORTEZ_RA, color='cyan', linestyle='--', label='Eixo de Cortez')
-    plt.title("Resíduos de Órbita LAGEOS-2 (NASA/ASI) vs Direção Sideral")
-    plt.xlabel("Ascensão Reta (Graus)")
-    plt.ylabel("Desvio Radial (km)")
-    plt.colorbar(label='Amplitude do Resíduo')
-    plt.legend()
-    plt.show()
+    # Gráfico de densidade para sua tese (pontos agregados em células, desenhado em segundo plano)
+    def desenhar(fig):
+        ax = fig.add_subplot(111)
+        imagem = plotting.density_layer(ax, ra_graf, residuo_graf, cmap='magma', values=residuo_graf,
+                                        weights=contagens_graf)
+        ax.axvline(EIXO_CORTEZ_RA, color='cyan', linestyle='--', label='Eixo de Cortez')
+        ax.set_title("Resíduos de Órbita LAGEOS-2 (NASA/ASI) vs Direção Sideral")
+        ax.set_xlabel("Ascensão Reta (Graus)")
+        ax.set_ylabel("Desvio Radial (km)")
+        fig.colorbar(imagem, ax=ax, label='Amplitude do Resíduo')
+        ax.legend()
+
+    grafico = plotting.render_in_background(desenhar, "trr_lageos_residuos.png")
+    with instrumentation.stage('plot'):
+        caminho_grafico = grafico.result()
+    print(f"Gráfico salvo: {caminho_grafico}")
 
 if __name__ == "__main__":
-    auditoria_lageos_v3()
\ No newline at end of file
+    auditoria_lageos_v3(sys.argv[1] if len(sys.argv) > 1 else DIRETORIO_SP3)
\ No newline at end of file
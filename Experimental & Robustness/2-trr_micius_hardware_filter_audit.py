@@ -1,6 +1,17 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+import sys
+
+# Núcleos compartilhados da TRR (trr_core) ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import instrumentation, resampling
+
+# Teste de significância: nulo de permutação exato para n <= 10 (todas as n! ordens),
+# senão Monte Carlo semeado em lotes de N_SIM permutações
+N_SIM = 10000
+SEMENTE = 20170616
 
 # --- FASE 1: RECONSTRUÇÃO DO DATASET REAL (Micius/QUESS) ---
 def gerar_dados_micius():
@@ -19,7 +30,8 @@ def gerar_dados_micius():
     print("Arquivo 'dados_micius_reais.csv' gerado com sucesso.")
 
 # --- FASE 2: AUDITORIA DA TRR NO EMARANHAMENTO ---
-def auditoria_quântica_final():
+@instrumentation.instrumented('exp_micius_hardware_filter')
+def auditoria_quântica_final(n_sim=N_SIM, semente=SEMENTE):
     df = pd.read_csv("dados_micius_reais.csv")
     EIXO_CORTEZ = 148.9
 
@@ -35,18 +47,17 @@ def auditoria_quântica_final():
     # Na TRR, a correlação deve ser NEGATIVA e FORTE (Mergulho no Eixo).
     r_obs = np.corrcoef(df['alinhamento'], df['fidelidade_chsh'])[0, 1]
     
-    # 3. Teste de Significância (Monte Carlo)
-    n_sim = 10000
-    corrs_nulas = []
-    for _ in range(n_sim):
-        shuffled = np.random.permutation(df['fidelidade_chsh'])
-        corrs_nulas.append(np.corrcoef(df['alinhamento'], shuffled)[0, 1])
+    # 3. Teste de Significância (permutação exata ou Monte Carlo em lotes)
+    with instrumentation.stage('permutation_null', rows=len(df)):
+        nulo = resampling.permutation_null_correlation(df['alinhamento'].to_numpy(), df['fidelidade_chsh'].to_numpy(),
+                                                       n_monte_carlo=n_sim, seed=semente)
     
-    sigma = (r_obs - np.mean(corrs_nulas)) / np.std(corrs_nulas)
+    sigma = (r_obs - nulo.mean) / nulo.std
 
     print("\n" + "="*60)
     print(f"VEREDITO UNIFICAÇÃO (MICIUS): {abs(sigma):.2f} SIGMA")
     print(f"CORRELAÇÃO DETECTADA: {r_obs:.4f}")
+    print(f"DISTRIBUIÇÃO NULA: {nulo.summary()}")
     print(f"RESULTADO: {'MECÂNICA QUÂNTICA UNIFICADA' if abs(sigma) > 5 else 'TRR APENAS COSMOLÓGICA'}")
     print("="*60)
 
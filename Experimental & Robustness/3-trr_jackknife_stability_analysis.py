@@ -1,18 +1,21 @@
 import numpy as np
-import pandas as pd
-from astropy.table import Table
 from scipy.optimize import least_squares
 import matplotlib.pyplot as plt
+import os
+import sys
+
+# Núcleos compartilhados da TRR (trr_core) ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import cache, instrumentation, memory, precession, resampling
 
 # Parâmetros Nominais da TRR
 D0_NOMINAL = 0.794
 OMEGA_P = 1128.0
 DIRECAO_NOMINAL = 148.9
 
-def to_native(array):
-    if array.dtype.byteorder not in ('=', '|'):
-        return array.byteswap().view(array.dtype.newbyteorder('='))
-    return array
+# Reamostragem semeada (cortes reprodutíveis entre execuções)
+FRACAO_MANTIDA = 0.9
+SEMENTE = 20170817
 
 def residuo_trr(params, ra, z, mag_res):
     d0, theta0 = params
@@ -21,38 +24,30 @@ def residuo_trr(params, ra, z, mag_res):
     predicao = d0 * z * np.cos(np.radians(ra - fase))
     return predicao - mag_res
 
-def executar_jackknife(caminho, n_cortes=50):
+def ajustar_corte(dados, idx):
+    # Ajuste de Mínimos Quadrados sobre um corte (vetor de índices)
+    x0 = [D0_NOMINAL, DIRECAO_NOMINAL]
+    res = least_squares(residuo_trr, x0, args=(dados['ra'][idx], dados['z'][idx], dados['mag_res'][idx]))
+    return res.x[0], res.x[1] % 360
+
+@instrumentation.instrumented('exp_jackknife')
+def executar_jackknife(caminho, n_cortes=50, semente=SEMENTE, workers=None):
     print(f"Iniciando Teste Jackknife em {caminho}...")
-    dat = Table.read(caminho, format='fits')
-    
     # Extração e limpeza (Foco no estrato de ressonância z: 1.5 - 2.0)
-    ra = to_native(np.array(dat['RA']))
-    z = to_native(np.array(dat['Z']))
-    mag_i = to_native(np.array(dat['PSFMAG'][:, 3]))
-    
-    df = pd.DataFrame({'ra': ra, 'z': z, 'mag': mag_i})
-    df = df[(df['z'] >= 1.5) & (df['z'] <= 2.0) & (df['mag'] > 0)].copy()
-    df['mag_res'] = df['mag'] - (5 * np.log10(df['z']))
-    
-    print(f"Amostra total: {len(df)} objetos.")
+    # Estrato memoizado em trr_core.cache: novas execuções sobre o mesmo FITS não o releem
+    with instrumentation.stage('ingest_stratum') as etapa:
+        dados = precession.load_resonance_stratum(caminho)
+        n_objetos = etapa.rows = len(dados['z'])
     
-    # Listas para armazenar resultados das iterações
-    d0_results = []
-    theta0_results = []
+    print(f"Amostra total: {n_objetos} objetos.")
     
-    # Loop Jackknife: Remove 10% dos dados aleatoriamente em cada iteração
-    for i in range(n_cortes):
-        # Sampling: removemos uma fração dos dados
-        df_jack = df.sample(frac=0.9)
-        
-        # Ajuste de Mínimos Quadrados
-        x0 = [D0_NOMINAL, DIRECAO_NOMINAL]
-        res = least_squares(residuo_trr, x0, args=(df_jack['ra'], df_jack['z'], df_jack['mag_res']))
-        
-        d0_results.append(res.x[0])
-        theta0_results.append(res.x[1] % 360)
-        
-        if i % 10 == 0: print(f"Iteração {i}/{n_cortes} concluída...")
+    # Jackknife delete-d: remove 10% dos dados em cada corte (índices, em paralelo)
+    with instrumentation.stage('resampling', rows=n_objetos):
+        resultado = resampling.run_resampling(ajustar_corte, dados, n_cortes, scheme='jackknife',
+                                              d=resampling.delete_d_for_fraction(n_objetos, FRACAO_MANTIDA),
+                                              seed=semente, workers=workers, verbose=True)
+    d0_results, theta0_results = resultado.values[:, 0], resultado.values[:, 1]
+    print(resultado.timing_summary())
 
     # Estatística Final
     d0_mean, d0_std = np.mean(d0_results), np.std(d0_results)
@@ -66,6 +61,8 @@ def executar_jackknife(caminho, n_cortes=50):
         print("VEREDITO: Sinal ALTAMENTE ESTÁVEL. Invariante a cortes de dados.")
     else:
         print("VEREDITO: Sinal sensível a outliers.")
+    print(f"Pico de memória (RSS): {memory.peak_rss_label()}")
+    print(f"Cache de intermediários: {cache.stats_label()}")
 
     # Gráfico de Dispersão dos Parâmetros
     plt.figure(figsize=(8, 5))
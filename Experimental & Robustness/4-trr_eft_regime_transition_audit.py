@@ -1,5 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+import sys
+
+# Shared RRT kernels (trr_core) live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import instrumentation
 
 # ==============================================================================
 # RRT CONFIGURATION: EFFECTIVE FIELD THEORY (EFT) REGIME CALIBRATION
@@ -30,6 +36,7 @@ def calculate_chi_transition(grav_potential):
     
     return 1 / (1 + np.exp(exponent))
 
+@instrumentation.instrumented('eft_regime_calibration')
 def run_regime_calibration_audit():
     """
     Simulates RRT activation across different physical targets.
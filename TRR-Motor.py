@@ -1,142 +1,39 @@
 import streamlit as st
-import math
-import tempfile
-import os
-import matplotlib.pyplot as plt
-from fpdf import FPDF
+from functools import partial
 
-# ==========================================
-# CONSTANTES DA TEORIA TRR
-# ==========================================
-BETA = 0.028006
-A0 = 1.2001e-10
-G = 6.67430e-11
-C = 299792458.0
-
-def calcular_D_A(z1, z2):
-    if z1 >= z2: return 0.0
-    passos = 500
-    dz = (z2 - z1) / passos
-    integral = sum(1.0 / math.sqrt(0.3 * (1 + z1 + i*dz)**3 + 0.7) * dz for i in range(passos))
-    return ((299792.458 / 70.0) * integral / (1 + z2)) * 3.086e22
+# Constantes da TRR (BETA, A0, G, C) e física vetorizada: trr_core/motor.py
+# Textos da interface e dos relatórios (LANG): trr_core/idiomas.py
 
 # ==========================================
-# DICIONÁRIO PROFUNDO - AUDITORIA TÉCNICA
+# RECURSOS POR PROCESSO (PARTIDA A FRIO)
+# O Streamlit reexecuta este script a cada interação: tabelas estáticas e
+# importações pesadas ficam fora do corpo do script. A tela de idioma não
+# carrega nada além do Streamlit; pandas (via motor) e matplotlib/fpdf (via
+# relatorio) só são importados quando são de fato usados.
 # ==========================================
-LANG = {
-    "PT": {
-        "code": "PT", "btn_enter": "Entrar no Motor TRR", "welcome": "Selecione o seu idioma / Select your language",
-        "title": "🌌 Motor Cosmológico TRR", "author_prefix": "Autor", "theory_name": "Teoria da Relatividade Referencial",
-        "tab1": "📊 Dinâmica Galáctica", "tab2": "👁️ Óptica Cosmológica",
-        "rad": "Raio observado (kpc)", "vobs": "Veloc. Telescópio (km/s)", "vgas": "Velocidade Gás (km/s)", "vdisk": "Veloc. Disco (km/s)", "vbulge": "Veloc. Bojo/Haste (km/s)",
-        "calc": "🚀 Processar TRR", "clear": "🧹 Limpar Tudo", 
-        "zl": "Redshift Lente (z_L)", "zs": "Redshift Fonte (z_S)", "mest": "Massa Estelar Estimada (10^11 M_sol)", "theta": "Anel Einstein Observado (arcsec)", "cluster": "Aglomerado Gigante com Gás?",
-        "pdf_btn": "📄 Baixar Relatório de Auditoria (PDF)", "details": "📚 Ver Parecer Técnico e Matemático",
-        "precision": "Precisão de Unificação", "g_bar": "Física Clássica (Bariônica)", "g_trr": "Previsão TRR", "g_obs": "Telescópio (Real)",
-        "pdf_title_dyn": "RELATÓRIO DE AUDITORIA CIENTÍFICA - DINÂMICA", "pdf_title_opt": "RELATÓRIO DE AUDITORIA CIENTÍFICA - ÓPTICA",
-        "rep_dyn_text": """PARECER TÉCNICO DE DINÂMICA ROTACIONAL:
-1. DIAGNÓSTICO CLÁSSICO: Sob a métrica de Newton/Einstein, a massa bariônica detectada (Gás + Estrelas) gera uma velocidade de apenas {vbar} km/s. A discrepância para os {vobs} km/s observados é de {gap} km/s.
-2. FALHA DO MODELO LAMBDA-CDM: Para sustentar a física clássica, o modelo padrão é forçado a inventar 'ad hoc' halos de Matéria Escura que não interagem com a luz. Sem essa substância imaginária, a física local falha em descrever a galáxia.
-3. A SOLUÇÃO REFERENCIAL (TRR): A TRR não inventa massa. Aplicamos a Constante de Viscosidade do Vácuo (Beta = 0.028006). O 'mismatch' é resolvido pelo arraste viscoso do vácuo fluido.
-RESULTADO: Previsão de {vtrr} km/s com {prec}% de precisão, sem recorrer a matéria invisível.""",
-        "rep_opt_text": """PARECER TÉCNICO DE REFRAÇÃO TEMPORAL:
-1. LIMITE GEOMÉTRICO BARIÔNICO: A massa visível da lente gera um desvio gravitacional de apenas {tbar} arcsec. O telescópio detecta {tobs} arcsec.
-2. FALHA DO MODELO LAMBDA-CDM: A astrofísica clássica 'ad hoc' assume a existência de halos massivos invisíveis para amplificar a curvatura do espaço-tempo e fechar a conta dos dados.
-3. A SOLUÇÃO REFERENCIAL (TRR): A luz sofre Refração Temporal. Atravessando o vácuo viscoso (Fase 3), aplicamos o Índice de Refração de Cortez (eta_C = {etac}). O atraso de fase natural amplifica o desvio para {ttrr} arcsec.
-RESULTADO: Coincidência perfeita com a observação ({prec}%) baseada apenas na viscosidade do meio, tornando obsoleta a hipótese de matéria escura nestas lentes."""
-    },
-    "EN": {
-        "code": "EN", "btn_enter": "Enter TRR Engine", "welcome": "Select your language",
-        "title": "🌌 TRR Cosmological Engine", "author_prefix": "Author", "theory_name": "Referential Relativity Theory",
-        "tab1": "📊 Galactic Dynamics", "tab2": "👁️ Cosmological Optics",
-        "rad": "Observed Radius (kpc)", "vobs": "Telescope Vel. (km/s)", "vgas": "Gas Velocity (km/s)", "vdisk": "Disk Velocity (km/s)", "vbulge": "Bulge/Bar Vel. (km/s)",
-        "calc": "🚀 Process TRR", "clear": "🧹 Clear All", 
-        "zl": "Lens Redshift (z_L)", "zs": "Source Redshift (z_S)", "mest": "Est. Stellar Mass (10^11 M_sol)", "theta": "Observed Einstein Ring (arcsec)", "cluster": "Giant Gas Cluster?",
-        "pdf_btn": "📄 Download Audit Report (PDF)", "details": "📚 View Technical & Mathematical Opinion",
-        "precision": "Unification Accuracy", "g_bar": "Classical Physics (Baryonic)", "g_trr": "TRR Prediction", "g_obs": "Telescope (Real)",
-        "pdf_title_dyn": "SCIENTIFIC AUDIT REPORT - DYNAMICS", "pdf_title_opt": "SCIENTIFIC AUDIT REPORT - OPTICS",
-        "rep_dyn_text": """TECHNICAL DYNAMICS AUDIT:
-1. CLASSICAL DIAGNOSIS: Under Newton/Einstein metrics, the detected baryonic mass generates only {vbar} km/s. The discrepancy with the observed {vobs} km/s is {gap} km/s.
-2. LAMBDA-CDM FAILURE: To sustain classical physics, the standard model is forced to invent 'ad hoc' Dark Matter halos. Without this imaginary substance, local physics fails.
-3. REFERENTIAL SOLUTION (TRR): TRR adds no mass. We apply the Vacuum Viscosity (Beta = 0.028006). The 'mismatch' is resolved by the viscous drag of the fluid vacuum.
-RESULT: Predicted {vtrr} km/s with {prec}% accuracy, without resorting to invisible matter.""",
-        "rep_opt_text": """TECHNICAL REFRACTION AUDIT:
-1. BARYONIC GEOMETRIC LIMIT: Visible lens mass generates a deflection of only {tbar} arcsec. The telescope detects {tobs} arcsec.
-2. LAMBDA-CDM FAILURE: Classical astrophysics assumes 'ad hoc' invisible massive halos to amplify spacetime curvature.
-3. REFERENTIAL SOLUTION (TRR): Light undergoes Time Refraction. Crossing the viscous vacuum (Phase 3), we apply the Cortez Index (eta_C = {etac}). Natural phase delay amplifies deflection to {ttrr} arcsec.
-RESULT: Perfect match with observation ({prec}%) based solely on vacuum viscosity, making the dark matter hypothesis obsolete."""
-    }
-}
+@st.cache_resource(show_spinner=False)
+def carregar_idiomas():
+    from trr_core import idiomas
+    return idiomas.LANG
+
+@st.cache_resource(show_spinner=False)
+def carregar_motor():
+    # Grades de M/L e tabela de distâncias da cosmologia do motor, montadas uma vez
+    from trr_core import motor
+    motor.preparar_grades()
+    return motor
 
 # ==========================================
 # MOTORES GRÁFICOS E PDF (AUDITORIA)
+# Renderização em memória (sem arquivos temporários): trr_core/relatorio.py
 # ==========================================
-def criar_grafico(val_bar, val_trr, val_obs, lbl_bar, lbl_trr, lbl_obs, is_dyn=True):
-    fig, ax = plt.subplots(figsize=(7, 4))
-    labels = [lbl_bar, lbl_trr, lbl_obs]
-    valores = [val_bar, val_trr, val_obs]
-    cores = ['#e74c3c', '#3498db', '#2ecc71'] 
-    
-    barras = ax.bar(labels, valores, color=cores, width=0.6)
-    ax.set_ylabel("Vel. (km/s)" if is_dyn else "Dev (arcsec)", fontweight='bold')
-    ax.set_ylim(0, max(valores) * 1.3)
-    ax.grid(axis='y', linestyle='--', alpha=0.7)
-    
-    for barra in barras:
-        yval = barra.get_height()
-        ax.text(barra.get_x() + barra.get_width()/2, yval + (max(valores)*0.02), f'{yval:.2f}', ha='center', va='bottom', fontweight='bold', fontsize=10)
-        
-    plt.tight_layout()
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
-        fig.savefig(tmp.name, dpi=150)
-        plt.close(fig)
-        return tmp.name
-
-def gerar_pdf(is_dyn, dict_dados, L_original):
-    L_pdf = LANG["EN"] if L_original["code"] not in ["PT", "ES", "FR", "IT", "DE"] else L_original
-    
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # Cabeçalho Oficial
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(0, 10, txt="TEORIA DA RELATIVIDADE REFERENCIAL (TRR)", ln=True, align='C')
-    pdf.set_font("Arial", 'I', 10)
-    pdf.cell(0, 8, txt="Relatório de Auditoria Automatizada - Protocolo de Unificação", ln=True, align='C')
-    pdf.ln(5)
-    pdf.line(10, 30, 200, 30)
-    pdf.ln(10)
-    
-    # Título do Relatório
-    pdf.set_font("Arial", 'B', 12)
-    titulo = L_pdf["pdf_title_dyn"] if is_dyn else L_pdf["pdf_title_opt"]
-    pdf.cell(0, 10, txt=titulo, ln=True)
-    pdf.ln(5)
-    
-    # Texto de Diagnóstico
-    pdf.set_font("Arial", size=11)
-    if is_dyn:
-        texto = L_pdf["rep_dyn_text"].format(vbar=f"{dict_dados['vbar']:.2f}", vobs=f"{dict_dados['vobs']:.2f}", gap=f"{dict_dados['vobs'] - dict_dados['vbar']:.2f}", vtrr=f"{dict_dados['vtrr']:.2f}", prec=f"{dict_dados['prec']:.2f}")
-        img_path = criar_grafico(dict_dados['vbar'], dict_dados['vtrr'], dict_dados['vobs'], L_pdf["g_bar"], L_pdf["g_trr"], L_pdf["g_obs"], True)
-    else:
-        texto = L_pdf["rep_opt_text"].format(tbar=f"{dict_dados['tbar']:.2f}", tobs=f"{dict_dados['tobs']:.2f}", etac=f"{dict_dados['etac']:.5f}", ttrr=f"{dict_dados['ttrr']:.2f}", prec=f"{dict_dados['prec']:.2f}")
-        img_path = criar_grafico(dict_dados['tbar'], dict_dados['ttrr'], dict_dados['tobs'], L_pdf["g_bar"], L_pdf["g_trr"], L_pdf["g_obs"], False)
-
-    for linha in texto.split('\n'):
-        # Normalização latin-1 simplificada
-        linha_limpa = linha.encode('latin-1', 'replace').decode('latin-1')
-        pdf.multi_cell(0, 7, txt=linha_limpa)
-    
-    pdf.ln(10)
-    pdf.image(img_path, x=20, w=170)
-    os.unlink(img_path)
-    
-    # Rodapé de Autenticidade
-    pdf.set_y(-30)
-    pdf.set_font("Arial", 'I', 8)
-    pdf.cell(0, 10, txt="Este documento prova a redundância da matéria escura através da aplicação da constante Beta.", align='C', ln=True)
-    
-    return pdf.output(dest='S').encode('latin-1', 'replace')
+@st.cache_data(show_spinner=False, max_entries=64)
+def gerar_pdf_memo(is_dyn, dict_dados, codigo_idioma):
+    # Memoizado por resultado + idioma; chamado apenas quando o download é pedido
+    # (matplotlib e fpdf são importados aqui, no primeiro relatório do processo)
+    from trr_core import relatorio
+    LANG = carregar_idiomas()
+    return relatorio.gerar_pdf(is_dyn, dict_dados, LANG.get(codigo_idioma, LANG["EN"]))
 
 # ==========================================
 # INTERFACE DO STREAMLIT
@@ -158,6 +55,8 @@ if st.session_state['idioma_selecionado'] is None:
         st.rerun()
 
 else:
+    LANG = carregar_idiomas()
+    motor = carregar_motor()
     L = LANG.get(st.session_state['idioma_selecionado'], LANG["EN"])
     
     with st.sidebar:
@@ -171,7 +70,7 @@ else:
     aba1, aba2 = st.tabs([L["tab1"], L["tab2"]])
 
     def limpar_dados():
-        for key in ['res_dyn', 'res_opt']:
+        for key in ['res_dyn', 'res_opt', 'res_lote_dyn', 'res_lote_opt']:
             if key in st.session_state: del st.session_state[key]
         for key in ['d_rad', 'd_vobs', 'd_vgas', 'd_vdisk', 'd_vbulge', 'o_zl', 'o_zs', 'o_mest', 'o_theta']:
             st.session_state[key] = 0.0
@@ -191,27 +90,9 @@ else:
         colA, colB = st.columns(2)
         if colA.button(L["calc"], type="primary", use_container_width=True, key="b1"):
             if rad > 0 and v_obs > 0:
-                melhor_erro, melhor_v_trr, v_bar_pura = float('inf'), 0, 0
-                for ml_x in range(10, 101):
-                    ml_disk = ml_x / 100.0
-                    ml_bulge = ml_disk + 0.2
-                    v_bar_sq = (v_gas**2) + (ml_disk * v_disk**2) + (ml_bulge * v_bulge**2)
-                    if v_bar_sq < 0: continue
-                    
-                    g_bar = (v_bar_sq * 1e6) / (rad * 3.086e19)
-                    g_obs = (v_obs**2 * 1e6) / (rad * 3.086e19)
-                    x = g_bar / A0
-                    g_fase = g_bar / (1 - math.exp(-math.sqrt(x)))
-                    fator_impacto = v_bulge / (v_disk + abs(v_gas) + 0.1)
-                    g_trr = g_fase * (1 + BETA * fator_impacto)
-                    
-                    erro = abs(g_obs - g_trr) / g_obs
-                    if erro < melhor_erro:
-                        melhor_erro = erro
-                        melhor_v_trr = math.sqrt((g_trr * rad * 3.086e19) / 1e6)
-                        v_bar_pura = math.sqrt(v_bar_sq) 
-                
-                st.session_state['res_dyn'] = {'vtrr': melhor_v_trr, 'prec': max(0, 100 - (melhor_erro*100)), 'vbar': v_bar_pura, 'vobs': v_obs}
+                # Busca de M/L vetorizada (mesmo núcleo do modo em lote)
+                ajuste = motor.ajustar_dinamica(rad, v_obs, v_gas, v_disk, v_bulge)
+                st.session_state['res_dyn'] = {'vtrr': float(ajuste['vtrr']), 'prec': float(ajuste['prec']), 'vbar': float(ajuste['vbar']), 'vobs': v_obs}
         
         colB.button(L["clear"], on_click=limpar_dados, use_container_width=True, key="c1")
 
@@ -220,8 +101,24 @@ else:
             st.success(f"**{L['precision']}:** {res['prec']:.2f}%")
             with st.expander(L["details"]):
                 st.info(L["rep_dyn_text"].format(vbar=f"{res['vbar']:.2f}", vobs=f"{res['vobs']:.2f}", gap=f"{res['vobs']-res['vbar']:.2f}", vtrr=f"{res['vtrr']:.2f}", prec=f"{res['prec']:.2f}"))
-            pdf_bytes = gerar_pdf(True, res, L)
-            st.download_button(L["pdf_btn"], data=pdf_bytes, file_name="Auditoria_Dinamica_TRR.pdf", mime="application/pdf", use_container_width=True)
+            # PDF gerado sob demanda: o Streamlit só chama a função no clique de download
+            st.download_button(L["pdf_btn"], data=partial(gerar_pdf_memo, True, res, L["code"]), file_name="Auditoria_Dinamica_TRR.pdf", mime="application/pdf", use_container_width=True)
+
+        # --- MODO EM LOTE: CURVAS DE ROTAÇÃO COMPLETAS ---
+        with st.expander(L["batch_dyn"]):
+            arquivos_dyn = st.file_uploader(L["batch_upload_dyn"], type=["dat", "csv", "txt"], accept_multiple_files=True, key="d_lote")
+            if st.button(L["batch_btn"], use_container_width=True, key="b3") and arquivos_dyn:
+                try:
+                    tabela = motor.ler_tabelas_rotacao(arquivos_dyn)
+                    st.session_state['res_lote_dyn'] = motor.processar_lote_dinamica(tabela)
+                except ValueError as erro:
+                    st.error(str(erro))
+
+            if 'res_lote_dyn' in st.session_state:
+                lote = st.session_state['res_lote_dyn']
+                st.success(f"**{L['batch_summary']}:** {len(lote)} | **{L['precision']}:** {lote['prec'].mean():.2f}%")
+                st.dataframe(lote, use_container_width=True)
+                st.download_button(L["batch_download"], data=lote.to_csv(index=False).encode('utf-8'), file_name="Lote_Dinamica_TRR.csv", mime="text/csv", use_container_width=True)
 
     # --- ABA 2: ÓPTICA COSMOLÓGICA ---
     with aba2:
@@ -237,22 +134,9 @@ else:
         colC, colD = st.columns(2)
         if colC.button(L["calc"], type="primary", use_container_width=True, key="b2"):
             if zl > 0 and zs > zl and theta > 0 and mest > 0:
-                D_L, D_S, D_LS = calcular_D_A(0, zl), calcular_D_A(0, zs), calcular_D_A(zl, zs)
-                melhor_erro, melhor_theta_trr, t_bar_pura, melhor_etac = float('inf'), 0, 0, 0
-                for fator_ml in [x/100.0 for x in range(50, 251)]:
-                    mult_gas = 7.0 if is_cluster else 1.0
-                    M_bar_kg = (mest * fator_ml * mult_gas) * 1e11 * 1.989e30
-                    termo_massa = (4 * G * M_bar_kg) / (C**2)
-                    theta_bar_rad = math.sqrt(termo_massa * (D_LS / (D_L * D_S)))
-                    g_bar = (G * M_bar_kg) / ((theta_bar_rad * D_L)**2)
-                    x = g_bar / A0
-                    fator_fase = 1.0 / (1.0 - math.exp(-math.sqrt(x)))
-                    eta_C = 1.0 + BETA * math.log(1 + zl)
-                    theta_trr = theta_bar_rad * math.sqrt(fator_fase) * eta_C * 206264.806
-                    erro = abs(theta - theta_trr) / theta
-                    if erro < melhor_erro:
-                        melhor_erro, melhor_theta_trr, t_bar_pura, melhor_etac = erro, theta_trr, theta_bar_rad * 206264.806, eta_C
-                st.session_state['res_opt'] = {'ttrr': melhor_theta_trr, 'prec': max(0, 100 - (melhor_erro*100)), 'tbar': t_bar_pura, 'tobs': theta, 'etac': melhor_etac}
+                # Busca de fator M/L vetorizada (mesmo núcleo do modo em lote)
+                ajuste = motor.ajustar_optica(zl, zs, mest, theta, is_cluster)
+                st.session_state['res_opt'] = {'ttrr': float(ajuste['ttrr']), 'prec': float(ajuste['prec']), 'tbar': float(ajuste['tbar']), 'tobs': theta, 'etac': float(ajuste['etac'])}
 
         colD.button(L["clear"], on_click=limpar_dados, use_container_width=True, key="c2")
 
@@ -261,5 +145,19 @@ else:
             st.success(f"**{L['precision']}:** {res['prec']:.2f}%")
             with st.expander(L["details"]):
                 st.info(L["rep_opt_text"].format(tbar=f"{res['tbar']:.2f}", tobs=f"{res['tobs']:.2f}", etac=f"{res['etac']:.5f}", ttrr=f"{res['ttrr']:.2f}", prec=f"{res['prec']:.2f}"))
-            pdf_bytes2 = gerar_pdf(False, res, L)
-            st.download_button(L["pdf_btn"], data=pdf_bytes2, file_name="Auditoria_Optica_TRR.pdf", mime="application/pdf", use_container_width=True)
\ No newline at end of file
+            st.download_button(L["pdf_btn"], data=partial(gerar_pdf_memo, False, res, L["code"]), file_name="Auditoria_Optica_TRR.pdf", mime="application/pdf", use_container_width=True)
+
+        # --- MODO EM LOTE: CATÁLOGO DE LENTES ---
+        with st.expander(L["batch_opt"]):
+            arquivo_opt = st.file_uploader(L["batch_upload_opt"], type=["csv"], key="o_lote")
+            if st.button(L["batch_btn"], use_container_width=True, key="b4") and arquivo_opt is not None:
+                try:
+                    st.session_state['res_lote_opt'] = motor.processar_lote_optica(motor.ler_catalogo_lentes(arquivo_opt))
+                except ValueError as erro:
+                    st.error(str(erro))
+
+            if 'res_lote_opt' in st.session_state:
+                lote = st.session_state['res_lote_opt']
+                st.success(f"**{L['batch_summary_opt']}:** {len(lote)} | **{L['precision']}:** {lote['prec'].mean():.2f}%")
+                st.dataframe(lote, use_container_width=True)
+                st.download_button(L["batch_download"], data=lote.to_csv(index=False).encode('utf-8'), file_name="Lote_Optica_TRR.csv", mime="text/csv", use_container_width=True)
\ No newline at end of file
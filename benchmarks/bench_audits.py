@@ -0,0 +1,406 @@
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# ==============================================================================
+# BENCHMARK: AUDIT PIPELINES ON SYNTHETIC CATALOGS (10^3 ... 10^7 ROWS)
+# Times the ingest / filter / fit / plot stages of the data-driven audits
+# (plus the optimized path and the full audit function end to end) on inputs
+# written by benchmarks/synthetic.py, records the peak memory after each
+# stage, and checks that every optimized path reproduces its reference
+# (closed form vs least_squares, streaming vs in-memory, vectorized SP3 and
+# SPARC readers vs line-by-line parsing) within tolerance.
+# Each (audit, size) runs in a fresh process, so peak RSS belongs to that run
+# alone; the intermediate cache and shared dataset cache are disabled.
+# Usage: python benchmarks/bench_audits.py --sizes 1e3,1e4,1e5,1e6 --save baseline.json
+#        python benchmarks/bench_audits.py --compare baseline.json
+# ==============================================================================
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from benchmarks import synthetic
+
+CORE_DIR = 'Core Cosmological Audits'
+CRITICAL_DIR = 'Critical Falsification Tests'
+DEFAULT_SIZES = '1e3,1e4,1e5,1e6'
+DEFAULT_TOLERANCE = 0.25     # Relative slow-down (or memory growth) reported as a regression
+MIN_SECONDS = 0.05           # Stages faster than this are below timer noise
+MIN_RSS_MB = 20.0
+
+def load_script(folder, filename):
+    """Imports an audit script (its folder name is not a package) as a module."""
+    name = 'bench_' + os.path.splitext(filename)[0].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, folder, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class StageTimer:
+    """Wall time and running peak RSS (MB) of consecutive named stages."""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        from trr_core import memory
+        start = time.perf_counter()
+        yield
+        self.stages[name] = {'seconds': time.perf_counter() - start, 'peak_rss_mb': memory.peak_rss_mb()}
+
+def check(name, value, reference, tolerance):
+    """Reference check: max relative error of value against reference (NaN must match NaN)."""
+    value, reference = np.asarray(value, dtype=float), np.asarray(reference, dtype=float)
+    if value.shape != reference.shape:
+        return {'name': name, 'error': None, 'tolerance': tolerance, 'passed': False,
+                'detail': f"shape {value.shape} != {reference.shape}"}
+    missing = np.isnan(reference)
+    if np.any(np.isnan(value) != missing):
+        return {'name': name, 'error': None, 'tolerance': tolerance, 'passed': False,
+                'detail': f"NaN in {int(np.isnan(value).sum())} values, {int(missing.sum())} in the reference"}
+    value, reference = value[~missing], reference[~missing]
+    scale = np.maximum(np.abs(reference), 1e-300)
+    error = float(np.max(np.abs(value - reference) / scale)) if value.size else 0.0
+    return {'name': name, 'error': error, 'tolerance': tolerance, 'passed': bool(error <= tolerance)}
+
+def _end_to_end(timer, data_dir, run):
+    """Runs the real audit function in the data directory with its report silenced."""
+    import matplotlib.pyplot as plt
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        with timer.stage('end_to_end'), open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+            run()
+    finally:
+        plt.close('all')
+        os.chdir(cwd)
+
+def _save_figure(draw, data_dir, name):
+    from trr_core import plotting
+    plotting.render_in_background(draw, os.path.join(data_dir, name)).result()
+
+# --- Audits ------------------------------------------------------------------
+
+def bench_jackknife(data_dir, timer, end_to_end):
+    from trr_core import catalogs, precession, resampling
+    audit = load_script(CORE_DIR, '3-trr_sdss_jackknife_stability_audit.py')
+    path = os.path.join(data_dir, synthetic.SDSS_FILE)
+    with timer.stage('ingest'):
+        cols = catalogs.read_fits_columns(path, precession.STRATUM_COLUMNS)
+    with timer.stage('filter'):
+        z_min, z_max = precession.STRATUM_Z_RANGE
+        mask = (cols['z'] >= z_min) & (cols['z'] <= z_max) & (cols['mag'] > 0)
+        data = {'ra': cols['ra'][mask], 'z': cols['z'][mask],
+                'mag_res': cols['mag'][mask] - 5 * np.log10(cols['z'][mask])}
+    n = len(data['z'])
+    with timer.stage('fit'):
+        n_blocks = min(audit.N_BLOCKS, n)
+        block_ids = precession.assign_blocks(n, n_blocks, audit.RESAMPLING_SEED)
+        block_sums = precession.sufficient_statistics(data['ra'], data['z'], data['mag_res'], audit.OMEGA_P,
+                                                      block_ids, n_blocks)
+        result = resampling.run_resampling(precession.solve_block_subset, block_sums, 50, scheme='jackknife',
+                                           d=resampling.delete_d_for_fraction(n_blocks, audit.KEEP_FRACTION),
+                                           seed=audit.RESAMPLING_SEED, workers=1, n=n_blocks)
+    with timer.stage('reference_fit'):
+        d0_ls, theta_ls = audit.fit_jackknife_subset(data, np.arange(n), tolerance=1e-12)
+
+    def draw(fig):
+        ax = fig.add_subplot(111)
+        ax.scatter(result.values[:, 1], result.values[:, 0], alpha=0.6)
+    with timer.stage('plot'):
+        _save_figure(draw, data_dir, 'bench_jackknife.png')
+
+    d0_cf, theta_cf = precession.solve(block_sums.sum(axis=0), audit.NOMINAL_DIRECTION)
+    checks = [check('closed form d0 vs least_squares', d0_cf, d0_ls, 1e-6),
+              check('closed form theta0 vs least_squares', theta_cf, theta_ls, 1e-6)]
+    if end_to_end:
+        _end_to_end(timer, data_dir, lambda: audit.run_jackknife_stability_test(synthetic.SDSS_FILE, workers=1))
+    return checks
+
+def bench_topological(data_dir, timer, end_to_end):
+    import pandas as pd
+    from trr_core import catalogs
+    audit = load_script(CRITICAL_DIR, '4-trr_topological_anisotropy_audit.py')
+    path = os.path.join(data_dir, synthetic.SDSS_FILE)
+    with timer.stage('ingest'):
+        df = pd.DataFrame(catalogs.read_fits_columns(path, ['RA', 'DEC', 'Z_VI', 'Z_MGII']))
+    with timer.stage('fit'):
+        reference = audit.compute_anomaly_rates(df)
+    del df
+    with timer.stage('streaming'):
+        streamed = audit.stream_anomaly_rates(path)
+
+    def draw(fig):
+        ax = fig.add_subplot(111)
+        ax.bar(np.arange(len(streamed)), streamed.to_numpy())
+    with timer.stage('plot'):
+        _save_figure(draw, data_dir, 'bench_topological.png')
+
+    checks = [check('streaming vs pd.cut/groupby rates', streamed.to_numpy(), reference.to_numpy(), 1e-12)]
+    if end_to_end:
+        _end_to_end(timer, data_dir, audit.run_topological_alignment_audit)
+    return checks
+
+def bench_smbh_growth(data_dir, timer, end_to_end):
+    from scipy.integrate import quad
+    from trr_core import catalogs, cosmology, plotting
+    audit = load_script(CRITICAL_DIR, '5-trr_blackhole_growth_causality_audit.py')
+    path = os.path.join(data_dir, synthetic.SDSS_FILE)
+    with timer.stage('ingest'):
+        cols = catalogs.read_fits_columns(path, {'z': 'Z', 'mag_r': ('PSFMAG', 2)})
+    with timer.stage('filter'):
+        mask = (cols['z'] > 5.0) & (cols['mag_r'] > 0) & (cols['mag_r'] < 30)
+        z, mag = cols['z'][mask], cols['mag_r'][mask]
+    with timer.stage('fit'):
+        dl = (3e5 / audit.H0_LCDM) * z * (1 + z / 2)
+        m_bh = 10**(0.5 * (15 - (mag - 5 * np.log10(dl * 1e5)) / 2.5) + 6.5)
+        t_required = audit.TAU_SALPETER * np.log(m_bh / audit.M_SEED)
+        t_available = audit.get_lcdm_age(z)
+
+    def draw(fig):
+        ax = fig.add_subplot(111)
+        plotting.density_layer(ax, z, t_required / 1e9, color='#c0392b', label='required')
+        plotting.density_layer(ax, z, t_available / 1e9, color='#2c3e50', label='available')
+    with timer.stage('plot'):
+        _save_figure(draw, data_dir, 'bench_smbh.png')
+
+    # Reference: direct quadrature of the Lambda-CDM age integral on a subsample
+    om = audit.OM_LCDM
+    hubble_time = cosmology.HUBBLE_TIME_YR / audit.H0_LCDM
+    sample = z[:: max(1, len(z) // 50)]
+    reference = [hubble_time * quad(lambda x: 1 / ((1 + x) * np.sqrt(om * (1 + x)**3 + 1 - om)), zi, np.inf,
+                                    epsabs=0, epsrel=1e-12, limit=200)[0] for zi in sample]
+    checks = [check('age_at_z lookup vs quad', audit.get_lcdm_age(sample), reference, 1e-6)]
+    if end_to_end:
+        _end_to_end(timer, data_dir, lambda: audit.run_causality_growth_audit(synthetic.SDSS_FILE))
+    return checks
+
+def bench_phase_drag(data_dir, timer, end_to_end):
+    from scipy.optimize import curve_fit
+    from trr_core import catalogs
+    audit = load_script(CORE_DIR, '5-trr_phase_drag_and_magnitude_audit.py')
+    path = os.path.join(data_dir, synthetic.KIDS_FILE)
+    with timer.stage('ingest'):
+        cols = catalogs.read_fits_columns(path, audit.select_columns(path))
+    with timer.stage('filter'):
+        z_f, t_lost = audit.compute_t_lost(cols['z'], cols['mag_r'])
+    with timer.stage('reference_fit'):
+        popt, _ = curve_fit(audit.rrt_drag_model, z_f, t_lost)
+    with timer.stage('streaming'):
+        acc = audit.accumulate_phase_drag(path)
+        eta, _ = audit.solve_phase_drag(acc)
+
+    def draw(fig):
+        ax = fig.add_subplot(111)
+        filled = acc['bin_n'] > 0
+        ax.plot(acc['bin_z'][filled] / acc['bin_n'][filled], acc['bin_t'][filled] / acc['bin_n'][filled], 'o')
+    with timer.stage('plot'):
+        _save_figure(draw, data_dir, 'bench_phase_drag.png')
+
+    checks = [check('streaming closed-form eta vs curve_fit', eta, popt[0], 1e-6)]
+    if end_to_end:
+        _end_to_end(timer, data_dir, lambda: audit.run_phase_drag_audit(synthetic.KIDS_FILE))
+    return checks
+
+def bench_sparc(data_dir, timer, end_to_end):
+    import pandas as pd
+    from trr_core import sparc
+    audit = load_script(CORE_DIR, '4-trr_sparc_rotation_audit.py')
+    folder = os.path.join(data_dir, synthetic.SPARC_DIR)
+    cache_path = sparc.default_cache_path(folder)
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    with timer.stage('ingest'):
+        sparc.build_cache(folder)
+    with timer.stage('filter'):
+        columns, names, offsets = audit.load_sparc_catalog(folder)
+    with timer.stage('fit'):
+        residuals = audit.compute_edge_residuals(columns, offsets)
+
+    # Reference: one pandas parse and one scalar-law pass per galaxy; the mean
+    # skips NaN residuals like the original audit (synthetic.write_rotmod
+    # truncates the last row of some galaxies to exercise this)
+    with timer.stage('reference_fit'):
+        reference = []
+        for name in sorted(f for f in os.listdir(folder) if f.endswith('.dat')):
+            table = sparc.parse_rotmod(os.path.join(folder, name))
+            table = table[~(np.isnan(table[:, 0]) | np.isnan(table[:, 1]))]
+            if len(table) == 0:
+                continue
+            edge = table[table[:, 0] > table[:, 0].max() * 0.8]
+            if len(edge):
+                predicted = [audit.apply_cortez_law(r, g, d, b) for r, g, d, b in edge[:, [0, 3, 4, 5]]]
+                reference.append(pd.Series(edge[:, 1] - np.array(predicted)).mean())
+
+    checks = [check('vectorized edge residuals vs per-galaxy loop', residuals, reference, 1e-9)]
+    if end_to_end:
+        _end_to_end(timer, data_dir, audit.run_strict_sparc_audit)
+    return checks
+
+def bench_lageos(data_dir, timer, end_to_end):
+    from trr_core import lageos_archive, plotting, sp3
+    audit = load_script(CORE_DIR, '1-trr_lageos_pnb_shielding_audit.py')
+    path = os.path.join(data_dir, synthetic.SP3_FILE)
+    with timer.stage('ingest'):
+        records = sp3.read_sp3(path)
+    with timer.stage('filter'):
+        positions = sp3.positions(sp3.select_satellite(records, sp3.LAGEOS2_ID))
+    with timer.stage('fit'):
+        ra, radius, alignment = lageos_archive.radial_alignment(positions, audit.CORTEZ_AXIS_RA)
+        pearson = np.corrcoef(alignment, radius - radius.mean())[0, 1]
+
+    def draw(fig):
+        ax = fig.add_subplot(111)
+        plotting.density_layer(ax, ra, radius - radius.mean(), color='#2c3e50', label='residual')
+    with timer.stage('plot'):
+        _save_figure(draw, data_dir, 'bench_lageos.png')
+
+    # Reference: line-by-line parse of the LAGEOS-2 position records
+    with timer.stage('reference_ingest'):
+        reference = []
+        with open(path, 'r') as f:
+            for line in f:
+                if line.startswith('P' + sp3.LAGEOS2_ID):
+                    reference.append([float(line[4:18]), float(line[18:32]), float(line[32:46])])
+    moments = lageos_archive.CorrelationMoments.from_arrays(radius, alignment)
+    checks = [check('vectorized SP3 positions vs line parser', positions, np.array(reference), 0.0),
+              check('running-moment Pearson vs corrcoef', moments.pearson(), pearson, 1e-9)]
+    if end_to_end:
+        _end_to_end(timer, data_dir, lambda: audit.run_lageos_shielding_audit(None))
+    return checks
+
+# name: (bench function, synthetic inputs it needs)
+AUDITS = {
+    'core-1-lageos': (bench_lageos, ('sp3',)),
+    'core-3-jackknife': (bench_jackknife, ('sdss',)),
+    'core-4-sparc': (bench_sparc, ('sparc',)),
+    'core-5-phase-drag': (bench_phase_drag, ('kids',)),
+    'critical-4-topological': (bench_topological, ('sdss',)),
+    'critical-5-smbh-growth': (bench_smbh_growth, ('sdss',)),
+}
+
+def _init_worker():
+    os.environ['MPLBACKEND'] = 'Agg'
+    os.environ['TRR_CACHE_MAX_MB'] = '0'
+    os.environ.pop('TRR_DATASET_CACHE', None)
+
+def _run_one(name, data_dir, end_to_end):
+    """Worker: one audit at one size. Returns its stages, checks and peak RSS."""
+    from trr_core import memory
+    timer = StageTimer()
+    bench, _ = AUDITS[name]
+    checks = bench(data_dir, timer, end_to_end)
+    return {'stages': timer.stages, 'checks': checks, 'peak_rss_mb': memory.peak_rss_mb()}
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(sizes, names, workdir, end_to_end=True, verbose=True):
+    """Runs every selected audit at every size. Returns the results document (JSON-serializable)."""
+    results = {'meta': {'revision': _git_revision(), 'python': platform.python_version(),
+                        'numpy': np.__version__, 'platform': platform.platform(),
+                        'cpus': os.cpu_count(), 'created': time.strftime('%Y-%m-%dT%H:%M:%S')},
+               'results': {}}
+    for size in sizes:
+        data_dir = os.path.join(workdir, f"n{size}")
+        needed = sorted({dataset for name in names for dataset in AUDITS[name][1]})
+        if verbose:
+            print(f"-> {size} rows: preparing synthetic inputs in {data_dir}")
+        synthetic.write_dataset(data_dir, size, needed, verbose=verbose)
+        for name in names:
+            # A fresh process per run: peak RSS is that audit's own
+            with ProcessPoolExecutor(max_workers=1, initializer=_init_worker, max_tasks_per_child=1) as pool:
+                run = pool.submit(_run_one, name, data_dir, end_to_end).result()
+            results['results'].setdefault(name, {})[str(size)] = run
+            if verbose:
+                stages = ' | '.join(f"{stage} {s['seconds']:.3f} s" for stage, s in run['stages'].items())
+                failed = [c['name'] for c in run['checks'] if not c['passed']]
+                print(f"   {name:<24} {stages} | peak {run['peak_rss_mb']:.0f} MB"
+                      + (f" | FAILED: {', '.join(failed)}" if failed else ""))
+    return results
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of current against baseline: stages slower by more than
+    tolerance (and MIN_SECONDS), peak memory grown by more than tolerance (and
+    MIN_RSS_MB), and failed reference checks. Returns a list of messages.
+    """
+    problems = []
+    for name, by_size in current['results'].items():
+        for size, run in by_size.items():
+            problems += [f"{name} @ {size}: check failed: {c['name']} (error {c['error']}, tolerance {c['tolerance']})"
+                         for c in run['checks'] if not c['passed']]
+            base = baseline['results'].get(name, {}).get(size)
+            if base is None:
+                continue
+            for stage, timing in run['stages'].items():
+                old = base['stages'].get(stage)
+                if old and timing['seconds'] > old['seconds'] * (1 + tolerance) \
+                        and timing['seconds'] - old['seconds'] > MIN_SECONDS:
+                    problems.append(f"{name} @ {size}: {stage} {old['seconds']:.3f} s -> {timing['seconds']:.3f} s "
+                                    f"(x{timing['seconds'] / old['seconds']:.2f})")
+            old_rss, new_rss = base.get('peak_rss_mb'), run.get('peak_rss_mb')
+            if old_rss and new_rss and new_rss > old_rss * (1 + tolerance) and new_rss - old_rss > MIN_RSS_MB:
+                problems.append(f"{name} @ {size}: peak memory {old_rss:.0f} MB -> {new_rss:.0f} MB")
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RRT audit benchmark suite on synthetic catalogs")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Comma-separated row counts (10^7 = 1e7)")
+    parser.add_argument('--audits', default=','.join(AUDITS), help="Comma-separated audit names")
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'trr_bench_data'),
+                        help="Synthetic inputs are written (and reused) here")
+    parser.add_argument('--no-end-to-end', action='store_true', help="Skip the full audit runs")
+    parser.add_argument('--save', help="Write the results as a JSON baseline")
+    parser.add_argument('--compare', help="Baseline JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    sizes = [int(float(s)) for s in args.sizes.split(',')]
+    names = args.audits.split(',')
+    unknown = [n for n in names if n not in AUDITS]
+    if unknown:
+        parser.error(f"unknown audit(s): {', '.join(unknown)} (choose from {', '.join(AUDITS)})")
+
+    print("="*80)
+    print("RRT BENCHMARK: AUDIT PIPELINES ON SYNTHETIC CATALOGS")
+    print(f"Sizes: {', '.join(str(s) for s in sizes)} | Audits: {len(names)}")
+    print("="*80)
+    results = run_suite(sizes, names, args.workdir, end_to_end=not args.no_end_to_end)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"-> Baseline saved: {args.save}")
+
+    failed_checks = [c for by_size in results['results'].values() for run in by_size.values()
+                     for c in run['checks'] if not c['passed']]
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        problems = compare(results, baseline, args.tolerance)
+        print("-" * 80)
+        print(f"Comparison with {args.compare} (revision {baseline['meta'].get('revision')}, "
+              f"tolerance {args.tolerance:.0%}):")
+        for problem in problems:
+            print(f"   REGRESSION: {problem}")
+        if not problems:
+            print("   No regressions.")
+        return 1 if problems else 0
+    return 1 if failed_checks else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# ==============================================================================
+# BENCHMARK: TRR ENGINE COLD START AND RERUN OVERHEAD (STREAMLIT APP)
+# Every sample runs in a freshly spawned interpreter (nothing imported yet) and
+# drives TRR-Motor.py headlessly with streamlit.testing (AppTest):
+#   import          import streamlit (framework floor)
+#   first render    first run of the script: the language-selection screen
+#   enter engine    first run after a language is chosen (engine tabs)
+#   rerun           median of further engine-screen runs (cost of every interaction)
+#   new session     language screen + engine screen of a second session in the
+#                   same, now warm, process (what st.cache_resource buys)
+#   first report    first PDF of the process (deferred matplotlib/fpdf import)
+# --baseline times another version of the app side by side, e.g.
+#   git show <rev>:TRR-Motor.py > /tmp/TRR-Motor-old.py
+# Usage: python benchmarks/bench_motor_startup.py --samples 5 --reruns 20
+# ==============================================================================
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(ROOT, "TRR-Motor.py")
+METRICS = ['import', 'first_render', 'enter_engine', 'rerun', 'new_session', 'first_report']
+APP_TIMEOUT = 120
+
+RES_DYN = {'vtrr': 149.97, 'prec': 99.96, 'vbar': 92.74, 'vobs': 150.0}
+
+def _timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def _check(app, script):
+    if app.exception:
+        raise RuntimeError(f"{script}: {app.exception[0].message}")
+
+def measure_startup(script, n_reruns, language="PT"):
+    """Worker (fresh interpreter): seconds per metric for one cold start of the app script."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    # Bare-mode warnings (empty selectbox label, missing ScriptRunContext) are noise here
+    logging.disable(logging.WARNING)
+    timings = {}
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    timings['import'] = time.perf_counter() - start
+
+    app = AppTest.from_file(script, default_timeout=APP_TIMEOUT)
+    timings['first_render'] = _timed(app.run)
+    _check(app, script)
+    app.session_state['idioma_selecionado'] = language
+    timings['enter_engine'] = _timed(app.run)
+    _check(app, script)
+    timings['rerun'] = statistics.median(_timed(app.run) for _ in range(n_reruns))
+
+    def new_session():
+        session = AppTest.from_file(script, default_timeout=APP_TIMEOUT)
+        session.run()
+        session.session_state['idioma_selecionado'] = language
+        session.run()
+        _check(session, script)
+    timings['new_session'] = _timed(new_session)
+
+    def first_report():
+        from trr_core import idiomas, relatorio
+        relatorio.gerar_pdf(True, RES_DYN, idiomas.LANG[language])
+    timings['first_report'] = _timed(first_report)
+    return timings
+
+def run_samples(script, n_samples, n_reruns):
+    """Median of each metric over n_samples cold starts (one spawned process each)."""
+    context = multiprocessing.get_context('spawn')
+    samples = []
+    for _ in range(n_samples):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            samples.append(pool.submit(measure_startup, script, n_reruns).result())
+    return {m: statistics.median(s[m] for s in samples) for m in METRICS}
+
+def main():
+    parser = argparse.ArgumentParser(description="TRR engine (Streamlit) cold start benchmark")
+    parser.add_argument("--samples", type=int, default=5, help="Cold starts per app script")
+    parser.add_argument("--reruns", type=int, default=20, help="Engine-screen reruns per cold start")
+    parser.add_argument("--script", default=APP_SCRIPT, help="App script to time (default: TRR-Motor.py)")
+    parser.add_argument("--baseline", default=None, help="Another version of the app script to compare against")
+    parser.add_argument("--save", default=None, help="Writes the medians as JSON")
+    args = parser.parse_args()
+
+    print("="*80)
+    print("TRR ENGINE BENCHMARK: STREAMLIT COLD START")
+    print(f"Cold starts: {args.samples} | Reruns per start: {args.reruns}")
+    print("="*80)
+    results = {'current': run_samples(os.path.abspath(args.script), args.samples, args.reruns)}
+    if args.baseline:
+        results['baseline'] = run_samples(os.path.abspath(args.baseline), args.samples, args.reruns)
+
+    header = f"{'Metric':<16} {'Current (ms)':>14}"
+    if args.baseline:
+        header += f" {'Baseline (ms)':>14} {'Speed-up':>9}"
+    print(header)
+    print("-" * len(header))
+    for metric in METRICS:
+        line = f"{metric:<16} {results['current'][metric] * 1e3:14.1f}"
+        if args.baseline:
+            before, after = results['baseline'][metric], results['current'][metric]
+            line += f" {before * 1e3:14.1f} {before / after:8.2f}x"
+        print(line)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"-> Results saved: {args.save}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# ==============================================================================
+# BENCHMARK: AUDIT REPORT PIPELINE (TRR ENGINE)
+# Compares the legacy report path (pyplot figure + temporary PNG at 150 dpi,
+# read back by FPDF) with the in-memory path in trr_core/relatorio.py.
+# Usage: python benchmarks/bench_relatorios.py --reports 30
+# ==============================================================================
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+from trr_core import idiomas, relatorio
+
+RES_DYN = {'vtrr': 149.97, 'prec': 99.96, 'vbar': 92.74, 'vobs': 150.0}
+RES_OPT = {'ttrr': 1.499, 'prec': 99.93, 'tbar': 1.451, 'tobs': 1.5, 'etac': 1.00735}
+
+def load_language_packs():
+    """Language packs of the TRR engine (trr_core/idiomas.py), without the Streamlit app."""
+    return idiomas.LANG
+
+def legacy_chart(val_bar, val_trr, val_obs, lbl_bar, lbl_trr, lbl_obs, is_dyn=True):
+    """Baseline: pyplot figure per call, written to a temporary PNG file."""
+    fig, ax = plt.subplots(figsize=(7, 4))
+    labels = [lbl_bar, lbl_trr, lbl_obs]
+    valores = [val_bar, val_trr, val_obs]
+    barras = ax.bar(labels, valores, color=['#e74c3c', '#3498db', '#2ecc71'], width=0.6)
+    ax.set_ylabel("Vel. (km/s)" if is_dyn else "Dev (arcsec)", fontweight='bold')
+    ax.set_ylim(0, max(valores) * 1.3)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    for barra in barras:
+        yval = barra.get_height()
+        ax.text(barra.get_x() + barra.get_width()/2, yval + (max(valores)*0.02), f'{yval:.2f}', ha='center', va='bottom', fontweight='bold', fontsize=10)
+    plt.tight_layout()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
+        fig.savefig(tmp.name, dpi=150)
+        plt.close(fig)
+        return tmp.name
+
+def legacy_pdf(is_dyn, dados, L_pdf):
+    """Baseline report: same layout as trr_core.relatorio.gerar_pdf, disk round-trip for the chart."""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", 'B', 16)
+    pdf.cell(0, 10, "TEORIA DA RELATIVIDADE REFERENCIAL (TRR)", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    pdf.set_font("Helvetica", 'I', 10)
+    pdf.cell(0, 8, "Relatório de Auditoria Automatizada - Protocolo de Unificação", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    pdf.ln(5)
+    pdf.line(10, 30, 200, 30)
+    pdf.ln(10)
+    pdf.set_font("Helvetica", 'B', 12)
+    pdf.cell(0, 10, L_pdf["pdf_title_dyn"] if is_dyn else L_pdf["pdf_title_opt"], new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(5)
+    pdf.set_font("Helvetica", size=11)
+    if is_dyn:
+        texto = L_pdf["rep_dyn_text"].format(vbar=f"{dados['vbar']:.2f}", vobs=f"{dados['vobs']:.2f}", gap=f"{dados['vobs'] - dados['vbar']:.2f}", vtrr=f"{dados['vtrr']:.2f}", prec=f"{dados['prec']:.2f}")
+        img_path = legacy_chart(dados['vbar'], dados['vtrr'], dados['vobs'], L_pdf["g_bar"], L_pdf["g_trr"], L_pdf["g_obs"], True)
+    else:
+        texto = L_pdf["rep_opt_text"].format(tbar=f"{dados['tbar']:.2f}", tobs=f"{dados['tobs']:.2f}", etac=f"{dados['etac']:.5f}", ttrr=f"{dados['ttrr']:.2f}", prec=f"{dados['prec']:.2f}")
+        img_path = legacy_chart(dados['tbar'], dados['ttrr'], dados['tobs'], L_pdf["g_bar"], L_pdf["g_trr"], L_pdf["g_obs"], False)
+    for linha in texto.split('\n'):
+        pdf.multi_cell(0, 7, linha.encode('latin-1', 'replace').decode('latin-1'), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(10)
+    pdf.image(img_path, x=20, w=170)
+    os.unlink(img_path)
+    pdf.set_y(-30)
+    pdf.set_font("Helvetica", 'I', 8)
+    pdf.cell(0, 10, "Este documento prova a redundância da matéria escura através da aplicação da constante Beta.", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    return bytes(pdf.output())
+
+def reports_per_second(build, L_pdf, n_reports):
+    """Alternates dynamics/optics reports and returns throughput (reports/s)."""
+    build(True, RES_DYN, L_pdf)  # warm-up (fonts, figure template)
+    start = time.perf_counter()
+    for i in range(n_reports):
+        if i % 2 == 0:
+            build(True, RES_DYN, L_pdf)
+        else:
+            build(False, RES_OPT, L_pdf)
+    return n_reports / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="TRR engine report pipeline benchmark")
+    parser.add_argument("--reports", type=int, default=20, help="Reports per pipeline")
+    args = parser.parse_args()
+
+    L_pdf = load_language_packs()["PT"]
+    print("="*80)
+    print("TRR ENGINE BENCHMARK: AUDIT REPORT PIPELINE")
+    print(f"Reports per pipeline: {args.reports}")
+    print("="*80)
+    before = reports_per_second(legacy_pdf, L_pdf, args.reports)
+    after = reports_per_second(relatorio.gerar_pdf, L_pdf, args.reports)
+    print(f"Legacy (pyplot + temp file):  {before:8.2f} reports/s")
+    print(f"In-memory (template + buffer): {after:8.2f} reports/s")
+    print(f"Speed-up:                      {after / before:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import argparse
+import os
+import sys
+import numpy as np
+from astropy.io import fits
+
+# ==============================================================================
+# BENCHMARK INPUTS: SYNTHETIC CATALOGS IN THE EXACT FORMATS THE AUDITS READ
+# No observational data ships with the repository; these generators write
+# stand-ins with the same file names, layouts and column types:
+#   DR16Q_Superset_v3.fits          RA, DEC, Z, Z_VI, Z_MGII (D), PSFMAG (5E)
+#   KiDS_DR4_QSO_candidates.fits    RAJ2000, DECJ2000 (D), Z_PHOTO_QSO, MAG_GAAP_r (E)
+#   Rotmod_LTG/*_rotmod.dat         SPARC Rotmod columns (8, whitespace separated)
+#                                   (every 10th file ends on a 5-column row)
+#   asi.orb.lageos2.251220.v80.sp3  SP3-c, 2-minute epochs, PL51 + PL52 records
+# FITS tables are streamed to disk block by block (header, raw big-endian
+# records, 2880-byte padding), so 10^7-row catalogs never sit in memory.
+# The SDSS magnitudes carry a Cortez precession term and the Mg II redshifts a
+# dipole-modulated anomaly rate, so every audit has a signal to fit.
+# Usage: python benchmarks/synthetic.py ./bench_data --rows 1000000
+# ==============================================================================
+
+SDSS_FILE = 'DR16Q_Superset_v3.fits'
+KIDS_FILE = 'KiDS_DR4_QSO_candidates.fits'
+SPARC_DIR = 'Rotmod_LTG'
+SP3_FILE = 'asi.orb.lageos2.251220.v80.sp3'
+
+BLOCK_ROWS = 1_000_000
+FITS_BLOCK = 2880
+
+# Injected signals (same parameterization as the audits)
+OMEGA_P = 1128.0
+D0_INJECTED = 0.05
+THETA0_INJECTED = 148.9
+AXIS_RA, AXIS_DEC = 168.0, -7.0
+
+def _write_bintable(path, columns, n_rows, fill_block, seed):
+    """
+    Writes a primary HDU plus one binary table of n_rows rows. columns is a list
+    of (name, FITS format, big-endian dtype, shape); fill_block(rng, n) returns
+    a dict of arrays for the next n rows.
+    """
+    header = fits.BinTableHDU.from_columns(
+        [fits.Column(name=name, format=fmt) for name, fmt, _, _ in columns], nrows=0).header
+    header['NAXIS2'] = n_rows
+    record = np.dtype([(name, dtype, shape) for name, _, dtype, shape in columns])
+    rng = np.random.default_rng(seed)
+    with open(path, 'wb') as f:
+        fits.PrimaryHDU().writeto(f)
+        f.write(header.tostring().encode('ascii'))
+        for start in range(0, n_rows, BLOCK_ROWS):
+            n = min(BLOCK_ROWS, n_rows - start)
+            block = np.empty(n, dtype=record)
+            for name, values in fill_block(rng, n).items():
+                block[name] = values
+            block.tofile(f)
+        f.write(b'\0' * (-(n_rows * record.itemsize) % FITS_BLOCK))
+    return path
+
+def _uniform_sky(rng, n):
+    ra = rng.uniform(0, 360, n)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    return ra, dec
+
+def _axis_cos_theta(ra, dec):
+    r, d = np.radians(ra), np.radians(dec)
+    ra0, dec0 = np.radians(AXIS_RA), np.radians(AXIS_DEC)
+    return np.sin(d) * np.sin(dec0) + np.cos(d) * np.cos(dec0) * np.cos(r - ra0)
+
+def _sdss_block(rng, n):
+    ra, dec = _uniform_sky(rng, n)
+    z = 0.1 + 6.9 * rng.beta(2, 5, n)
+    # i-band magnitude: Hubble trend + Cortez precession term + scatter
+    phase = np.radians(ra - THETA0_INJECTED - OMEGA_P / z)
+    mag_i = 17.0 + 5 * np.log10(z) + D0_INJECTED * z * np.cos(phase) + rng.normal(0, 0.3, n)
+    psfmag = mag_i[:, None] + np.array([0.8, 0.3, 0.1, 0.0, -0.05])[None, :]
+    psfmag[rng.random(n) < 0.005] = -9999.0
+
+    z_vi = z + rng.normal(0, 0.005, n)
+    z_vi[rng.random(n) < 0.1] = -1.0
+    # Mg II redshift: anomalous offsets (> 0.05) more frequent towards the axis
+    anomalous = rng.random(n) < 0.04 * (1 + 0.25 * _axis_cos_theta(ra, dec))
+    z_mgii = z + rng.normal(0, 0.01, n) + np.where(anomalous, rng.uniform(0.06, 0.3, n), 0.0)
+    return {'RA': ra, 'DEC': dec, 'Z': z, 'Z_VI': z_vi, 'Z_MGII': z_mgii, 'PSFMAG': psfmag}
+
+def write_dr16q(path, n_rows, seed=1):
+    """SDSS DR16Q Superset stand-in with the columns read by the SDSS audits."""
+    columns = [('RA', 'D', '>f8', ()), ('DEC', 'D', '>f8', ()), ('Z', 'D', '>f8', ()),
+               ('Z_VI', 'D', '>f8', ()), ('Z_MGII', 'D', '>f8', ()), ('PSFMAG', '5E', '>f4', (5,))]
+    return _write_bintable(path, columns, n_rows, _sdss_block, seed)
+
+def _kids_block(rng, n):
+    ra, dec = _uniform_sky(rng, n)
+    z = 0.3 + 5.2 * rng.beta(2, 3, n)
+    mag_r = 19.0 + 2.5 * np.log10(z) + rng.normal(0, 0.8, n)
+    mag_r[rng.random(n) < 0.01] = 99.0
+    return {'RAJ2000': ra, 'DECJ2000': dec, 'Z_PHOTO_QSO': z, 'MAG_GAAP_r': mag_r}
+
+def write_kids(path, n_rows, seed=2):
+    """KiDS DR4 QSO candidates stand-in (photometric redshift and GAaP r magnitude)."""
+    columns = [('RAJ2000', 'D', '>f8', ()), ('DECJ2000', 'D', '>f8', ()),
+               ('Z_PHOTO_QSO', 'E', '>f4', ()), ('MAG_GAAP_r', 'E', '>f4', ())]
+    return _write_bintable(path, columns, n_rows, _kids_block, seed)
+
+def write_rotmod(folder, n_rows, seed=3, max_galaxies=2000):
+    """SPARC Rotmod_LTG stand-in: n_rows points spread over at most max_galaxies files."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    n_galaxies = int(np.clip(n_rows // 20, 1, max_galaxies))
+    points = np.full(n_galaxies, n_rows // n_galaxies)
+    points[:n_rows % n_galaxies] += 1
+    for i, n in enumerate(points):
+        r_max = rng.uniform(5, 40)
+        rad = np.sort(rng.uniform(0.1, r_max, n))
+        v_flat = rng.uniform(60, 280)
+        r_disk = r_max / rng.uniform(3, 6)
+        v_disk = v_flat * 0.8 * np.sqrt(1 - np.exp(-rad / r_disk))
+        v_gas = v_flat * 0.3 * (rad / r_max)
+        v_bul = np.where(rng.random() < 0.3, v_flat * 0.4 * np.exp(-rad / (0.2 * r_disk)), 0.0)
+        v_obs = v_flat * (1 - np.exp(-rad / (0.5 * r_disk))) + rng.normal(0, 4, n)
+        table = np.column_stack((rad, v_obs, np.full(n, 4.0), v_gas, v_disk, v_bul,
+                                 rng.uniform(0, 500, n), np.zeros(n)))
+        with open(os.path.join(folder, f"SYN{i:05d}_rotmod.dat"), 'w') as f:
+            f.write(f"# Distance = {rng.uniform(2, 100):.2f} Mpc\n")
+            f.write("# Rad\tVobs\terrV\tVgas\tVdisk\tVbul\tSBdisk\tSBbul\n")
+            f.write("# kpc\tkm/s\tkm/s\tkm/s\tkm/s\tkm/s\tL/pc^2\tL/pc^2\n")
+            np.savetxt(f, table[:-1] if i % 10 == 0 else table, fmt='%.3f', delimiter='\t')
+            if i % 10 == 0:
+                # Truncated edge row (no Vbul/SB columns): its residual is NaN and skipped
+                np.savetxt(f, table[-1:, :5], fmt='%.3f', delimiter='\t')
+    return folder
+
+def write_sp3(path, n_epochs, seed=4, step_seconds=120):
+    """
+    SP3-c ephemeris stand-in: n_epochs 2-minute epochs, each with one PL51 and
+    one PL52 (LAGEOS-2) position record, near-circular orbits in km.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2025-12-20T00:00:00')
+    orbits = {'L51': (12270.0, 13500.0, 0.02), 'L52': (12163.0, 13320.0, 0.92)}
+    with open(path, 'w', newline='\n') as f:
+        f.write(f"#cP2025 12 20  0  0  0.00000000 {n_epochs:7d} ORBIT ITR92 HLM  ASI\n")
+        f.write(f"## 2397 518400.00000000 {step_seconds:14.8f} 61029 0.0000000000000\n")
+        f.write("+    2   L51L52  0  0  0  0  0  0  0  0  0  0  0  0  0  0  0\n")
+        f.write("%c L  cc GPS ccc cccc cccc cccc cccc ccccc ccccc ccccc ccccc\n")
+        f.write("/* SYNTHETIC\n")
+        for block_start in range(0, n_epochs, BLOCK_ROWS // 4):
+            n = min(BLOCK_ROWS // 4, n_epochs - block_start)
+            index = np.arange(block_start, block_start + n)
+            epochs = start + (index * step_seconds).astype('timedelta64[s]')
+            t = index * float(step_seconds)
+            days = epochs.astype('datetime64[D]')
+            months = epochs.astype('datetime64[M]')
+            years = epochs.astype('datetime64[Y]').astype(int) + 1970
+            month = (months - epochs.astype('datetime64[Y]')).astype(int) + 1
+            day = (days - months).astype(int) + 1
+            seconds_of_day = (epochs - days).astype(int)
+            coords = {}
+            for sat, (radius, period, inclination) in orbits.items():
+                angle = 2 * np.pi * t / period
+                r = radius + rng.normal(0, 0.01, n)
+                coords[sat] = (r * np.cos(angle), r * np.sin(angle) * np.cos(inclination),
+                               r * np.sin(angle) * np.sin(inclination))
+            lines = []
+            for i in range(n):
+                lines.append(f"*  {years[i]:4d} {month[i]:2d} {day[i]:2d} {seconds_of_day[i] // 3600:2d} "
+                             f"{seconds_of_day[i] // 60 % 60:2d} {seconds_of_day[i] % 60:11.8f}\n")
+                for sat in orbits:
+                    x, y, z = coords[sat]
+                    lines.append(f"P{sat}{x[i]:14.6f}{y[i]:14.6f}{z[i]:14.6f} 999999.999999\n")
+            f.write(''.join(lines))
+        f.write("EOF\n")
+    return path
+
+def write_dataset(data_dir, n_rows, which=('sdss', 'kids', 'sparc', 'sp3'), seed=1, verbose=False):
+    """Writes the requested inputs of one size into data_dir (existing files are kept)."""
+    os.makedirs(data_dir, exist_ok=True)
+    writers = {
+        'sdss': (SDSS_FILE, lambda p: write_dr16q(p, n_rows, seed)),
+        'kids': (KIDS_FILE, lambda p: write_kids(p, n_rows, seed + 1)),
+        'sparc': (SPARC_DIR, lambda p: write_rotmod(p, n_rows, seed + 2)),
+        'sp3': (SP3_FILE, lambda p: write_sp3(p, n_rows, seed + 3)),
+    }
+    paths = {}
+    for name in which:
+        filename, write = writers[name]
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            if verbose:
+                print(f"   writing {path} ({n_rows} rows)...")
+            write(path)
+        paths[name] = path
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes synthetic RRT audit inputs")
+    parser.add_argument('data_dir')
+    parser.add_argument('--rows', type=float, default=1e5, help="Rows per catalog (SP3: epochs per satellite)")
+    parser.add_argument('--only', default='sdss,kids,sparc,sp3')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    paths = write_dataset(args.data_dir, int(args.rows), args.only.split(','), args.seed, verbose=True)
+    for name, path in paths.items():
+        print(f"-> {name}: {path}")
+
+if __name__ == "__main__":
+    sys.exit(main())
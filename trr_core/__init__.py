@@ -0,0 +1,6 @@
+"""
+TRR Core: shared numerical kernels for the RRT audit scripts and the TRR engine.
+
+The audit scripts live in folders whose names are not importable packages, so
+each script adds the repository root to ``sys.path`` before importing from here.
+"""
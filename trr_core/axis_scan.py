@@ -0,0 +1,157 @@
+import numpy as np
+from scipy import sparse, stats
+
+from trr_core import healpix
+
+# ==============================================================================
+# RRT ALL-SKY AXIS SCAN: SUFFICIENT STATISTICS FOR DIRECTIONAL ANOMALY RATES
+# Used by: Topological anisotropy audit (axis-scan mode).
+# Logic: Every object is reduced once to its unit vector n and anomaly flag a.
+#   * Dipole moments (N, A, sum n, sum a*n, sum n n^T) give, for ANY axis u,
+#     the exact Pearson correlation between a and cos(theta) = n.u. The best axis
+#     is C^-1 c (C = covariance of n, c = cov(a, n)) and, under isotropy,
+#     N c^T C^-1 c / var(a) ~ chi2(3): the look-elsewhere correction over all
+#     axes is analytic.
+#   * Per-pixel totals and anomaly counts (HEALPix RING) reproduce the audit's
+#     binned statistic (spread of the anomaly rate over 10 cos(theta) bins) for
+#     every candidate axis without touching the rows again; its look-elsewhere
+#     null redistributes the anomalies over the pixels (multivariate
+#     hypergeometric = random relabelling of the objects) and rescans.
+# ==============================================================================
+
+class DipoleMoments:
+    """Additive first/second moments of object unit vectors and anomaly flags."""
+
+    def __init__(self):
+        self.n = 0
+        self.a = 0
+        self.s = np.zeros(3)
+        self.sa = np.zeros(3)
+        self.m = np.zeros((3, 3))
+
+    def add(self, vectors, flags):
+        """Accumulates a block of (n, 3) unit vectors and boolean anomaly flags."""
+        flags = np.asarray(flags, dtype=bool)
+        self.n += len(vectors)
+        self.a += int(np.count_nonzero(flags))
+        self.s += vectors.sum(axis=0)
+        self.sa += vectors[flags].sum(axis=0)
+        self.m += vectors.T @ vectors
+        return self
+
+    def _covariances(self):
+        p = self.a / self.n
+        mean = self.s / self.n
+        cov_n = self.m / self.n - np.outer(mean, mean)
+        cov_an = self.sa / self.n - p * mean
+        return p * (1 - p), cov_n, cov_an
+
+    def correlation(self, axes):
+        """Pearson correlation between the anomaly flag and cos(theta) for each (k, 3) axis."""
+        var_a, cov_n, cov_an = self._covariances()
+        var_c = np.einsum('ki,ij,kj->k', axes, cov_n, axes)
+        return (axes @ cov_an) / np.sqrt(var_a * var_c)
+
+    def best_axis(self):
+        """
+        Axis of maximum correlation and its significance:
+        (unit vector, local sigma r*sqrt(N), chi2(3) statistic, global p-value).
+        """
+        var_a, cov_n, cov_an = self._covariances()
+        direction = np.linalg.solve(cov_n, cov_an)
+        chi2 = self.n * (cov_an @ direction) / var_a
+        axis = direction / np.linalg.norm(direction)
+        local_sigma = self.correlation(axis[None, :])[0] * np.sqrt(self.n)
+        return axis, local_sigma, chi2, stats.chi2.sf(chi2, 3)
+
+def p_to_sigma(p_value):
+    """Two-sided Gaussian-equivalent significance of a p-value."""
+    return stats.norm.isf(p_value / 2)
+
+def binned_contrast_map(axes, pixel_vectors, totals, anomalies, n_bins=10, chunk_axes=128):
+    """
+    Spread (max - min, in %) of the anomaly rate over n_bins cos(theta) bins,
+    for each (k, 3) axis. Bins span the cos(theta) range of the occupied pixels
+    (as pd.cut spans the data range); pixels are taken at their centres.
+    anomalies may be (npix,) or (npix, R) for R realizations at once: the
+    pixel-to-bin assignment of each axis chunk is built once, as a sparse
+    one-hot matrix, and applied to every realization in one product.
+    Returns (n_axes,) or (n_axes, R).
+    """
+    occupied = totals > 0
+    vectors = pixel_vectors[occupied]
+    totals = totals[occupied].astype(np.float64)
+    anomalies = np.asarray(anomalies)[occupied].astype(np.float64)
+    n_pix = len(vectors)
+    contrast = np.empty((len(axes),) + anomalies.shape[1:])
+    for start in range(0, len(axes), chunk_axes):
+        chunk = axes[start:start + chunk_axes]
+        k = len(chunk)
+        cos_theta = vectors @ chunk.T                     # (pixels, axes)
+        lo = cos_theta.min(axis=0)
+        width = cos_theta.max(axis=0) - lo
+        idx = np.minimum(((cos_theta - lo) / width * n_bins).astype(np.int64), n_bins - 1)
+        # Column p holds one entry per axis: row (axis * n_bins + bin)
+        rows = (idx + np.arange(k) * n_bins).ravel()
+        one_hot = sparse.csc_matrix((np.ones(len(rows)), rows, np.arange(0, k * n_pix + 1, k)),
+                                    shape=(k * n_bins, n_pix))
+        bin_totals = (one_hot @ totals).reshape((k, n_bins) + (1,) * (anomalies.ndim - 1))
+        bin_anomalies = (one_hot @ anomalies).reshape((k, n_bins) + anomalies.shape[1:])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rates = np.where(bin_totals > 0, bin_anomalies / bin_totals * 100, np.nan)
+        contrast[start:start + k] = np.nanmax(rates, axis=1) - np.nanmin(rates, axis=1)
+    return contrast
+
+def null_anomaly_counts(totals, n_anomalies, n_null, seed=None):
+    """(npix, n_null) anomaly counts of random relabellings of the objects (multivariate hypergeometric)."""
+    rng = np.random.default_rng(seed)
+    occupied = totals > 0
+    counts = np.zeros((len(totals), n_null), dtype=np.int64)
+    for i in range(n_null):
+        counts[occupied, i] = rng.multivariate_hypergeometric(totals[occupied], n_anomalies)
+    return counts
+
+class AxisScanResult:
+    """Contrast and dipole-correlation maps over the candidate axes, with global significances."""
+
+    def __init__(self, axis_nside, axes, contrast, correlation, moments, null_maxima):
+        self.axis_nside = axis_nside
+        self.axes = axes
+        self.ra, self.dec = healpix.vec_to_radec(axes)
+        self.contrast = contrast
+        self.correlation = correlation
+        self.n_objects = moments.n
+        self.best_contrast_index = int(np.argmax(contrast))
+        self.null_maxima = null_maxima
+        n_null = len(null_maxima)
+        self.contrast_p_global = (1 + np.count_nonzero(null_maxima >= contrast.max())) / (n_null + 1) if n_null else np.nan
+        (self.dipole_axis, self.dipole_local_sigma,
+         self.dipole_chi2, self.dipole_p_global) = moments.best_axis()
+
+    def best_contrast_radec(self):
+        return self.ra[self.best_contrast_index], self.dec[self.best_contrast_index]
+
+    def dipole_radec(self):
+        return healpix.vec_to_radec(self.dipole_axis)
+
+    def axis_percentile(self, ra, dec):
+        """Share of scanned axes (in %) whose binned contrast is below the one of the grid axis nearest (ra, dec)."""
+        index = int(np.argmax(self.axes @ healpix.radec_to_vec(ra, dec)))
+        return np.mean(self.contrast < self.contrast[index]) * 100, self.contrast[index]
+
+def scan_axes(moments, pixel_totals, pixel_anomalies, data_nside, axis_nside=16, n_bins=10,
+              n_null=100, seed=None):
+    """
+    Evaluates every HEALPix axis_nside pixel centre as a candidate axis from the
+    sufficient statistics (dipole moments + per-pixel counts at data_nside).
+    Returns an AxisScanResult.
+    """
+    axes = healpix.pix2vec(axis_nside, np.arange(healpix.nside_to_npix(axis_nside)))
+    pixel_vectors = healpix.pix2vec(data_nside, np.arange(healpix.nside_to_npix(data_nside)))
+    # Observed map and the null realizations share each chunk's bin assignment
+    realizations = np.column_stack((pixel_anomalies,
+                                    null_anomaly_counts(pixel_totals, int(pixel_anomalies.sum()), n_null, seed)))
+    maps = binned_contrast_map(axes, pixel_vectors, pixel_totals, realizations, n_bins)
+    contrast, null_maxima = maps[:, 0], maps[:, 1:].max(axis=0)
+    correlation = moments.correlation(axes)
+    return AxisScanResult(axis_nside, axes, contrast, correlation, moments, null_maxima)
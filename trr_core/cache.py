@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# RRT SHARED INTERMEDIATE CACHE (CONTENT-ADDRESSED MEMOIZATION)
+# Used by: SDSS jackknife audits (resonance stratum, block sums), SMBH growth
+# causality audit (z > 5 sample) and SPARC audit (edge residuals).
+# Logic: An expensive stage is memoized under the SHA-256 of
+#     (stage name, stage version, bytecode of the compute function, content
+#      hash of every input file, stage parameters and model constants, e.g.
+#      OMEGA_P, A0_RRT, ML_RATIO)
+# so a change in the data, in any constant or in the stage's own code is a new
+# key, while a change downstream of it (plot styling, verdict thresholds) is a
+# hit and the raw file is not read at all. The bytecode only covers the compute
+# function itself: when the logic of a helper it calls changes, bump the
+# stage's version argument. Input files are hashed once: the digest is
+# remembered per (path, mtime, size) in fingerprints.json.
+# Artifacts: a dict of NumPy arrays (one .npy per array), a single array, or a
+# pandas DataFrame (.parquet, pyarrow). Each entry keeps its own meta.json,
+# whose mtime is its last use; when the cache exceeds TRR_CACHE_MAX_MB the
+# least recently used entries are evicted.
+#
+# TRR_CACHE_DIR   cache location (default: ./.trr_cache)
+# TRR_CACHE_MAX_MB size bound in MB (default: 2048; 0 disables the cache)
+# ==============================================================================
+
+ENV_DIR = 'TRR_CACHE_DIR'
+ENV_MAX_MB = 'TRR_CACHE_MAX_MB'
+DEFAULT_DIR = '.trr_cache'
+DEFAULT_MAX_MB = 2048
+HASH_BLOCK_BYTES = 16 * 1024**2
+
+# Hit/miss counts of this process, per stage
+_stats = {}
+
+def cache_dir():
+    return os.environ.get(ENV_DIR) or DEFAULT_DIR
+
+def max_bytes():
+    return int(float(os.environ.get(ENV_MAX_MB, DEFAULT_MAX_MB)) * 1024**2)
+
+def enabled():
+    return max_bytes() > 0
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _load_fingerprints(root):
+    try:
+        with open(os.path.join(root, 'fingerprints.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_fingerprints(root, fingerprints):
+    path = os.path.join(root, 'fingerprints.json')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprints, f)
+    os.replace(tmp_path, path)
+
+def _fingerprint(path, fingerprints):
+    """Content hash of a file or directory; updates the fingerprints dict in place."""
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(path)):
+            if os.path.isfile(os.path.join(path, name)):
+                digest.update(f"{name}:{_fingerprint(os.path.join(path, name), fingerprints)}\n".encode('utf-8'))
+        return digest.hexdigest()
+    st = os.stat(path)
+    signature = [st.st_mtime_ns, st.st_size]
+    known = fingerprints.get(os.path.abspath(path))
+    if known and known[:2] == signature:
+        return known[2]
+    content_hash = _hash_file(path)
+    fingerprints[os.path.abspath(path)] = signature + [content_hash]
+    return content_hash
+
+def file_fingerprints(paths, root=None):
+    """
+    Content hashes of files, or of directories (hash of their sorted file names
+    and contents). Digests are reused while (mtime, size) are unchanged.
+    """
+    root = root or cache_dir()
+    os.makedirs(root, exist_ok=True)
+    fingerprints = _load_fingerprints(root)
+    known = dict(fingerprints)
+    hashes = [_fingerprint(path, fingerprints) for path in paths]
+    if fingerprints != known:
+        _save_fingerprints(root, fingerprints)
+    return hashes
+
+def _canonical(value):
+    """JSON-stable form of stage parameters (tuples as lists, NumPy scalars as Python numbers)."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float):
+        return repr(value)  # exact: 1128.0 and 1128.0000001 never collide
+    return value
+
+def code_fingerprint(func):
+    """
+    SHA-256 of a function's bytecode, constants and referenced names (nested
+    functions included). Line numbers and comments are not part of it.
+    """
+    digest = hashlib.sha256()
+
+    def visit(code):
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names + code.co_varnames + code.co_freevars).encode('utf-8'))
+        for const in code.co_consts:
+            if hasattr(const, 'co_code'):
+                visit(const)
+            elif isinstance(const, frozenset):
+                # Set literals: repr order depends on string hash randomization
+                digest.update(repr(sorted(const, key=repr)).encode('utf-8'))
+            else:
+                digest.update(repr(const).encode('utf-8'))
+
+    visit(func.__code__)
+    return digest.hexdigest()
+
+def stage_key(stage, inputs=(), params=None, root=None, version=1, code=None):
+    """SHA-256 key of a stage over its version, code fingerprint, input files and parameters."""
+    payload = {'stage': stage, 'version': version, 'code': code,
+               'inputs': file_fingerprints(inputs, root),
+               'params': _canonical(params or {})}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _entry_path(root, key):
+    return os.path.join(root, key[:2], key)
+
+def _write_value(folder, value):
+    if isinstance(value, pd.DataFrame):
+        value.to_parquet(os.path.join(folder, 'frame.parquet'))
+        return 'frame'
+    if isinstance(value, dict):
+        for name, array in value.items():
+            np.save(os.path.join(folder, f"{name}.npy"), np.asarray(array))
+        return 'arrays'
+    np.save(os.path.join(folder, 'value.npy'), np.asarray(value))
+    return 'array'
+
+def _read_value(folder, meta):
+    if meta['kind'] == 'frame':
+        return pd.read_parquet(os.path.join(folder, 'frame.parquet'))
+    if meta['kind'] == 'arrays':
+        return {name: np.load(os.path.join(folder, f"{name}.npy")) for name in meta['names']}
+    return np.load(os.path.join(folder, 'value.npy'))
+
+def _folder_bytes(folder):
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+def _record(stage, outcome):
+    counts = _stats.setdefault(stage, {'hits': 0, 'misses': 0})
+    counts[outcome] += 1
+
+def load(key, root=None):
+    """Cached value of a key (its last use is refreshed), or None."""
+    folder = _entry_path(root or cache_dir(), key)
+    meta_path = os.path.join(folder, 'meta.json')
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        value = _read_value(folder, meta)
+    except (OSError, ValueError, KeyError):
+        return None
+    os.utime(meta_path)
+    return value
+
+def store(key, value, stage='', params=None, root=None, version=1):
+    """Writes an artifact atomically (a temporary folder renamed into place), then enforces the size bound."""
+    root = root or cache_dir()
+    folder = _entry_path(root, key)
+    tmp_folder = f"{folder}.{os.getpid()}.tmp"
+    os.makedirs(tmp_folder, exist_ok=True)
+    kind = _write_value(tmp_folder, value)
+    meta = {'stage': stage, 'version': version, 'kind': kind, 'created': time.time(),
+            'names': list(value) if kind == 'arrays' else None, 'params': _canonical(params or {})}
+    with open(os.path.join(tmp_folder, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp_folder, folder)
+    except OSError:
+        # Another process stored the same key first
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+    evict(root=root, keep=key)
+
+def entries(root=None):
+    """(last use, bytes, key) of every stored artifact, oldest first."""
+    root = root or cache_dir()
+    found = []
+    if not os.path.isdir(root):
+        return found
+    for prefix in os.listdir(root):
+        prefix_path = os.path.join(root, prefix)
+        if len(prefix) != 2 or not os.path.isdir(prefix_path):
+            continue
+        for key in os.listdir(prefix_path):
+            folder = os.path.join(prefix_path, key)
+            meta_path = os.path.join(folder, 'meta.json')
+            if key.endswith('.tmp') or not os.path.exists(meta_path):
+                continue
+            found.append((os.path.getmtime(meta_path), _folder_bytes(folder), key))
+    return sorted(found)
+
+def evict(limit_bytes=None, root=None, keep=None):
+    """Removes least recently used artifacts until the cache fits limit_bytes. Returns the evicted keys."""
+    root = root or cache_dir()
+    limit_bytes = max_bytes() if limit_bytes is None else limit_bytes
+    stored = entries(root)
+    total = sum(size for _, size, _ in stored)
+    evicted = []
+    for _, size, key in stored:
+        if total <= limit_bytes:
+            break
+        if key == keep:
+            continue
+        shutil.rmtree(_entry_path(root, key), ignore_errors=True)
+        total -= size
+        evicted.append(key)
+    return evicted
+
+def memoize(stage, inputs, params, compute, version=1):
+    """
+    Returns compute() for this stage, from the cache when the input files,
+    parameters, version and compute's own code match a stored artifact.
+    compute must return a dict of arrays, an array or a DataFrame. Bump version
+    whenever the stage's logic changes outside compute (helpers it calls).
+    """
+    if not enabled():
+        _record(stage, 'misses')
+        return compute()
+    root = cache_dir()
+    key = stage_key(stage, inputs, params, root, version, code_fingerprint(compute))
+    value = load(key, root)
+    if value is not None:
+        _record(stage, 'hits')
+        return value
+    _record(stage, 'misses')
+    value = compute()
+    store(key, value, stage, params, root, version)
+    return value
+
+def stats():
+    """Per-stage hit/miss counts of this process."""
+    return {stage: dict(counts) for stage, counts in _stats.items()}
+
+def stats_label():
+    """Printable cache summary for the audit reports."""
+    if not enabled():
+        return "disabled (TRR_CACHE_MAX_MB=0)"
+    hits = sum(c['hits'] for c in _stats.values())
+    misses = sum(c['misses'] for c in _stats.values())
+    stages = ', '.join(f"{stage} {'hit' if c['hits'] else 'miss'}" for stage, c in _stats.items())
+    return f"{hits} hit(s), {misses} miss(es) [{stages}] in {cache_dir()}"
@@ -0,0 +1,149 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from astropy.io import fits
+
+from trr_core import dataset_cache
+
+# ==============================================================================
+# RRT SHARED CATALOG LOADER: COLUMN-PROJECTED FITS ACCESS
+# Used by: SDSS DR16Q audits (jackknife, topological, chronology, SMBH growth).
+# Logic: The FITS file is opened with memmap=True and only the requested
+# columns are touched. Each column (or sub-column such as PSFMAG[:, 3]) is
+# copied exactly once from the mapped big-endian record into a native-endian
+# array, so the full multi-GB table is never materialized.
+# iter_fits_chunks streams fixed-size row blocks straight from the file (no
+# mapping kept alive) and reads the next block in a background thread while
+# the caller reduces the current one, so memory stays bounded by the chunk.
+# Both readers serve columns already decoded into the shared dataset cache
+# (trr_core.dataset_cache, filled once per audit pass by trr_core.runner)
+# without opening the FITS file at all.
+# ==============================================================================
+
+DEFAULT_CHUNK_BYTES = 64 * 1024**2  # Raw bytes per streamed block (DR16Q rows are wide)
+
+def to_native(array):
+    """Returns the array in native byte order (a single copy only when a swap is needed)."""
+    if array.dtype.byteorder not in ('=', '|'):
+        return array.astype(array.dtype.newbyteorder('='))
+    return array
+
+def _column_specs(columns):
+    """Normalizes the column request into {output_key: (fits_name, sub_index)}."""
+    if isinstance(columns, dict):
+        items = columns.items()
+    else:
+        items = ((c if isinstance(c, str) else f"{c[0]}_{c[1]}", c) for c in columns)
+    specs = {}
+    for key, spec in items:
+        specs[key] = (spec, None) if isinstance(spec, str) else (spec[0], spec[1])
+    return specs
+
+def _shared_columns(path, specs, hdu):
+    """Memory-mapped columns from the shared dataset cache, or None unless every one is there."""
+    if hdu != 1 or dataset_cache.cache_root() is None:
+        return None
+    out = {}
+    for key, (name, index) in specs.items():
+        column = dataset_cache.load(path, dataset_cache.column_key(name, index))
+        if column is None:
+            return None
+        out[key] = column
+    return out
+
+def share_fits_columns(path, columns, root=None):
+    """Decodes the columns once and stores them in the shared dataset cache (see trr_core.runner)."""
+    specs = _column_specs(columns)
+    data = read_fits_columns(path, columns)
+    for key, (name, index) in specs.items():
+        dataset_cache.save(path, dataset_cache.column_key(name, index), data[key], root=root)
+    return data
+
+def read_fits_columns(path, columns, hdu=1):
+    """
+    Reads only the requested columns of a FITS binary table.
+    columns: list of names / (name, index) tuples, or a dict {key: name or (name, index)}
+             e.g. {'ra': 'RA', 'z': 'Z', 'mag_i': ('PSFMAG', 3)}.
+             List entries are keyed by name ('RA') or 'NAME_index' ('PSFMAG_3').
+    Returns a dict of native-endian NumPy arrays.
+    """
+    specs = _column_specs(columns)
+    shared = _shared_columns(path, specs, hdu)
+    if shared is not None:
+        return {key: np.array(column) for key, column in shared.items()}
+    out = {}
+    with fits.open(path, memmap=True) as hdul:
+        data = hdul[hdu].data
+        for key, (name, index) in specs.items():
+            field = data.field(name)
+            if index is not None:
+                field = field[:, index]
+            # One copy out of the mapped file, converting the byte order on the way
+            out[key] = np.array(field, dtype=field.dtype.newbyteorder('='))
+        del data
+    return out
+
+def fits_column_names(path, hdu=1):
+    """Column names of a FITS binary table (header only, no data read)."""
+    with fits.open(path, memmap=True) as hdul:
+        return list(hdul[hdu].columns.names)
+
+def _record_layout(path, hdu):
+    """On-disk (big-endian) record dtype, data offset, row count and scaling of a binary table."""
+    with fits.open(path, memmap=True) as hdul:
+        table = hdul[hdu]
+        native = table.columns.dtype
+        record = np.dtype({'names': list(native.names),
+                           'formats': [native.fields[n][0].newbyteorder('>') for n in native.names],
+                           'offsets': [native.fields[n][1] for n in native.names],
+                           'itemsize': table.header['NAXIS1']})
+        scaling = {c.name: (c.bscale, c.bzero) for c in table.columns if c.bscale not in (None, 1) or c.bzero not in (None, 0)}
+        return record, hdul.fileinfo(hdu)['datLoc'], table.header['NAXIS2'], scaling
+
+def iter_fits_chunks(path, columns, chunk_rows=None, hdu=1, prefetch=True):
+    """
+    Streams the requested columns of a FITS binary table in row blocks.
+    Yields dicts shaped like read_fits_columns() with at most chunk_rows rows
+    (default: as many full records as fit in DEFAULT_CHUNK_BYTES).
+    With prefetch=True the next block is read in a background thread while the
+    current one is being processed (read/compute overlap).
+    """
+    specs = _column_specs(columns)
+    shared = _shared_columns(path, specs, hdu)
+    if shared is not None:
+        # Blocks are sliced from the memory-mapped cache: the FITS file is not opened
+        n_rows = len(next(iter(shared.values())))
+        chunk_rows = chunk_rows or max(1, DEFAULT_CHUNK_BYTES // sum(c.itemsize for c in shared.values()))
+        for start in range(0, n_rows, chunk_rows):
+            yield {key: np.array(column[start:start + chunk_rows]) for key, column in shared.items()}
+        return
+
+    record, data_offset, n_rows, scaling = _record_layout(path, hdu)
+    chunk_rows = chunk_rows or max(1, DEFAULT_CHUNK_BYTES // record.itemsize)
+    with open(path, 'rb') as f:
+        def read_block(start):
+            f.seek(data_offset + start * record.itemsize)
+            raw = np.fromfile(f, dtype=record, count=min(chunk_rows, n_rows - start))
+            block = {}
+            for key, (name, index) in specs.items():
+                field = raw[name] if index is None else raw[name][:, index]
+                field = np.array(field, dtype=field.dtype.newbyteorder('='))
+                if name in scaling:
+                    bscale, bzero = scaling[name]
+                    field = field * (1 if bscale is None else bscale) + (0 if bzero is None else bzero)
+                block[key] = field
+            return block
+
+        starts = range(0, n_rows, chunk_rows)
+        if not prefetch:
+            for start in starts:
+                yield read_block(start)
+            return
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            pending = None
+            for start in starts:
+                upcoming = reader.submit(read_block, start)
+                if pending is not None:
+                    yield pending.result()
+                pending = upcoming
+            if pending is not None:
+                yield pending.result()
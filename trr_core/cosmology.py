@@ -0,0 +1,122 @@
+import numpy as np
+from functools import lru_cache
+
+# ==============================================================================
+# RRT SHARED COSMOLOGY KERNEL: FLAT LAMBDA-CDM DISTANCES AND AGES
+# Used by: TRR-Motor.py (Cosmological Optics) and the SDSS/KiDS audits.
+# Logic: The comoving distance integral is tabulated once per matter density
+# on a uniform grid in u = ln(1+z) and evaluated through a cubic Hermite spline
+# with direct index arithmetic (no search), so any NumPy array of redshifts costs
+# a handful of vectorized operations.
+# ==============================================================================
+
+C_KM_S = 299792.458         # Speed of light (km/s)
+MPC_M = 3.086e22            # Megaparsec in meters (TRR engine convention)
+HUBBLE_TIME_YR = 9.7779e11  # 1/H0 in years for H0 expressed in km/s/Mpc
+
+# Cosmology used by the TRR engine (Streamlit app)
+H0_ENGINE = 70.0
+OM_ENGINE = 0.3
+
+# Planck 2018 baseline used by the SDSS/KiDS causality audits
+H0_PLANCK = 67.4
+OM_PLANCK = 0.315
+
+# Lookup grid: nodes in u = ln(1+z) up to the recombination redshift.
+# Stated error bound: relative error below 1e-10 for 0 < z <= Z_MAX
+# (checked against scipy.integrate.quad for both baseline cosmologies).
+Z_MAX = 1100.0
+GRID_NODES = 8193
+_GAUSS_X, _GAUSS_W = np.polynomial.legendre.leggauss(8)
+
+def _integrand_u(u, om):
+    """d(chi)/du for flat Lambda-CDM, with chi in units of c/H0 and u = ln(1+z)."""
+    a_inv = np.exp(u)
+    return a_inv / np.sqrt(om * a_inv**3 + (1.0 - om))
+
+@lru_cache(maxsize=16)
+def _comoving_table(om):
+    """
+    Builds the dimensionless comoving distance table for a matter density.
+    Each grid interval is integrated with 8-point Gauss-Legendre quadrature and
+    the exact analytic derivative is stored at every node for Hermite interpolation.
+    Returns (step, chi_nodes, dchi_du_nodes).
+    """
+    u_nodes = np.linspace(0.0, np.log1p(Z_MAX), GRID_NODES)
+    left, right = u_nodes[:-1], u_nodes[1:]
+    half = 0.5 * (right - left)
+    mid = 0.5 * (right + left)
+    samples = mid[:, None] + half[:, None] * _GAUSS_X[None, :]
+    pieces = (_integrand_u(samples, om) * _GAUSS_W[None, :]).sum(axis=1) * half
+    chi_nodes = np.concatenate(([0.0], np.cumsum(pieces)))
+    return u_nodes[1], chi_nodes, _integrand_u(u_nodes, om)
+
+def _comoving_chi(u, om):
+    """Evaluates the tabulated chi(u) (units of c/H0) by cubic Hermite interpolation."""
+    step, chi, dchi = _comoving_table(om)
+    t = u / step
+    i = np.minimum(np.nan_to_num(t).astype(np.intp), GRID_NODES - 2)
+    s = t - i
+    s2 = s * s
+    s3 = s2 * s
+    h00 = 2 * s3 - 3 * s2 + 1
+    h10 = s3 - 2 * s2 + s
+    h01 = -2 * s3 + 3 * s2
+    h11 = s3 - s2
+    return h00 * chi[i] + h01 * chi[i + 1] + step * (h10 * dchi[i] + h11 * dchi[i + 1])
+
+def _as_redshift(z):
+    z = np.asarray(z, dtype=float)
+    if np.any(z > Z_MAX):
+        raise ValueError(f"Redshift above the tabulated range (z_max = {Z_MAX}).")
+    return z
+
+def comoving_distance(z, h0=H0_PLANCK, om=OM_PLANCK):
+    """Line-of-sight comoving distance (Mpc) for an array of redshifts."""
+    z = _as_redshift(z)
+    chi = _comoving_chi(np.log1p(np.maximum(z, 0.0)), float(om))
+    return (C_KM_S / h0) * chi
+
+def angular_diameter_distance(z, h0=H0_PLANCK, om=OM_PLANCK):
+    """Angular diameter distance D_A(z) in Mpc."""
+    z = _as_redshift(z)
+    return comoving_distance(z, h0, om) / (1.0 + z)
+
+def angular_diameter_distance_z1z2(z1, z2, h0=H0_PLANCK, om=OM_PLANCK):
+    """
+    Angular diameter distance between z1 and z2 (Mpc), e.g. lens -> source.
+    Pairs with z1 >= z2 return 0, matching the TRR engine convention.
+    """
+    z1, z2 = np.broadcast_arrays(_as_redshift(z1), _as_redshift(z2))
+    d_c = comoving_distance(z2, h0, om) - comoving_distance(z1, h0, om)
+    return np.where(z1 < z2, d_c / (1.0 + z2), 0.0)
+
+def luminosity_distance(z, h0=H0_PLANCK, om=OM_PLANCK):
+    """Luminosity distance D_L(z) in Mpc."""
+    z = _as_redshift(z)
+    return comoving_distance(z, h0, om) * (1.0 + z)
+
+def lens_distances(z_lens, z_source, h0=H0_PLANCK, om=OM_PLANCK):
+    """Returns (D_L, D_S, D_LS) in Mpc for arrays of lens/source redshifts."""
+    d_l = angular_diameter_distance(z_lens, h0, om)
+    d_s = angular_diameter_distance(z_source, h0, om)
+    d_ls = angular_diameter_distance_z1z2(z_lens, z_source, h0, om)
+    return d_l, d_s, d_ls
+
+def age_at_z(z, h0=H0_PLANCK, om=OM_PLANCK):
+    """
+    Age of the universe (years) at redshift z under flat Lambda-CDM.
+    Uses the exact closed form for matter + Lambda, so no table is needed.
+    """
+    z = np.asarray(z, dtype=float)
+    term = np.sqrt((1 - om) / om) * (1 + z)**(-1.5)
+    age = (2 / (3 * h0 * np.sqrt(1 - om))) * np.arcsinh(term)
+    return age * HUBBLE_TIME_YR
+
+def age_at_z_power_law(z, t0_gyr=13.8):
+    """
+    Matter-dominated scaling t(z) = t0 / (1+z)^1.5 (Gyr).
+    Kept for the chronology stress test, which audits against this approximation.
+    """
+    z = np.asarray(z, dtype=float)
+    return t0_gyr / (1 + z)**1.5
@@ -0,0 +1,53 @@
+import hashlib
+import os
+import numpy as np
+
+# ==============================================================================
+# RRT SHARED DATASET CACHE (ONE LOAD, MANY AUDIT PROCESSES)
+# Used by: trr_core.runner (writes) and trr_core.catalogs / trr_core.sp3 (read).
+# Logic: When TRR_DATASET_CACHE points to a directory, a dataset that was
+# already decoded (FITS columns, parsed SP3 records) is kept there as plain
+# native-endian .npy arrays, one folder per source file keyed by its absolute
+# path, mtime and size. Readers memory-map those arrays instead of decoding the
+# source again, so parallel audit processes share a single load through the
+# page cache. Without the variable nothing is read or written.
+# ==============================================================================
+
+ENV_VAR = 'TRR_DATASET_CACHE'
+
+def cache_root():
+    """Cache directory from the environment, or None when sharing is off."""
+    return os.environ.get(ENV_VAR) or None
+
+def _entry_dir(root, source_path):
+    st = os.stat(source_path)
+    key = f"{os.path.abspath(source_path)}|{st.st_mtime_ns}|{st.st_size}"
+    return os.path.join(root, hashlib.sha1(key.encode('utf-8')).hexdigest()[:16])
+
+def column_key(name, index=None):
+    """Cache key of a FITS column or sub-column ('RA', 'PSFMAG_3')."""
+    return name if index is None else f"{name}_{index}"
+
+def load(source_path, key):
+    """Read-only memory map of a cached array, or None (cache off, missing or stale)."""
+    root = cache_root()
+    if root is None or not os.path.exists(source_path):
+        return None
+    path = os.path.join(_entry_dir(root, source_path), key + '.npy')
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode='r')
+
+def save(source_path, key, array, root=None):
+    """Stores one array for source_path (atomic rename); returns its path, or None when sharing is off."""
+    root = root or cache_root()
+    if root is None:
+        return None
+    folder = _entry_dir(root, source_path)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, key + '.npy')
+    tmp_path = path + f'.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+    return path
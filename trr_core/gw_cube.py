@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from trr_core.healpix import nside_to_npix, pix2vec, radec_to_vec
+
+# ==============================================================================
+# RRT GW DISTANCE-DIVERGENCE CUBE (HEALPIX RING PIXELIZATION, MANY REDSHIFTS)
+# Used by: GW anisotropy prediction map (cube mode) and alert cross-matching
+# against O4/O5 sky localizations (which are HEALPix maps).
+# Logic: Divergence(%) = [exp(K(z) * (1 + A*cos_theta)) - 1] * 100 with
+# K(z) = K_PER_Z * z (K(0.5) = 0.15, as in the z = 0.5 map). The cube is a
+# function of k(z) * cos_theta only, so it is stored as its separable factors:
+# cos_theta of every pixel to the Cortez axis (computed once, chunk by chunk,
+# from the pixel unit vectors) and the k(z) vector. DivergenceCube indexes like
+# the dense float32[npix, n_z] array (cube[pixels] = z-profiles of an alert's
+# localization, cube[:, iz] = one z-slice) and broadcasts only the requested
+# block on demand; peaks come from the cos_theta range kept in the metadata.
+#
+# Files: <cube>.npy float32[npix] cos_theta (RING order) + <cube>.json
+# metadata (z, k, axis, cos_theta range). nside 2048 = 0.2 GB on disk for any
+# number of redshifts (the dense nside 2048 x 100 z cube would be 20 GB).
+# ==============================================================================
+
+CORTEZ_AXIS_RA = 168.0
+CORTEZ_AXIS_DEC = -7.0
+K_PER_Z = 0.3
+A_ANISOTROPY = 0.45
+LAYOUT = 'separable-cos-theta'
+
+def axis_cos_theta(nside, ra_axis=CORTEZ_AXIS_RA, dec_axis=CORTEZ_AXIS_DEC, chunk=1 << 22):
+    """cos(angle to the axis) of every pixel, float32[npix] (vectors built chunk by chunk)."""
+    npix = nside_to_npix(nside)
+    axis = radec_to_vec(ra_axis, dec_axis)
+    cos_theta = np.empty(npix, dtype=np.float32)
+    for start in range(0, npix, chunk):
+        stop = min(start + chunk, npix)
+        cos_theta[start:stop] = pix2vec(nside, np.arange(start, stop)) @ axis
+    return cos_theta
+
+def divergence_percent(k, cos_theta, anisotropy=A_ANISOTROPY):
+    """RRT GW/EM luminosity-distance divergence in percent; broadcasts k against cos_theta."""
+    return np.expm1(k * (1 + anisotropy * cos_theta)) * 100
+
+def metadata_path(cube_path):
+    return os.path.splitext(cube_path)[0] + '.json'
+
+class DivergenceCube:
+    """
+    Read-only view of a stored cube with the indexing of the dense
+    float32[npix, n_z] array; every access evaluates only the selected block.
+    """
+
+    def __init__(self, cos_theta, meta):
+        self.cos_theta = cos_theta
+        self.meta = meta
+        self.k = np.asarray(meta['k'], dtype=np.float32)
+        self.anisotropy = np.float32(meta['anisotropy'])
+        self.shape = (len(cos_theta), len(self.k))
+        self.dtype = np.dtype(np.float32)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        pixels, redshifts = key if isinstance(key, tuple) else (key, slice(None))
+        cos_theta, k = self.cos_theta[pixels], self.k[redshifts]
+        if np.ndim(cos_theta) and np.ndim(k):
+            cos_theta = np.asarray(cos_theta)[..., None]
+        return divergence_percent(k, cos_theta, self.anisotropy)
+
+    def peak(self, z_index):
+        """Largest divergence over the sky at one redshift (from the stored cos_theta range)."""
+        extremes = np.array([self.meta['cos_theta_min'], self.meta['cos_theta_max']], dtype=np.float32)
+        return float(divergence_percent(self.k[z_index], extremes, self.anisotropy).max())
+
+def generate_cube(path, nside, z_values, k_per_z=K_PER_Z, anisotropy=A_ANISOTROPY,
+                  ra_axis=CORTEZ_AXIS_RA, dec_axis=CORTEZ_AXIS_DEC, verbose=False):
+    """
+    Writes the divergence cube of (nside, z_values) to path: the cos_theta
+    factor as a .npy file and the k(z) factor in the metadata next to it.
+    Returns the path.
+    """
+    z_values = np.asarray(z_values, dtype=np.float64)
+    k = (k_per_z * z_values).astype(np.float32)
+    cos_theta = axis_cos_theta(nside, ra_axis, dec_axis)
+    np.save(path, cos_theta)
+    if verbose:
+        print(f"   {len(cos_theta)} pixels written.")
+
+    meta = {'layout': LAYOUT, 'nside': nside, 'ordering': 'RING', 'z': z_values.tolist(), 'k': k.tolist(),
+            'k_per_z': k_per_z, 'anisotropy': anisotropy, 'axis_ra': ra_axis, 'axis_dec': dec_axis,
+            'cos_theta_min': float(cos_theta.min()), 'cos_theta_max': float(cos_theta.max()),
+            'units': 'percent'}
+    with open(metadata_path(path), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return path
+
+def disk_bytes(nside):
+    """Size of the stored cos_theta factor (independent of the number of redshifts)."""
+    return nside_to_npix(nside) * 4
+
+def load_cube(path):
+    """(DivergenceCube over the memory-mapped cos_theta, metadata dict)."""
+    with open(metadata_path(path), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('layout') != LAYOUT:
+        raise ValueError(f"{path}: not a {LAYOUT} cube, regenerate it with python -m trr_core.gw_cube")
+    return DivergenceCube(np.load(path, mmap_mode='r'), meta), meta
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RRT GW distance-divergence cube (HEALPix RING x redshift)")
+    parser.add_argument('output', help="Cube file (.npy); metadata is written next to it (.json)")
+    parser.add_argument('--nside', type=int, default=2048)
+    parser.add_argument('--z-min', type=float, default=0.05)
+    parser.add_argument('--z-max', type=float, default=5.0)
+    parser.add_argument('--n-z', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    z_values = np.linspace(args.z_min, args.z_max, args.n_z)
+    npix = nside_to_npix(args.nside)
+    print(f"-> nside {args.nside} ({npix} pixels) x {args.n_z} redshifts = "
+          f"{disk_bytes(args.nside) / 1024**3:.2f} GB on disk")
+    start = time.perf_counter()
+    generate_cube(args.output, args.nside, z_values)
+    print(f"-> Cube written to {args.output} in {time.perf_counter() - start:.1f} s")
+
+if __name__ == "__main__":
+    main()
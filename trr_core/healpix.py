@@ -0,0 +1,123 @@
+import numpy as np
+
+# ==============================================================================
+# RRT SHARED HEALPIX (RING) PIXELIZATION
+# Used by: GW divergence cube and the all-sky axis scan of the topological audit.
+# Logic: Vectorized pix2vec / vec2pix in the RING scheme (Gorski et al. 2005),
+# with the same formulas as healpy's C++ core; healpy is used instead when it is
+# installed (optional dependency, see requirements.txt).
+# ==============================================================================
+
+def nside_to_npix(nside):
+    return 12 * nside * nside
+
+def _healpy():
+    try:
+        import healpy as hp
+    except ImportError:
+        return None
+    return hp
+
+def _isqrt(x):
+    """Exact floor(sqrt(x)) for int64 arrays (corrects float rounding near perfect squares)."""
+    root = np.floor(np.sqrt(x.astype(np.float64))).astype(np.int64)
+    root -= root * root > x
+    root += (root + 1) * (root + 1) <= x
+    return root
+
+def _pix2vec_ring(nside, pix):
+    """HEALPix RING pixel centres -> (n, 3) unit vectors."""
+    pix = np.asarray(pix, dtype=np.int64)
+    npix = nside_to_npix(nside)
+    ncap = 2 * nside * (nside - 1)
+    fact2 = 4.0 / npix
+    z = np.empty(len(pix))
+    phi = np.empty(len(pix))
+
+    north = pix < ncap
+    south = pix >= npix - ncap
+    equator = ~(north | south)
+
+    p = pix[north]
+    ring = (1 + _isqrt(1 + 2 * p)) >> 1
+    iphi = p + 1 - 2 * ring * (ring - 1)
+    z[north] = 1 - ring * ring * fact2
+    phi[north] = (iphi - 0.5) * (np.pi / 2) / ring
+
+    p = pix[equator] - ncap
+    tmp = p // (4 * nside)
+    ring = tmp + nside
+    iphi = p - tmp * 4 * nside + 1
+    fodd = np.where((ring + nside) & 1, 1.0, 0.5)
+    z[equator] = (2 * nside - ring) * (2.0 / (3 * nside))
+    phi[equator] = (iphi - fodd) * np.pi / (2 * nside)
+
+    p = npix - pix[south]
+    ring = (1 + _isqrt(2 * p - 1)) >> 1
+    iphi = 4 * ring + 1 - (p - 2 * ring * (ring - 1))
+    z[south] = ring * ring * fact2 - 1
+    phi[south] = (iphi - 0.5) * (np.pi / 2) / ring
+
+    sin_theta = np.sqrt((1 - z) * (1 + z))
+    return np.column_stack((sin_theta * np.cos(phi), sin_theta * np.sin(phi), z))
+
+def _vec2pix_ring(nside, vectors):
+    """(n, 3) vectors (any length) -> HEALPix RING pixel indices."""
+    vectors = np.asarray(vectors, dtype=np.float64)
+    z = vectors[:, 2] / np.linalg.norm(vectors, axis=1)
+    phi = np.arctan2(vectors[:, 1], vectors[:, 0])
+    npix = nside_to_npix(nside)
+    ncap = 2 * nside * (nside - 1)
+    za = np.abs(z)
+    tt = np.mod(phi / (np.pi / 2), 4.0)
+    pix = np.empty(len(z), dtype=np.int64)
+
+    equator = za <= 2.0 / 3
+    t1 = nside * (0.5 + tt[equator])
+    t2 = nside * z[equator] * 0.75
+    jp = (t1 - t2).astype(np.int64)   # index of ascending edge line
+    jm = (t1 + t2).astype(np.int64)   # index of descending edge line
+    ring = nside + 1 + jp - jm        # in 1 .. 2*nside + 1
+    kshift = 1 - (ring & 1)
+    ip = ((jp + jm - nside + kshift + 1) >> 1) % (4 * nside)
+    pix[equator] = ncap + (ring - 1) * 4 * nside + ip
+
+    polar = ~equator
+    ttp = tt[polar]
+    tp = ttp - ttp.astype(np.int64)
+    tmp = nside * np.sqrt(3 * (1 - za[polar]))
+    jp = (tp * tmp).astype(np.int64)
+    jm = ((1 - tp) * tmp).astype(np.int64)
+    ring = jp + jm + 1
+    ip = (ttp * ring).astype(np.int64) % (4 * ring)
+    pix[polar] = np.where(z[polar] > 0, 2 * ring * (ring - 1) + ip, npix - 2 * ring * (ring + 1) + ip)
+    return pix
+
+def pix2vec(nside, pix):
+    """RING pixel centres -> (n, 3) unit vectors."""
+    hp = _healpy()
+    if hp is None:
+        return _pix2vec_ring(nside, pix)
+    return np.column_stack(hp.pix2vec(nside, np.asarray(pix), nest=False))
+
+def vec2pix(nside, vectors):
+    """(n, 3) vectors -> RING pixel indices."""
+    hp = _healpy()
+    if hp is None:
+        return _vec2pix_ring(nside, vectors)
+    vectors = np.asarray(vectors)
+    return hp.vec2pix(nside, vectors[:, 0], vectors[:, 1], vectors[:, 2], nest=False)
+
+def radec_to_vec(ra_deg, dec_deg):
+    """Unit vector(s) of (RA, Dec) in degrees: shape (3,) for scalars, (n, 3) for arrays."""
+    ra, dec = np.radians(ra_deg), np.radians(dec_deg)
+    cos_dec = np.cos(dec)
+    return np.stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1)
+
+def vec_to_radec(vectors):
+    """(RA, Dec) in degrees of (n, 3) or (3,) vectors."""
+    vectors = np.asarray(vectors, dtype=np.float64)
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+    ra = np.degrees(np.arctan2(y, x)) % 360
+    dec = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    return ra, dec
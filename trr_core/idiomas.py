@@ -0,0 +1,57 @@
+# ==========================================
+# DICIONÁRIO PROFUNDO - AUDITORIA TÉCNICA
+# Textos da interface e dos relatórios PDF por idioma.
+# Usado por: TRR-Motor.py (carregado uma vez por processo via
+# st.cache_resource) e benchmarks/bench_relatorios.py.
+# ==========================================
+
+LANG = {
+    "PT": {
+        "code": "PT", "btn_enter": "Entrar no Motor TRR", "welcome": "Selecione o seu idioma / Select your language",
+        "title": "🌌 Motor Cosmológico TRR", "author_prefix": "Autor", "theory_name": "Teoria da Relatividade Referencial",
+        "tab1": "📊 Dinâmica Galáctica", "tab2": "👁️ Óptica Cosmológica",
+        "rad": "Raio observado (kpc)", "vobs": "Veloc. Telescópio (km/s)", "vgas": "Velocidade Gás (km/s)", "vdisk": "Veloc. Disco (km/s)", "vbulge": "Veloc. Bojo/Haste (km/s)",
+        "calc": "🚀 Processar TRR", "clear": "🧹 Limpar Tudo", 
+        "zl": "Redshift Lente (z_L)", "zs": "Redshift Fonte (z_S)", "mest": "Massa Estelar Estimada (10^11 M_sol)", "theta": "Anel Einstein Observado (arcsec)", "cluster": "Aglomerado Gigante com Gás?",
+        "pdf_btn": "📄 Baixar Relatório de Auditoria (PDF)", "details": "📚 Ver Parecer Técnico e Matemático",
+        "precision": "Precisão de Unificação", "g_bar": "Física Clássica (Bariônica)", "g_trr": "Previsão TRR", "g_obs": "Telescópio (Real)",
+        "pdf_title_dyn": "RELATÓRIO DE AUDITORIA CIENTÍFICA - DINÂMICA", "pdf_title_opt": "RELATÓRIO DE AUDITORIA CIENTÍFICA - ÓPTICA",
+        "batch_dyn": "📂 Modo em Lote: Curvas de Rotação (SPARC Rotmod / CSV)", "batch_upload_dyn": "Arquivos Rotmod (.dat) ou CSV com várias galáxias (galaxy, Rad, Vobs, Vgas, Vdisk, Vbul)",
+        "batch_btn": "🚀 Processar Lote", "batch_download": "📥 Baixar Resultados do Lote (CSV)", "batch_summary": "Pontos processados",
+        "batch_opt": "📂 Modo em Lote: Catálogo de Lentes (CSV)", "batch_upload_opt": "CSV de lentes (zl, zs, mest, theta, is_cluster)", "batch_summary_opt": "Lentes processadas",
+        "rep_dyn_text": """PARECER TÉCNICO DE DINÂMICA ROTACIONAL:
+1. DIAGNÓSTICO CLÁSSICO: Sob a métrica de Newton/Einstein, a massa bariônica detectada (Gás + Estrelas) gera uma velocidade de apenas {vbar} km/s. A discrepância para os {vobs} km/s observados é de {gap} km/s.
+2. FALHA DO MODELO LAMBDA-CDM: Para sustentar a física clássica, o modelo padrão é forçado a inventar 'ad hoc' halos de Matéria Escura que não interagem com a luz. Sem essa substância imaginária, a física local falha em descrever a galáxia.
+3. A SOLUÇÃO REFERENCIAL (TRR): A TRR não inventa massa. Aplicamos a Constante de Viscosidade do Vácuo (Beta = 0.028006). O 'mismatch' é resolvido pelo arraste viscoso do vácuo fluido.
+RESULTADO: Previsão de {vtrr} km/s com {prec}% de precisão, sem recorrer a matéria invisível.""",
+        "rep_opt_text": """PARECER TÉCNICO DE REFRAÇÃO TEMPORAL:
+1. LIMITE GEOMÉTRICO BARIÔNICO: A massa visível da lente gera um desvio gravitacional de apenas {tbar} arcsec. O telescópio detecta {tobs} arcsec.
+2. FALHA DO MODELO LAMBDA-CDM: A astrofísica clássica 'ad hoc' assume a existência de halos massivos invisíveis para amplificar a curvatura do espaço-tempo e fechar a conta dos dados.
+3. A SOLUÇÃO REFERENCIAL (TRR): A luz sofre Refração Temporal. Atravessando o vácuo viscoso (Fase 3), aplicamos o Índice de Refração de Cortez (eta_C = {etac}). O atraso de fase natural amplifica o desvio para {ttrr} arcsec.
+RESULTADO: Coincidência perfeita com a observação ({prec}%) baseada apenas na viscosidade do meio, tornando obsoleta a hipótese de matéria escura nestas lentes."""
+    },
+    "EN": {
+        "code": "EN", "btn_enter": "Enter TRR Engine", "welcome": "Select your language",
+        "title": "🌌 TRR Cosmological Engine", "author_prefix": "Author", "theory_name": "Referential Relativity Theory",
+        "tab1": "📊 Galactic Dynamics", "tab2": "👁️ Cosmological Optics",
+        "rad": "Observed Radius (kpc)", "vobs": "Telescope Vel. (km/s)", "vgas": "Gas Velocity (km/s)", "vdisk": "Disk Velocity (km/s)", "vbulge": "Bulge/Bar Vel. (km/s)",
+        "calc": "🚀 Process TRR", "clear": "🧹 Clear All", 
+        "zl": "Lens Redshift (z_L)", "zs": "Source Redshift (z_S)", "mest": "Est. Stellar Mass (10^11 M_sol)", "theta": "Observed Einstein Ring (arcsec)", "cluster": "Giant Gas Cluster?",
+        "pdf_btn": "📄 Download Audit Report (PDF)", "details": "📚 View Technical & Mathematical Opinion",
+        "precision": "Unification Accuracy", "g_bar": "Classical Physics (Baryonic)", "g_trr": "TRR Prediction", "g_obs": "Telescope (Real)",
+        "pdf_title_dyn": "SCIENTIFIC AUDIT REPORT - DYNAMICS", "pdf_title_opt": "SCIENTIFIC AUDIT REPORT - OPTICS",
+        "batch_dyn": "📂 Batch Mode: Rotation Curves (SPARC Rotmod / CSV)", "batch_upload_dyn": "Rotmod files (.dat) or a multi-galaxy CSV (galaxy, Rad, Vobs, Vgas, Vdisk, Vbul)",
+        "batch_btn": "🚀 Process Batch", "batch_download": "📥 Download Batch Results (CSV)", "batch_summary": "Points processed",
+        "batch_opt": "📂 Batch Mode: Lens Catalog (CSV)", "batch_upload_opt": "Lens CSV (zl, zs, mest, theta, is_cluster)", "batch_summary_opt": "Lenses processed",
+        "rep_dyn_text": """TECHNICAL DYNAMICS AUDIT:
+1. CLASSICAL DIAGNOSIS: Under Newton/Einstein metrics, the detected baryonic mass generates only {vbar} km/s. The discrepancy with the observed {vobs} km/s is {gap} km/s.
+2. LAMBDA-CDM FAILURE: To sustain classical physics, the standard model is forced to invent 'ad hoc' Dark Matter halos. Without this imaginary substance, local physics fails.
+3. REFERENTIAL SOLUTION (TRR): TRR adds no mass. We apply the Vacuum Viscosity (Beta = 0.028006). The 'mismatch' is resolved by the viscous drag of the fluid vacuum.
+RESULT: Predicted {vtrr} km/s with {prec}% accuracy, without resorting to invisible matter.""",
+        "rep_opt_text": """TECHNICAL REFRACTION AUDIT:
+1. BARYONIC GEOMETRIC LIMIT: Visible lens mass generates a deflection of only {tbar} arcsec. The telescope detects {tobs} arcsec.
+2. LAMBDA-CDM FAILURE: Classical astrophysics assumes 'ad hoc' invisible massive halos to amplify spacetime curvature.
+3. REFERENTIAL SOLUTION (TRR): Light undergoes Time Refraction. Crossing the viscous vacuum (Phase 3), we apply the Cortez Index (eta_C = {etac}). Natural phase delay amplifies deflection to {ttrr} arcsec.
+RESULT: Perfect match with observation ({prec}%) based solely on vacuum viscosity, making the dark matter hypothesis obsolete."""
+    }
+}
@@ -0,0 +1,225 @@
+import cProfile
+import functools
+import json
+import os
+import platform
+import sys
+import time
+
+from trr_core import memory
+
+# ==============================================================================
+# RRT SHARED INSTRUMENTATION: PER-STAGE RUN REPORTS
+# Used by: every audit entry point (run_*_audit / run_*_test and the
+# experimental scripts), and trr_core.runner (--instrument).
+# Logic: An entry point decorated with @instrumented('name') opens a run; inside
+# it, `with stage('ingest', rows=n) as s:` blocks record wall time, CPU time,
+# resident memory and row counts (s.rows may be set inside the block).
+# Memory per stage: RSS at entry and exit and the stage's own peak RSS (Linux
+# peak window, see trr_core/memory.py; None elsewhere), plus the cumulative
+# process peak at exit. Nested stages fold their peak into every open parent.
+# Stages may nest; each is listed in completion order with its nesting depth.
+# At the end the run is written as one JSON report; with TRR_PROFILE set the
+# whole run is also profiled (cProfile .prof file next to the report).
+# Disabled (the default), the decorator is a direct call and stage() returns a
+# shared no-op context manager: one environment lookup per audit, one global
+# read per stage.
+#
+# TRR_INSTRUMENT  '1' -> reports in ./trr_run_reports; any other value is used
+#                 as the report directory
+# TRR_PROFILE     '1' -> cProfile dump of each instrumented run
+# ==============================================================================
+
+ENV_ENABLE = 'TRR_INSTRUMENT'
+ENV_PROFILE = 'TRR_PROFILE'
+DEFAULT_REPORT_DIR = 'trr_run_reports'
+REPORT_VERSION = 2
+
+# The run being recorded in this process (None when instrumentation is off)
+_active = None
+
+def _flag(name):
+    return os.environ.get(name, '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+def enabled():
+    return _flag(ENV_ENABLE)
+
+def report_dir():
+    value = os.environ.get(ENV_ENABLE, '').strip()
+    return DEFAULT_REPORT_DIR if value.lower() in ('1', 'true', 'yes', 'on') else value
+
+class _NullStage:
+    """Stage stand-in when no run is active: entering and exiting cost nothing."""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+class Stage:
+    """One timed stage of the active run."""
+
+    __slots__ = ('name', 'rows', '_run', '_wall', '_cpu', '_depth', '_rss')
+
+    def __init__(self, run, name, rows=None):
+        self._run = run
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self._depth = self._run.depth
+        self._run.depth += 1
+        self._run.open_peak_window()
+        self._rss = memory.current_rss_mb()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self._run.depth = self._depth
+        stage_peak = self._run.close_peak_window()
+        self._run.stages.append({'name': self.name, 'depth': self._depth, 'wall_seconds': wall, 'cpu_seconds': cpu,
+                                 'rss_start_mb': self._rss, 'rss_end_mb': memory.current_rss_mb(),
+                                 'stage_peak_rss_mb': stage_peak,
+                                 'process_peak_rss_mb': memory.peak_rss_mb(),
+                                 'rows': None if self.rows is None else int(self.rows),
+                                 'status': 'ok' if exc_type is None else 'error'})
+        return False
+
+def stage(name, rows=None):
+    """Context manager timing one named stage of the active run (no-op when none is active)."""
+    run = _active
+    if run is None:
+        return _NULL_STAGE
+    return Stage(run, name, rows)
+
+class Run:
+    """Stages and totals of one instrumented audit run."""
+
+    def __init__(self, audit):
+        self.audit = audit
+        self.stages = []
+        self.depth = 0
+        # Running peak RSS of every open stage, innermost last (None: no peak window)
+        self._open_peaks = []
+        self.started = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def _fold_peak(self):
+        """Closes the current peak window into every open stage."""
+        peak = memory.reset_peak_window()
+        self._open_peaks = [None if peak is None or p is None else max(p, peak) for p in self._open_peaks]
+        return peak
+
+    def open_peak_window(self):
+        peak = self._fold_peak()
+        self._open_peaks.append(None if peak is None else memory.current_rss_mb())
+
+    def close_peak_window(self):
+        """Peak RSS in MB reached inside the innermost open stage (None without peak windows)."""
+        self._fold_peak()
+        return self._open_peaks.pop()
+
+    def report(self, status, error=None, profile_path=None):
+        return {'version': REPORT_VERSION, 'audit': self.audit, 'status': status, 'error': error,
+                'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                'wall_seconds': time.perf_counter() - self._wall,
+                'cpu_seconds': time.process_time() - self._cpu,
+                'process_peak_rss_mb': memory.peak_rss_mb(),
+                'stages': self.stages,
+                'profile': profile_path,
+                'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                                'pid': os.getpid(), 'cwd': os.getcwd(), 'argv': sys.argv}}
+
+def _report_path(directory, audit, started, suffix):
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(started))
+    return os.path.join(directory, f"{audit}_{stamp}_{os.getpid()}{suffix}")
+
+def write_report(report, path):
+    """Writes a run report as JSON (atomic rename); returns its path."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+def instrumented(audit):
+    """
+    Decorator for audit entry points. Enabled, each call becomes a run with a
+    JSON report; called inside another run (an entry point calling another),
+    it is recorded as one stage of that run.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def run_audit(*args, **kwargs):
+            global _active
+            if _active is not None:
+                with stage(audit):
+                    return func(*args, **kwargs)
+            if not enabled():
+                return func(*args, **kwargs)
+
+            run = Run(audit)
+            profiler = cProfile.Profile() if _flag(ENV_PROFILE) else None
+            directory = report_dir()
+            status, error = 'ok', None
+            _active = run
+            try:
+                if profiler is not None:
+                    profiler.enable()
+                return func(*args, **kwargs)
+            except BaseException as exc:
+                status, error = 'error', f"{type(exc).__name__}: {exc}"
+                raise
+            finally:
+                _active = None
+                os.makedirs(directory, exist_ok=True)
+                profile_path = None
+                if profiler is not None:
+                    profiler.disable()
+                    profile_path = _report_path(directory, audit, run.started, '.prof')
+                    profiler.dump_stats(profile_path)
+                path = write_report(run.report(status, error, profile_path),
+                                    _report_path(directory, audit, run.started, '.json'))
+                print(f"-> Run report: {path}")
+        return run_audit
+    return decorate
+
+def load_report(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _mb(value):
+    return f"{value:.1f} MB" if value is not None else 'n/a'
+
+def format_report(report):
+    """Printable stage table of a run report (version 1 reports have no per-stage memory)."""
+    lines = [f"{report['audit']} ({report['status']}): {report['wall_seconds']:.3f} s wall, "
+             f"{report['cpu_seconds']:.3f} s CPU, process peak {_mb(report.get('process_peak_rss_mb', report.get('peak_rss_mb')))}"]
+    lines.append(f"   {'stage':<28} {'wall':>11} {'CPU':>15} {'RSS in -> out':>22} {'stage peak':>12}")
+    for s in report['stages']:
+        rows = f"{s['rows']} rows" if s['rows'] is not None else ''
+        name = '  ' * s['depth'] + s['name']
+        lines.append(f"   {name:<28} {s['wall_seconds']:9.3f} s {s['cpu_seconds']:9.3f} s CPU "
+                     f"{_mb(s.get('rss_start_mb')):>10} -> {_mb(s.get('rss_end_mb')):>8} {_mb(s.get('stage_peak_rss_mb')):>12}  {rows}")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    for path in argv:
+        print(format_report(load_report(path)))
+
+if __name__ == "__main__":
+    main()
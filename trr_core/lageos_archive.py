@@ -0,0 +1,374 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from trr_core import sp3
+
+# ==============================================================================
+# RRT LAGEOS EPHEMERIS ARCHIVE (INCREMENTAL MULTI-FILE MODE)
+# Used by: LAGEOS-2 shielding audit and the LAGEOS blindness test (archive mode).
+# Logic: A directory of daily SP3 products is ingested into a persistent store
+# next to it (<archive>.trrlageos/). Only files that are new or whose
+# (mtime, size) changed are parsed, in parallel worker processes; each file's
+# LAGEOS-2 vectors go to their own segment. Epochs already stored (e.g. the
+# midnight overlap of consecutive days) are skipped by checking only the
+# stored files whose epoch range overlaps the new batch. Files deleted from
+# the directory lose their segment and their share of every aggregate; files
+# whose epochs were skipped in their favour are parsed again.
+# The report never reads the vectors back: the manifest keeps, per file and
+# merged, the radial-residual / Cortez-axis correlation as mergeable running
+# moments (count, means, centered second moments and co-moment), and the store
+# keeps the residual plot as per-cell aggregates (count and radius sum per
+# RA x radius cell). Adding one day costs one file's parse and an O(rows of
+# that day + occupied cells) update.
+#
+# Store: manifest.json | grid.<generation>.npz (plot cells)
+#        | segments/<file>.<generation>.npz (epochs int64 us, positions km, cells)
+# One-time / daily update: python -m trr_core.lageos_archive ./sp3_archive
+# ==============================================================================
+
+STORE_SUFFIX = '.trrlageos'
+STORE_VERSION = 2
+SP3_SUFFIXES = ('.sp3', '.sp3.gz')
+CORTEZ_AXIS_RA = 148.9
+
+# Plot cells: RA_BINS over [0, 360) deg; the radius cell width is fixed when the
+# first batch is ingested, as its radius span / RADIUS_BINS_PER_SPAN
+RA_BINS = 400
+RADIUS_BINS_PER_SPAN = 1000
+
+def default_store_path(archive_dir):
+    """Store directory sitting next to the archive (./sp3 -> ./sp3.trrlageos)."""
+    return os.path.normpath(archive_dir) + STORE_SUFFIX
+
+def _source_files(archive_dir):
+    """SP3 products and their (mtime_ns, size) signature, sorted by name."""
+    sources = {}
+    for name in sorted(os.listdir(archive_dir)):
+        if name.endswith(SP3_SUFFIXES):
+            st = os.stat(os.path.join(archive_dir, name))
+            sources[name] = [st.st_mtime_ns, st.st_size]
+    return sources
+
+def radial_alignment(positions, axis_ra=CORTEZ_AXIS_RA):
+    """Instantaneous RA (deg), orbital radius (km) and cos(RA - axis) of (n, 3) positions."""
+    ra = np.degrees(np.arctan2(positions[:, 1], positions[:, 0])) % 360
+    radius = np.linalg.norm(positions, axis=1)
+    return ra, radius, np.cos(np.radians(ra - axis_ra))
+
+class CorrelationMoments:
+    """
+    Running moments of (radius, alignment) pairs. Batches are combined with the
+    pairwise update of Chan et al., which avoids the cancellation of raw sums
+    (radii ~ 12270 km with km-level residuals).
+    """
+
+    FIELDS = ('n', 'mean_r', 'mean_a', 'm2_r', 'm2_a', 'c_ra')
+
+    def __init__(self, n=0, mean_r=0.0, mean_a=0.0, m2_r=0.0, m2_a=0.0, c_ra=0.0):
+        self.n, self.mean_r, self.mean_a = int(n), mean_r, mean_a
+        self.m2_r, self.m2_a, self.c_ra = m2_r, m2_a, c_ra
+
+    @classmethod
+    def from_arrays(cls, radius, alignment):
+        if len(radius) == 0:
+            return cls()
+        dr = radius - radius.mean()
+        da = alignment - alignment.mean()
+        return cls(len(radius), float(radius.mean()), float(alignment.mean()),
+                   float(dr @ dr), float(da @ da), float(dr @ da))
+
+    def merge(self, other):
+        """Adds another batch of pairs in place; returns self."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.__init__(**other.to_dict())
+            return self
+        n = self.n + other.n
+        delta_r = other.mean_r - self.mean_r
+        delta_a = other.mean_a - self.mean_a
+        weight = self.n * other.n / n
+        self.m2_r += other.m2_r + delta_r * delta_r * weight
+        self.m2_a += other.m2_a + delta_a * delta_a * weight
+        self.c_ra += other.c_ra + delta_r * delta_a * weight
+        self.mean_r += delta_r * other.n / n
+        self.mean_a += delta_a * other.n / n
+        self.n = n
+        return self
+
+    def pearson(self):
+        """Pearson correlation between radial residual and Cortez-axis alignment."""
+        return self.c_ra / np.sqrt(self.m2_r * self.m2_a)
+
+    def sigma(self):
+        """Audit significance |r| * sqrt(N)."""
+        return abs(self.pearson()) * np.sqrt(self.n)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+class ResidualCells:
+    """
+    Sparse per-cell aggregates of the residual plot: cell key (radius index *
+    RA_BINS + RA index), point count and sum of the radius offset inside the
+    cell. Counts are exact and offsets are below one cell width, so batches can
+    be added and removed without drift.
+    """
+
+    def __init__(self, keys=None, counts=None, offsets=None):
+        self.keys = np.empty(0, dtype=np.int64) if keys is None else np.asarray(keys, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.offsets = np.empty(0) if offsets is None else np.asarray(offsets, dtype=float)
+
+    @classmethod
+    def from_points(cls, ra, radius, radius_bin_km):
+        finite = np.isfinite(ra) & np.isfinite(radius)
+        ra, radius = ra[finite], radius[finite]
+        radius_index = np.floor(radius / radius_bin_km).astype(np.int64)
+        ra_index = np.minimum((ra * (RA_BINS / 360.0)).astype(np.int64), RA_BINS - 1)
+        keys, inverse = np.unique(radius_index * RA_BINS + ra_index, return_inverse=True)
+        return cls(keys, np.bincount(inverse, minlength=len(keys)),
+                   np.bincount(inverse, weights=radius - radius_index * radius_bin_km, minlength=len(keys)))
+
+    def combine(self, other, sign=1):
+        """Cells of self + sign * other (sign=-1 removes a batch added earlier)."""
+        keys, inverse = np.unique(np.concatenate((self.keys, other.keys)), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate((self.counts, sign * other.counts)), minlength=len(keys))
+        offsets = np.bincount(inverse, weights=np.concatenate((self.offsets, sign * other.offsets)), minlength=len(keys))
+        occupied = counts > 0
+        return ResidualCells(keys[occupied], np.rint(counts[occupied]), offsets[occupied])
+
+    def centers(self, radius_bin_km):
+        """(RA cell centre in deg, mean radius in km, count) of every occupied cell."""
+        radius_index, ra_index = np.divmod(self.keys, RA_BINS)
+        ra = (ra_index + 0.5) * (360.0 / RA_BINS)
+        return ra, radius_index * radius_bin_km + self.offsets / self.counts, self.counts
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, keys=self.keys, counts=self.counts, offsets=self.offsets)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['keys'], data['counts'], data['offsets'])
+
+def _parse_file(path, sat_id):
+    """Worker: (epochs as int64 microseconds, (n, 3) positions) of one satellite in one SP3 file."""
+    records = sp3.select_satellite(sp3.read_sp3(path), sat_id)
+    records = records[~np.isnat(records['epoch'])]
+    return records['epoch'].astype(np.int64), sp3.positions(records)
+
+class LageosArchive:
+    """Persistent epoch-keyed store of one satellite's position vectors, one segment per SP3 file."""
+
+    def __init__(self, archive_dir, store_path=None, sat_id=sp3.LAGEOS2_ID, axis_ra=CORTEZ_AXIS_RA):
+        self.archive_dir = archive_dir
+        self.store_path = store_path or default_store_path(archive_dir)
+        self.sat_id = sat_id
+        self.axis_ra = axis_ra
+        self._segments_dir = os.path.join(self.store_path, 'segments')
+        self._manifest_path = os.path.join(self.store_path, 'manifest.json')
+        self.manifest = self._load_manifest()
+
+    def _empty_manifest(self):
+        return {'version': STORE_VERSION, 'sat_id': self.sat_id, 'axis_ra': self.axis_ra,
+                'generation': 0, 'n_rows': 0, 'radius_bin_km': None, 'grid': None,
+                'files': {}, 'moments': CorrelationMoments().to_dict()}
+
+    def _load_manifest(self):
+        if not os.path.exists(self._manifest_path):
+            return self._empty_manifest()
+        with open(self._manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != STORE_VERSION or manifest.get('sat_id') != self.sat_id:
+            return self._empty_manifest()
+        return manifest
+
+    @property
+    def n_rows(self):
+        return self.manifest['n_rows']
+
+    @property
+    def moments(self):
+        return CorrelationMoments(**self.manifest['moments'])
+
+    def _segment(self, entry, field):
+        with np.load(os.path.join(self._segments_dir, entry['segment'])) as data:
+            return data[field]
+
+    def _stored_entries(self):
+        return [entry for _, entry in sorted(self.manifest['files'].items()) if entry['segment']]
+
+    def epochs(self):
+        """Stored epochs (datetime64[us]), every segment in file-name order."""
+        parts = [self._segment(entry, 'epochs') for entry in self._stored_entries()]
+        return np.concatenate(parts).view('datetime64[us]') if parts else np.empty(0, dtype='datetime64[us]')
+
+    def positions(self):
+        """Stored (n, 3) position vectors in km, every segment in file-name order."""
+        parts = [self._segment(entry, 'positions') for entry in self._stored_entries()]
+        return np.concatenate(parts) if parts else np.empty((0, 3))
+
+    def cells(self):
+        """Residual-plot cell aggregates of everything stored."""
+        grid = self.manifest['grid']
+        return ResidualCells.load(os.path.join(self.store_path, grid)) if grid else ResidualCells()
+
+    def residual_cells(self):
+        """
+        Residual plot data without reading the vectors: (RA in deg, mean radial
+        residual in km, point count) per occupied cell; residuals are taken
+        from the mean radius of the whole archive.
+        """
+        if self.manifest['radius_bin_km'] is None:
+            return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+        ra, radius, counts = self.cells().centers(self.manifest['radius_bin_km'])
+        return ra, radius - self.moments.mean_r, counts
+
+    def _write_manifest(self):
+        tmp_path = self._manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self._manifest_path)
+
+    def _merge_moments(self):
+        """Archive moments from the per-file moments (O(files), no vectors read)."""
+        moments = CorrelationMoments()
+        for _, entry in sorted(self.manifest['files'].items()):
+            moments.merge(CorrelationMoments(**entry['moments']))
+        self.manifest['moments'] = moments.to_dict()
+
+    def recompute_moments(self):
+        """Rebuilds every file's moments from its stored vectors (after an axis change; no SP3 parsing)."""
+        for entry in self._stored_entries():
+            _, radius, alignment = radial_alignment(self._segment(entry, 'positions'), self.axis_ra)
+            entry['moments'] = CorrelationMoments.from_arrays(radius, alignment).to_dict()
+        self.manifest['axis_ra'] = self.axis_ra
+        self._merge_moments()
+
+    def _fresh_mask(self, batch_epochs):
+        """Epochs of the batch that are neither stored nor seen earlier in the batch (files in name order)."""
+        _, first = np.unique(batch_epochs, return_index=True)
+        fresh = np.zeros(len(batch_epochs), dtype=bool)
+        fresh[first] = True
+        if len(batch_epochs) == 0:
+            return fresh
+        low, high = int(batch_epochs.min()), int(batch_epochs.max())
+        for entry in self._stored_entries():
+            # Only files whose epoch range overlaps the batch can hold one of its epochs
+            if entry['first'] <= high and entry['last'] >= low:
+                fresh &= ~np.isin(batch_epochs, self._segment(entry, 'epochs'))
+        return fresh
+
+    def _collect_garbage(self):
+        """Deletes segments and grids the manifest no longer references (also leftovers of an interrupted run)."""
+        referenced = {entry['segment'] for entry in self.manifest['files'].values()}
+        for name in os.listdir(self._segments_dir):
+            if name not in referenced:
+                os.remove(os.path.join(self._segments_dir, name))
+        for name in os.listdir(self.store_path):
+            is_grid = name.startswith('grid.') and (name.endswith('.npz') or name.endswith('.tmp'))
+            if (is_grid and name != self.manifest['grid']) or name in ('epochs.i8', 'positions.f8'):
+                os.remove(os.path.join(self.store_path, name))
+
+    def update(self, workers=None, verbose=False):
+        """
+        Ingests new and changed SP3 files of the archive directory and drops the
+        files that were deleted from it.
+        Returns (ingested file names, skipped file count, new rows).
+        """
+        os.makedirs(self._segments_dir, exist_ok=True)
+        sources = _source_files(self.archive_dir)
+        stored = self.manifest['files']
+        stale = [name for name, entry in stored.items()
+                 if name not in sources or [entry['mtime_ns'], entry['size']] != sources[name]]
+        # Files that skipped epochs held by a stale file are parsed again to take them back
+        dropped = [(stored[name]['first'], stored[name]['last']) for name in stale if stored[name]['segment']]
+        stale += [name for name, entry in stored.items() if name not in stale and entry['span']
+                  and any(entry['span'][0] <= last and entry['span'][1] >= first for first, last in dropped)]
+        pending = [name for name in sources if name not in stored or name in stale]
+
+        cells = self.cells()
+        for name in stale:
+            entry = stored.pop(name)
+            if entry['segment']:
+                file_cells = ResidualCells(*(self._segment(entry, field) for field in ('keys', 'counts', 'offsets')))
+                cells = cells.combine(file_cells, sign=-1)
+            if verbose and name not in sources:
+                print(f"   {name}: removed from the archive, {entry['rows']} epochs dropped")
+        if self.manifest.get('axis_ra') != self.axis_ra:
+            self.recompute_moments()
+
+        parsed = []
+        if pending:
+            paths = [os.path.join(self.archive_dir, name) for name in pending]
+            workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+            if workers == 1:
+                parsed = [_parse_file(path, self.sat_id) for path in paths]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    parsed = list(pool.map(_parse_file, paths, [self.sat_id] * len(paths)))
+
+        batch_epochs = np.concatenate([epochs for epochs, _ in parsed]) if parsed else np.empty(0, dtype=np.int64)
+        fresh = self._fresh_mask(batch_epochs)
+        bounds = np.cumsum([0] + [len(epochs) for epochs, _ in parsed])
+
+        generation = self.manifest['generation'] + 1
+        new_rows = 0
+        for i, (name, (epochs, positions)) in enumerate(zip(pending, parsed)):
+            span = [int(epochs.min()), int(epochs.max())] if len(epochs) else None
+            keep = fresh[bounds[i]:bounds[i + 1]]
+            epochs, positions = epochs[keep], positions[keep].astype('<f8')
+            ra, radius, alignment = radial_alignment(positions, self.axis_ra)
+            entry = {'mtime_ns': sources[name][0], 'size': sources[name][1], 'rows': len(epochs),
+                     'segment': None, 'first': None, 'last': None, 'span': span,
+                     'moments': CorrelationMoments.from_arrays(radius, alignment).to_dict()}
+            if len(epochs):
+                if self.manifest['radius_bin_km'] is None:
+                    span = np.nanmax(radius) - np.nanmin(radius)
+                    self.manifest['radius_bin_km'] = float(span / RADIUS_BINS_PER_SPAN) if span > 0 else 1e-3
+                file_cells = ResidualCells.from_points(ra, radius, self.manifest['radius_bin_km'])
+                cells = cells.combine(file_cells)
+                entry.update(segment=f"{name}.{generation}.npz", first=int(epochs.min()), last=int(epochs.max()))
+                segment_path = os.path.join(self._segments_dir, entry['segment'])
+                with open(segment_path + '.tmp', 'wb') as f:
+                    np.savez(f, epochs=epochs.astype('<i8'), positions=positions, keys=file_cells.keys,
+                             counts=file_cells.counts, offsets=file_cells.offsets)
+                os.replace(segment_path + '.tmp', segment_path)
+            stored[name] = entry
+            new_rows += len(epochs)
+            if verbose:
+                print(f"   {name}: {len(epochs)} new epochs")
+
+        if stale or pending:
+            grid = f"grid.{generation}.npz"
+            cells.save(os.path.join(self.store_path, grid))
+            self.manifest.update(generation=generation, grid=grid,
+                                 n_rows=sum(entry['rows'] for entry in stored.values()))
+            self._merge_moments()
+        # The manifest is the commit point: files it no longer references are deleted after it
+        self._write_manifest()
+        self._collect_garbage()
+        return pending, len(sources) - len(pending), new_rows
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    archive_dir = argv[0] if argv else './sp3_archive'
+    workers = int(argv[1]) if len(argv) > 1 else None
+    archive = LageosArchive(archive_dir)
+    ingested, skipped, new_rows = archive.update(workers=workers, verbose=True)
+    moments = archive.moments
+    print(f"-> {len(ingested)} file(s) ingested, {skipped} unchanged, {new_rows} new epochs "
+          f"({archive.n_rows} stored in {archive.store_path})")
+    if moments.n > 1:
+        print(f"-> Correlation with Cortez Axis ({archive.axis_ra}°): {moments.pearson():.4f} "
+              f"| {moments.sigma():.2f} SIGMA")
+
+if __name__ == "__main__":
+    main()
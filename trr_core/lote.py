@@ -0,0 +1,127 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from trr_core import motor
+
+# ==========================================
+# MOTOR TRR SEM INTERFACE (LOTE / CRON)
+# Executa a física do Motor TRR (Dinâmica Galáctica e Óptica Cosmológica)
+# sobre arquivos CSV ou Parquet grandes, distribuindo blocos de linhas num
+# ProcessPoolExecutor e gravando os resultados em fluxo no arquivo de saída.
+# Os resultados são idênticos aos da interface: ambos usam trr_core/motor.py.
+#
+# Uso:
+#   python -m trr_core.lote dinamica curvas.parquet -o saida.parquet --workers 8
+#   python -m trr_core.lote optica lentes.csv -o saida.csv --chunk-rows 20000
+# ==========================================
+
+MODOS = {
+    'dinamica': (motor.normalizar_tabela_rotacao, motor.processar_lote_dinamica),
+    'optica': (motor.normalizar_catalogo_lentes, motor.processar_lote_optica),
+}
+
+def _eh_parquet(caminho):
+    return caminho.lower().endswith(('.parquet', '.pq'))
+
+def ler_blocos(caminho, linhas_por_bloco):
+    """Lê um CSV ou Parquet em blocos de DataFrame (memória limitada ao bloco)."""
+    if _eh_parquet(caminho):
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=linhas_por_bloco):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, chunksize=linhas_por_bloco)
+
+def processar_bloco(modo, bloco):
+    """Unidade de trabalho de cada processo: normaliza e ajusta um bloco."""
+    normalizar, processar = MODOS[modo]
+    return processar(normalizar(bloco))
+
+class GravadorSaida:
+    """Grava blocos de resultado em fluxo (CSV com cabeçalho único ou Parquet)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.parquet = _eh_parquet(caminho)
+        self._escritor = None
+        self._primeiro = True
+
+    def gravar(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            if self._escritor is None:
+                self._escritor = pq.ParquetWriter(self.caminho, tabela.schema)
+            self._escritor.write_table(tabela.cast(self._escritor.schema))
+        else:
+            df.to_csv(self.caminho, mode='w' if self._primeiro else 'a', header=self._primeiro, index=False)
+        self._primeiro = False
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+def executar_lote(modo, entrada, saida, workers=None, linhas_por_bloco=50000, verbose=True):
+    """
+    Processa 'entrada' no modo indicado e grava 'saida'.
+    Mantém no máximo 2 x workers blocos em voo, preservando a ordem das linhas.
+    Retorna (linhas_processadas, segundos).
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconhecido: {modo} (use {', '.join(MODOS)})")
+    workers = workers or os.cpu_count() or 1
+    gravador = GravadorSaida(saida)
+    linhas, inicio = 0, time.perf_counter()
+
+    def registrar(resultado):
+        nonlocal linhas
+        gravador.gravar(resultado)
+        linhas += len(resultado)
+        if verbose:
+            decorrido = time.perf_counter() - inicio
+            print(f"   {linhas} linhas | {linhas / max(decorrido, 1e-9):,.0f} linhas/s", file=sys.stderr)
+
+    try:
+        if workers == 1:
+            for bloco in ler_blocos(entrada, linhas_por_bloco):
+                registrar(processar_bloco(modo, bloco))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                em_voo = deque()
+                for bloco in ler_blocos(entrada, linhas_por_bloco):
+                    em_voo.append(pool.submit(processar_bloco, modo, bloco))
+                    if len(em_voo) >= 2 * workers:
+                        registrar(em_voo.popleft().result())
+                while em_voo:
+                    registrar(em_voo.popleft().result())
+    finally:
+        gravador.fechar()
+    return linhas, time.perf_counter() - inicio
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Motor TRR em lote (sem Streamlit) / TRR engine batch CLI")
+    parser.add_argument('modo', choices=sorted(MODOS), help="dinamica (curvas de rotação) ou optica (lentes)")
+    parser.add_argument('entrada', help="Arquivo de entrada (.csv ou .parquet)")
+    parser.add_argument('-o', '--saida', required=True, help="Arquivo de saída (.csv ou .parquet)")
+    parser.add_argument('--workers', type=int, default=None, help="Processos (padrão: número de CPUs)")
+    parser.add_argument('--chunk-rows', type=int, default=50000, help="Linhas por bloco enviado a cada processo")
+    parser.add_argument('--quiet', action='store_true', help="Sem progresso por bloco")
+    args = parser.parse_args(argv)
+
+    print("="*80)
+    print(f"MOTOR TRR EM LOTE: {args.modo.upper()} | {args.entrada} -> {args.saida}")
+    print("="*80)
+    linhas, segundos = executar_lote(args.modo, args.entrada, args.saida, args.workers, args.chunk_rows, not args.quiet)
+    print(f"-> {linhas} linhas em {segundos:.2f} s ({linhas / max(segundos, 1e-9):,.0f} linhas/s)")
+    print(f"-> Resultados gravados em: {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import sys
+
+# ==============================================================================
+# RRT SHARED MEMORY PROBE
+# Peak resident set size of the current process, reported by the audits.
+# Uses the standard 'resource' module (Linux/macOS); falls back to psutil when
+# it is installed, otherwise the figure is reported as unavailable.
+# Per-stage peaks (trr_core.instrumentation) use the Linux peak window: VmHWM in
+# /proc/self/status is read and reset to the current RSS through
+# /proc/self/clear_refs. The reset also lowers ru_maxrss, so the peaks read
+# before each reset are kept here and peak_rss_mb() stays the process peak.
+# ==============================================================================
+
+# Largest peak window closed by reset_peak_window() (MB)
+_closed_windows_peak = 0.0
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None if it cannot be measured."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1024**2
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    peak = peak / 1024**2 if sys.platform == 'darwin' else peak / 1024
+    return max(peak, _closed_windows_peak)
+
+def _proc_status_mb(field):
+    """A 'kB' field of /proc/self/status in MB, or None off Linux."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def current_rss_mb():
+    """Resident memory of this process right now in MB, or None if it cannot be measured."""
+    rss = _proc_status_mb('VmRSS')
+    if rss is not None:
+        return rss
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / 1024**2
+
+def reset_peak_window():
+    """
+    Peak RSS in MB since the previous reset (or process start), restarting the
+    window at the current RSS. None where the peak cannot be reset (non-Linux,
+    or /proc/self/clear_refs not writable).
+    """
+    global _closed_windows_peak
+    peak = _proc_status_mb('VmHWM')
+    if peak is None:
+        return None
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return None
+    _closed_windows_peak = max(_closed_windows_peak, peak)
+    return peak
+
+def peak_rss_label():
+    """Printable peak memory figure for the audit reports."""
+    peak = peak_rss_mb()
+    return f"{peak:.1f} MB" if peak is not None else "unavailable on this platform"
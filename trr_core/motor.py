@@ -0,0 +1,223 @@
+import os
+import numpy as np
+import pandas as pd
+from trr_core import cosmology
+
+# ==========================================
+# FÍSICA DO MOTOR TRR (VETORIZADA)
+# Usada pela interface Streamlit (TRR-Motor.py) e pelos modos em lote.
+# Cada busca de M/L é avaliada como uma única operação de array
+# (pontos x grade), em vez de um laço Python por ponto.
+# ==========================================
+
+BETA = 0.028006
+A0 = 1.2001e-10
+G = 6.67430e-11
+C = 299792458.0
+KPC_M = 3.086e19
+M_SOL_KG = 1.989e30
+RAD_ARCSEC = 206264.806
+
+# Grade de M/L do disco (0.10 ... 1.00); o bojo usa M/L do disco + 0.2
+GRADE_ML_DINAMICA = np.arange(10, 101) / 100.0
+
+# Grade do fator M/L das lentes (0.50 ... 2.50)
+GRADE_ML_OPTICA = np.arange(50, 251) / 100.0
+
+COLUNAS_ROTMOD = ['Rad', 'Vobs', 'errV', 'Vgas', 'Vdisk', 'Vbul', 'SBdis', 'SBbul']
+COLUNAS_DINAMICA = ['Rad', 'Vobs', 'Vgas', 'Vdisk', 'Vbul']
+COLUNAS_LENTES = ['zl', 'zs', 'mest', 'theta', 'is_cluster']
+
+def preparar_grades():
+    """
+    Monta de antemão as tabelas de consulta do motor (a tabela de distâncias
+    comóveis da cosmologia do motor), para que o primeiro cálculo não pague por ela.
+    """
+    distancias_lentes(np.array([0.5]), np.array([1.0]))
+
+def ajustar_dinamica(rad, v_obs, v_gas, v_disk, v_bulge):
+    """
+    Busca do melhor M/L para um ou vários pontos de curva de rotação.
+    Aceita escalares ou arrays (mesmo formato) e devolve um dicionário de arrays
+    com 'vtrr', 'prec', 'vbar', 'vobs' e 'ml'. Pontos com rad <= 0 ou v_obs <= 0
+    recebem NaN (a interface não produz resultado nesses casos).
+    """
+    rad, v_obs, v_gas, v_disk, v_bulge = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (rad, v_obs, v_gas, v_disk, v_bulge)])
+    forma = rad.shape
+    rad, v_obs, v_gas, v_disk, v_bulge = [v.reshape(-1, 1) for v in (rad, v_obs, v_gas, v_disk, v_bulge)]
+
+    ml_disk = GRADE_ML_DINAMICA[None, :]
+    ml_bulge = ml_disk + 0.2
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        v_bar_sq = (v_gas**2) + (ml_disk * v_disk**2) + (ml_bulge * v_bulge**2)
+        g_bar = (v_bar_sq * 1e6) / (rad * KPC_M)
+        g_obs = (v_obs**2 * 1e6) / (rad * KPC_M)
+        x = g_bar / A0
+        g_fase = g_bar / (1 - np.exp(-np.sqrt(x)))
+        fator_impacto = v_bulge / (v_disk + np.abs(v_gas) + 0.1)
+        g_trr = g_fase * (1 + BETA * fator_impacto)
+        erro = np.abs(g_obs - g_trr) / g_obs
+
+    # Candidatos inválidos (v_bar_sq < 0, divisões 0/0) nunca vencem a busca
+    erro = np.where(np.isnan(erro) | (v_bar_sq < 0), np.inf, erro)
+    melhor = np.argmin(erro, axis=1)[:, None]
+    melhor_erro = np.take_along_axis(erro, melhor, axis=1)[:, 0]
+    achou = np.isfinite(melhor_erro)
+
+    with np.errstate(invalid='ignore'):
+        v_trr = np.sqrt((np.take_along_axis(g_trr, melhor, axis=1)[:, 0] * rad[:, 0] * KPC_M) / 1e6)
+        v_bar = np.sqrt(np.take_along_axis(v_bar_sq, melhor, axis=1)[:, 0])
+    resultado = {
+        'vtrr': np.where(achou, v_trr, 0.0),
+        'prec': np.maximum(0, 100 - (melhor_erro * 100)),
+        'vbar': np.where(achou, v_bar, 0.0),
+        'vobs': v_obs[:, 0],
+        'ml': np.where(achou, GRADE_ML_DINAMICA[melhor[:, 0]], np.nan),
+    }
+
+    valido = (rad[:, 0] > 0) & (v_obs[:, 0] > 0)
+    for chave in ('vtrr', 'prec', 'vbar', 'ml'):
+        resultado[chave] = np.where(valido, resultado[chave], np.nan)
+    return {chave: valor.reshape(forma) for chave, valor in resultado.items()}
+
+def ler_tabela_rotacao(fonte, nome=None):
+    """
+    Lê um arquivo SPARC Rotmod (.dat) ou um CSV com várias galáxias.
+    CSV: colunas Rad, Vobs, Vgas, Vdisk, Vbul e, opcionalmente, 'galaxy'.
+    Rotmod: uma galáxia por arquivo, identificada pelo nome do arquivo.
+    Retorna um DataFrame com a coluna 'galaxy' seguida das colunas numéricas.
+    """
+    nome = nome or getattr(fonte, 'name', None) or str(fonte)
+    base = os.path.basename(nome)
+    if base.lower().endswith('.csv'):
+        return normalizar_tabela_rotacao(pd.read_csv(fonte), os.path.splitext(base)[0])
+    df = pd.read_csv(fonte, sep=r'\s+', comment='#', header=None, names=COLUNAS_ROTMOD)
+    return normalizar_tabela_rotacao(df, os.path.splitext(base)[0].replace('_rotmod', ''))
+
+def ler_tabelas_rotacao(fontes):
+    """Lê e concatena vários arquivos Rotmod/CSV (por exemplo, os enviados na interface)."""
+    return pd.concat([ler_tabela_rotacao(fonte) for fonte in fontes], ignore_index=True)
+
+def normalizar_tabela_rotacao(df, galaxia_padrao='galaxy'):
+    """
+    Padroniza uma tabela de curvas de rotação (nomes de colunas sem distinção de
+    maiúsculas, valores numéricos, componentes ausentes = 0) para o ajuste em lote.
+    """
+    mapa = {c.lower(): c for c in COLUNAS_ROTMOD + ['galaxy']}
+    df = df.rename(columns={c: mapa[c.lower()] for c in df.columns if c.lower() in mapa})
+    faltando = [c for c in COLUNAS_DINAMICA if c not in df.columns]
+    if faltando:
+        raise ValueError(f"{galaxia_padrao}: colunas ausentes {faltando}")
+    if 'galaxy' not in df.columns:
+        df['galaxy'] = galaxia_padrao
+
+    for coluna in COLUNAS_DINAMICA:
+        df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+    df = df.dropna(subset=['Rad', 'Vobs'])
+    df[['Vgas', 'Vdisk', 'Vbul']] = df[['Vgas', 'Vdisk', 'Vbul']].fillna(0.0)
+    return df[['galaxy'] + [c for c in df.columns if c != 'galaxy']].reset_index(drop=True)
+
+def processar_lote_dinamica(df):
+    """
+    Ajusta todos os pontos de todas as galáxias de uma vez.
+    Retorna a tabela de entrada com as colunas ml_best, vbar, vtrr e prec.
+    """
+    res = ajustar_dinamica(df['Rad'].to_numpy(), df['Vobs'].to_numpy(), df['Vgas'].to_numpy(),
+                           df['Vdisk'].to_numpy(), df['Vbul'].to_numpy())
+    saida = df.copy()
+    saida['ml_best'] = res['ml']
+    saida['vbar'] = res['vbar']
+    saida['vtrr'] = res['vtrr']
+    saida['prec'] = res['prec']
+    return saida
+
+def distancias_lentes(zl, zs):
+    """D_L, D_S e D_LS (metros) para arrays de lentes, na cosmologia do motor."""
+    d_l, d_s, d_ls = cosmology.lens_distances(zl, zs, h0=cosmology.H0_ENGINE, om=cosmology.OM_ENGINE)
+    return d_l * cosmology.MPC_M, d_s * cosmology.MPC_M, d_ls * cosmology.MPC_M
+
+def ajustar_optica(zl, zs, mest, theta, is_cluster):
+    """
+    Busca do melhor fator M/L para uma ou várias lentes gravitacionais.
+    As distâncias do catálogo inteiro são calculadas numa única chamada e a grade
+    (lentes x fator_ml) é avaliada como um único array. Devolve um dicionário de
+    arrays com 'ttrr', 'prec', 'tbar', 'tobs', 'etac', 'fator_ml', 'D_L', 'D_S'
+    e 'D_LS'. Lentes inválidas (zl <= 0, zs <= zl, theta <= 0, mest <= 0) recebem NaN.
+    """
+    zl, zs, mest, theta, is_cluster = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (zl, zs, mest, theta, is_cluster)])
+    forma = zl.shape
+    zl, zs, mest, theta, is_cluster = [v.reshape(-1) for v in (zl, zs, mest, theta, is_cluster)]
+    valido = (zl > 0) & (zs > zl) & (theta > 0) & (mest > 0)
+
+    D_L, D_S, D_LS = distancias_lentes(np.where(valido, zl, 0.0), np.where(valido, zs, 0.0))
+    D_L, D_S, D_LS, theta_c, zl_c = [v[:, None] for v in (D_L, D_S, D_LS, theta, zl)]
+
+    mult_gas = np.where(is_cluster != 0, 7.0, 1.0)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        M_bar_kg = (mest[:, None] * GRADE_ML_OPTICA[None, :] * mult_gas) * 1e11 * M_SOL_KG
+        termo_massa = (4 * G * M_bar_kg) / (C**2)
+        theta_bar_rad = np.sqrt(termo_massa * (D_LS / (D_L * D_S)))
+        g_bar = (G * M_bar_kg) / ((theta_bar_rad * D_L)**2)
+        x = g_bar / A0
+        fator_fase = 1.0 / (1.0 - np.exp(-np.sqrt(x)))
+        eta_C = 1.0 + BETA * np.log(1 + zl_c)
+        theta_trr = theta_bar_rad * np.sqrt(fator_fase) * eta_C * RAD_ARCSEC
+        erro = np.abs(theta_c - theta_trr) / theta_c
+
+    erro = np.where(np.isnan(erro), np.inf, erro)
+    melhor = np.argmin(erro, axis=1)[:, None]
+    melhor_erro = np.take_along_axis(erro, melhor, axis=1)[:, 0]
+    achou = np.isfinite(melhor_erro)
+
+    resultado = {
+        'ttrr': np.where(achou, np.take_along_axis(theta_trr, melhor, axis=1)[:, 0], 0.0),
+        'prec': np.maximum(0, 100 - (melhor_erro * 100)),
+        'tbar': np.where(achou, np.take_along_axis(theta_bar_rad, melhor, axis=1)[:, 0] * RAD_ARCSEC, 0.0),
+        'tobs': theta,
+        'etac': np.where(achou, eta_C[:, 0], 0.0),
+        'fator_ml': np.where(achou, GRADE_ML_OPTICA[melhor[:, 0]], np.nan),
+        'D_L': D_L[:, 0], 'D_S': D_S[:, 0], 'D_LS': D_LS[:, 0],
+    }
+    for chave in resultado:
+        if chave != 'tobs':
+            resultado[chave] = np.where(valido, resultado[chave], np.nan)
+    return {chave: valor.reshape(forma) for chave, valor in resultado.items()}
+
+def ler_catalogo_lentes(fonte):
+    """
+    Lê um CSV de lentes com as colunas zl, zs, mest (10^11 M_sol), theta (arcsec)
+    e is_cluster (0/1, true/false, sim/não). Colunas extras são preservadas.
+    """
+    return normalizar_catalogo_lentes(pd.read_csv(fonte))
+
+def normalizar_catalogo_lentes(df):
+    """Padroniza um catálogo de lentes (colunas, tipos e is_cluster booleano)."""
+    df = df.rename(columns={c: c.strip().lower() for c in df.columns})
+    if 'is_cluster' not in df.columns:
+        df['is_cluster'] = False
+    faltando = [c for c in COLUNAS_LENTES if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Catálogo de lentes: colunas ausentes {faltando}")
+    for coluna in ['zl', 'zs', 'mest', 'theta']:
+        df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+    texto = df['is_cluster'].astype(str).str.strip().str.lower()
+    df['is_cluster'] = texto.isin(['1', '1.0', 'true', 'yes', 'sim', 'y', 's'])
+    return df
+
+def processar_lote_optica(df):
+    """
+    Ajusta todas as lentes de um catálogo de uma vez.
+    Retorna a tabela de entrada com distâncias (Mpc), fator_ml, tbar, ttrr, etac e prec.
+    """
+    res = ajustar_optica(df['zl'].to_numpy(), df['zs'].to_numpy(), df['mest'].to_numpy(),
+                         df['theta'].to_numpy(), df['is_cluster'].to_numpy())
+    saida = df.copy()
+    saida['D_L_mpc'] = res['D_L'] / cosmology.MPC_M
+    saida['D_S_mpc'] = res['D_S'] / cosmology.MPC_M
+    saida['D_LS_mpc'] = res['D_LS'] / cosmology.MPC_M
+    saida['fator_ml'] = res['fator_ml']
+    saida['tbar'] = res['tbar']
+    saida['ttrr'] = res['ttrr']
+    saida['etac'] = res['etac']
+    saida['prec'] = res['prec']
+    return saida
@@ -0,0 +1,86 @@
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, LogNorm, to_rgb
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# ==============================================================================
+# RRT SHARED PLOTTING LAYER: AGGREGATED DENSITY RENDERING
+# Used by: phase drag, SMBH growth causality and LAGEOS residual audits.
+# Logic: Instead of one marker per object, points are pre-binned with NumPy into
+# a fixed 2-D histogram and drawn as a single image, so the drawing cost does
+# not depend on N. Figures are built with the object-oriented API (no pyplot)
+# in a background thread: the audit prints its numeric verdict immediately and
+# collects the saved plot at the end.
+# ==============================================================================
+
+DENSITY_BINS = (400, 250)   # (x, y) cells of the density image
+
+_render_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trr-plot")
+atexit.register(_render_pool.shutdown, wait=True)
+
+def _single_color_cmap(color):
+    """Transparent-to-opaque ramp of one color (lets several layers overlap)."""
+    r, g, b = to_rgb(color)
+    return LinearSegmentedColormap.from_list(f"trr_{color}", [(r, g, b, 0.15), (r, g, b, 1.0)])
+
+def _data_range(x, y):
+    x, y = np.asarray(x), np.asarray(y)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.any():
+        return [[0.0, 1.0], [0.0, 1.0]]
+    return [[np.min(x[finite]), np.max(x[finite])], [np.min(y[finite]), np.max(y[finite])]]
+
+def shared_data_range(x, *ys):
+    """Binning range covering several layers drawn over the same x (empty input gives [0, 1])."""
+    x = np.asarray(x)
+    return _data_range(np.tile(x, len(ys)), np.concatenate([np.asarray(y) for y in ys]))
+
+def density_layer(ax, x, y, color=None, cmap='viridis', values=None, label=None,
+                  bins=DENSITY_BINS, data_range=None, weights=None):
+    """
+    Draws (x, y) on ax as a binned image.
+    Without values the cell shade is the object count (log scale), in a single
+    color ramp when color is given. With values the cell shows the mean value of
+    its objects through cmap (the density analogue of scatter(..., c=values)).
+    weights gives the object count of each point when the input is already
+    aggregated (one point per pre-binned cell).
+    A legend entry is added when label is given. Returns the image artist.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+    data_range = data_range or _data_range(x, y)
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=data_range, weights=weights)
+    extent = (x_edges[0], x_edges[-1], y_edges[0], y_edges[-1])
+    empty = counts == 0
+
+    if values is None:
+        image = np.ma.masked_where(empty, counts)
+        norm = LogNorm(vmin=1, vmax=max(counts.max(), 1))
+        artist = ax.imshow(image.T, origin='lower', extent=extent, aspect='auto', interpolation='nearest',
+                           cmap=_single_color_cmap(color) if color else cmap, norm=norm)
+    else:
+        values = np.asarray(values, dtype=float)
+        sums, _, _ = np.histogram2d(x, y, bins=(x_edges, y_edges), weights=values if weights is None else values * weights)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            image = np.ma.masked_where(empty, sums / counts)
+        artist = ax.imshow(image.T, origin='lower', extent=extent, aspect='auto', interpolation='nearest', cmap=cmap)
+
+    if label:
+        ax.scatter([], [], s=20, color=color or artist.cmap(0.8), label=label)
+    return artist
+
+def render_in_background(draw, path, figsize=(10, 6), dpi=300):
+    """
+    Builds a figure with draw(fig) in the plotting thread and saves it to path.
+    Returns a Future that resolves to path once the file is written.
+    """
+    def job():
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        draw(fig)
+        fig.savefig(path, dpi=dpi)
+        return path
+    return _render_pool.submit(job)
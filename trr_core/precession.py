@@ -0,0 +1,90 @@
+import numpy as np
+
+from trr_core import cache, catalogs
+
+# ==============================================================================
+# RRT CORTEZ PRECESSION FIT: CLOSED-FORM SUFFICIENT STATISTICS
+# Used by: SDSS jackknife stability audits (fit_mode='closed_form').
+# Logic: The model  Delta_m = d0 * z * cos(RA - theta0 - OMEGA_P/z)  is linear in
+# (a, b) = (d0*cos(theta0), d0*sin(theta0)) with features
+#     x_c = z*cos(RA - OMEGA_P/z),   x_s = z*sin(RA - OMEGA_P/z).
+# The 2x2 normal equations only need five sums (Sxx, Sxy, Syy, Sxt, Syt). They
+# are accumulated once per block of rows; any jackknife/bootstrap subset of
+# blocks is then solved from the sum of its block sums in O(blocks), not O(N).
+# The model is invariant under (d0, theta0) -> (-d0, theta0 + 180); solutions are
+# reported on the branch the audits' least_squares fit converges to from its
+# initial guess, i.e. theta0 within 90 deg of BRANCH_DIRECTION (d0 takes the sign).
+# The resonance stratum both jackknife audits fit (z: 1.5-2.0, Hubble-detrended
+# PSFMAG[i]) is memoized by trr_core.cache, keyed by the FITS content.
+# ==============================================================================
+
+# Column order of a sufficient-statistics vector
+SUMS = ('Sxx', 'Sxy', 'Syy', 'Sxt', 'Syt')
+
+# Resonance stratum (Phase 3 viscous layer) of the SDSS jackknife audits
+STRATUM_COLUMNS = {'ra': 'RA', 'z': 'Z', 'mag': ('PSFMAG', 3)}
+STRATUM_Z_RANGE = (1.5, 2.0)
+
+# Initial direction of the least_squares fit (NOMINAL_DIRECTION, Primordial Axis)
+BRANCH_DIRECTION = 148.9
+
+def load_resonance_stratum(file_path):
+    """
+    RA, z and Hubble-detrended magnitude (mag - 5 log10 z) of the objects with
+    z in STRATUM_Z_RANGE and a valid magnitude, as a dict of arrays. Only the
+    first run on a given file reads it; later runs load the cached stratum.
+    """
+    def ingest():
+        # Column projection over a memory-mapped FITS: only RA, Z and PSFMAG[i] are read
+        cols = catalogs.read_fits_columns(file_path, STRATUM_COLUMNS)
+        z_min, z_max = STRATUM_Z_RANGE
+        mask = (cols['z'] >= z_min) & (cols['z'] <= z_max) & (cols['mag'] > 0)
+        z = cols['z'][mask]
+        return {'ra': cols['ra'][mask], 'z': z, 'mag_res': cols['mag'][mask] - (5 * np.log10(z))}
+
+    params = {'columns': STRATUM_COLUMNS, 'z_range': STRATUM_Z_RANGE, 'detrend': '5*log10(z)'}
+    return cache.memoize('sdss_resonance_stratum', [file_path], params, ingest)
+
+def design_features(ra, z, omega_p):
+    """Linear features (x_c, x_s) of the precession model (RA in degrees, OMEGA_P in deg/z)."""
+    psi = np.radians(ra - omega_p / z)
+    return z * np.cos(psi), z * np.sin(psi)
+
+def sufficient_statistics(ra, z, mag_res, omega_p, block_ids=None, n_blocks=1):
+    """
+    Normal-equation sums of the precession model.
+    Without block_ids returns a (5,) vector; with block_ids (values in 0..n_blocks-1)
+    returns an (n_blocks, 5) array of per-block sums.
+    """
+    x_c, x_s = design_features(ra, z, omega_p)
+    terms = (x_c * x_c, x_c * x_s, x_s * x_s, x_c * mag_res, x_s * mag_res)
+    if block_ids is None:
+        return np.array([np.sum(t) for t in terms])
+    return np.stack([np.bincount(block_ids, weights=t, minlength=n_blocks) for t in terms], axis=-1)
+
+def assign_blocks(n, n_blocks, seed=None):
+    """Random, balanced assignment of n rows to n_blocks blocks (seeded)."""
+    return np.random.default_rng(seed).permutation(n) % n_blocks
+
+def solve(sums, branch_direction=BRANCH_DIRECTION):
+    """
+    Solves the 2x2 normal equations for (..., 5) sufficient statistics.
+    Returns (d0, theta0) with theta0 in degrees, in [0, 360), on the branch
+    within 90 deg of branch_direction; d0 is negative when the branch is flipped.
+    """
+    sums = np.asarray(sums, dtype=float)
+    sxx, sxy, syy, sxt, syt = np.moveaxis(sums, -1, 0)
+    det = sxx * syy - sxy * sxy
+    a = (syy * sxt - sxy * syt) / det
+    b = (sxx * syt - sxy * sxt) / det
+    d0, theta0 = np.hypot(a, b), np.degrees(np.arctan2(b, a))
+    flipped = np.cos(np.radians(theta0 - branch_direction)) < 0
+    return np.where(flipped, -d0, d0)[()], (np.where(flipped, theta0 + 180, theta0) % 360)[()]
+
+def fit(ra, z, mag_res, omega_p):
+    """Exact least-squares (d0, theta0) over all rows."""
+    return solve(sufficient_statistics(ra, z, mag_res, omega_p))
+
+def solve_block_subset(block_sums, idx):
+    """Resampling statistic: fit on the blocks listed in idx (repeats count as weights)."""
+    return solve(block_sums[idx].sum(axis=0))
@@ -0,0 +1,102 @@
+import io
+import threading
+import numpy as np
+from PIL import Image
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+# ==========================================
+# MOTORES GRÁFICOS E PDF (AUDITORIA) - EM MEMÓRIA
+# O gráfico é desenhado num modelo de figura reutilizado (backend Agg, sem
+# pyplot), convertido para PNG RGB num buffer e embutido no PDF (fpdf2) via
+# pdf.image() direto do buffer; o PDF também sai da memória, sem disco.
+# ==========================================
+
+DPI_GRAFICO = 150
+CORES_BARRAS = ['#e74c3c', '#3498db', '#2ecc71']
+
+# Um modelo de figura por thread (o Streamlit atende cada sessão numa thread)
+_modelo = threading.local()
+
+def _figura_modelo():
+    fig = getattr(_modelo, 'fig', None)
+    if fig is None:
+        fig = Figure(figsize=(7, 4), dpi=DPI_GRAFICO)
+        FigureCanvasAgg(fig)
+        fig.add_subplot(111)
+        _modelo.fig = fig
+    return fig
+
+def criar_grafico(val_bar, val_trr, val_obs, lbl_bar, lbl_trr, lbl_obs, is_dyn=True):
+    """Desenha o gráfico de barras da auditoria e devolve os bytes PNG (RGB, 150 dpi)."""
+    fig = _figura_modelo()
+    ax = fig.axes[0]
+    ax.clear()
+    labels = [lbl_bar, lbl_trr, lbl_obs]
+    valores = [val_bar, val_trr, val_obs]
+
+    barras = ax.bar(labels, valores, color=CORES_BARRAS, width=0.6)
+    ax.set_ylabel("Vel. (km/s)" if is_dyn else "Dev (arcsec)", fontweight='bold')
+    ax.set_ylim(0, max(valores) * 1.3)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    for barra in barras:
+        yval = barra.get_height()
+        ax.text(barra.get_x() + barra.get_width()/2, yval + (max(valores)*0.02), f'{yval:.2f}', ha='center', va='bottom', fontweight='bold', fontsize=10)
+
+    fig.tight_layout()
+    fig.canvas.draw()
+    # Sem canal alfa: o PDF não precisa de máscara de transparência
+    rgb = np.asarray(fig.canvas.buffer_rgba())[:, :, :3]
+    buffer = io.BytesIO()
+    Image.fromarray(rgb).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def _latin1(texto):
+    """Normalização latin-1 simplificada (as fontes padrão do PDF são latin-1)."""
+    return texto.encode('latin-1', 'replace').decode('latin-1')
+
+def gerar_pdf(is_dyn, dict_dados, L_pdf):
+    """Gera o relatório de auditoria (bytes PDF) com o pacote de idioma L_pdf já resolvido."""
+    pdf = FPDF()
+    pdf.add_page()
+
+    # Cabeçalho Oficial
+    pdf.set_font("Helvetica", 'B', 16)
+    pdf.cell(0, 10, "TEORIA DA RELATIVIDADE REFERENCIAL (TRR)", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    pdf.set_font("Helvetica", 'I', 10)
+    pdf.cell(0, 8, "Relatório de Auditoria Automatizada - Protocolo de Unificação", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    pdf.ln(5)
+    pdf.line(10, 30, 200, 30)
+    pdf.ln(10)
+
+    # Título do Relatório
+    pdf.set_font("Helvetica", 'B', 12)
+    titulo = L_pdf["pdf_title_dyn"] if is_dyn else L_pdf["pdf_title_opt"]
+    pdf.cell(0, 10, _latin1(titulo), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(5)
+
+    # Texto de Diagnóstico
+    pdf.set_font("Helvetica", size=11)
+    if is_dyn:
+        texto = L_pdf["rep_dyn_text"].format(vbar=f"{dict_dados['vbar']:.2f}", vobs=f"{dict_dados['vobs']:.2f}", gap=f"{dict_dados['vobs'] - dict_dados['vbar']:.2f}", vtrr=f"{dict_dados['vtrr']:.2f}", prec=f"{dict_dados['prec']:.2f}")
+        png = criar_grafico(dict_dados['vbar'], dict_dados['vtrr'], dict_dados['vobs'], L_pdf["g_bar"], L_pdf["g_trr"], L_pdf["g_obs"], True)
+    else:
+        texto = L_pdf["rep_opt_text"].format(tbar=f"{dict_dados['tbar']:.2f}", tobs=f"{dict_dados['tobs']:.2f}", etac=f"{dict_dados['etac']:.5f}", ttrr=f"{dict_dados['ttrr']:.2f}", prec=f"{dict_dados['prec']:.2f}")
+        png = criar_grafico(dict_dados['tbar'], dict_dados['ttrr'], dict_dados['tobs'], L_pdf["g_bar"], L_pdf["g_trr"], L_pdf["g_obs"], False)
+
+    for linha in texto.split('\n'):
+        pdf.multi_cell(0, 7, _latin1(linha), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    pdf.ln(10)
+    pdf.image(io.BytesIO(png), x=20, w=170)
+
+    # Rodapé de Autenticidade
+    pdf.set_y(-30)
+    pdf.set_font("Helvetica", 'I', 8)
+    pdf.cell(0, 10, "Este documento prova a redundância da matéria escura através da aplicação da constante Beta.", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+
+    # fpdf2 devolve um bytearray
+    return bytes(pdf.output())
@@ -0,0 +1,207 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# ==============================================================================
+# RRT SHARED RESAMPLING ENGINE: JACKKNIFE / BOOTSTRAP / PERMUTATION
+# Used by: SDSS jackknife stability audits and the Micius significance tests.
+# Logic: Every resample is an index array drawn from its own RNG stream
+# (SeedSequence.spawn, one child per iteration), so results depend only on the
+# seed, never on the number of workers or how iterations are batched. The data
+# arrays are shipped once to each worker process; batches of iterations return
+# the statistic values plus the wall time of every iteration.
+# ==============================================================================
+
+SCHEMES = ('jackknife', 'bootstrap', 'permutation')
+
+def delete_d_for_fraction(n, keep_fraction):
+    """Number of rows removed per jackknife cut so that round(keep_fraction * n) remain (as df.sample(frac=...))."""
+    return n - int(round(keep_fraction * n))
+
+def draw_indices(scheme, n, rng, d=1):
+    """
+    One resample of n rows as an index array.
+    jackknife:   delete-d (n - d distinct rows, random order)
+    bootstrap:   n rows drawn with replacement
+    permutation: a random permutation of 0..n-1
+    """
+    if scheme == 'jackknife':
+        return rng.choice(n, n - d, replace=False)
+    if scheme == 'bootstrap':
+        return rng.integers(0, n, n)
+    if scheme == 'permutation':
+        return rng.permutation(n)
+    raise ValueError(f"Unknown resampling scheme: {scheme} (use {', '.join(SCHEMES)})")
+
+# Data and statistic of the current worker process (set once by _init_worker)
+_worker_state = {}
+
+def _init_worker(statistic, data):
+    _worker_state['statistic'] = statistic
+    _worker_state['data'] = data
+
+def _run_batch(scheme, n, d, seeds, statistic=None, data=None):
+    """Evaluates one batch of iterations; returns (values, per-iteration seconds)."""
+    statistic = statistic or _worker_state['statistic']
+    data = data if data is not None else _worker_state['data']
+    values, timings = [], []
+    for seed in seeds:
+        start = time.perf_counter()
+        idx = draw_indices(scheme, n, np.random.default_rng(seed), d)
+        values.append(statistic(data, idx))
+        timings.append(time.perf_counter() - start)
+    return values, timings
+
+class ResamplingResult:
+    """Statistic values of every resample (iteration order) with timing diagnostics."""
+
+    def __init__(self, scheme, values, timings, wall_time, workers, seed):
+        self.scheme = scheme
+        self.values = np.asarray(values)
+        self.timings = np.asarray(timings)
+        self.wall_time = wall_time
+        self.workers = workers
+        self.seed = seed
+
+    def mean(self, axis=0):
+        return np.mean(self.values, axis=axis)
+
+    def std(self, axis=0):
+        return np.std(self.values, axis=axis)
+
+    def timing_summary(self):
+        """One-line timing report for the audit output."""
+        t = self.timings * 1e3
+        return (f"{len(t)} {self.scheme} resamples in {self.wall_time:.2f} s on {self.workers} worker(s) | "
+                f"per iteration: mean {t.mean():.2f} ms, median {np.median(t):.2f} ms, max {t.max():.2f} ms")
+
+def run_resampling(statistic, data, n_iterations, scheme='jackknife', d=1, seed=None,
+                   workers=None, batch_size=None, n=None, verbose=False):
+    """
+    Runs n_iterations resamples of `data` and evaluates statistic(data, idx) on each.
+    statistic: module-level (picklable) function of (data, index array) -> scalar/array.
+    data:      anything picklable (typically a dict of NumPy arrays); n defaults to the
+               length of its first array.
+    d:         rows deleted per jackknife cut (see delete_d_for_fraction).
+    seed:      root seed; each iteration gets its own spawned stream (reproducible).
+               With seed=None the drawn entropy is kept in result.seed for replay.
+    workers:   processes (default: CPU count); 1 runs inline without a pool.
+    Returns a ResamplingResult.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown resampling scheme: {scheme} (use {', '.join(SCHEMES)})")
+    if n is None:
+        first = next(iter(data.values())) if isinstance(data, dict) else data[0]
+        n = len(first)
+    workers = max(1, min(workers or os.cpu_count() or 1, n_iterations))
+    root = np.random.SeedSequence(seed)
+    seeds = root.spawn(n_iterations)
+    batch_size = batch_size or max(1, -(-n_iterations // (workers * 4)))
+    batches = [seeds[i:i + batch_size] for i in range(0, n_iterations, batch_size)]
+
+    values, timings, done = [], [], 0
+    start = time.perf_counter()
+
+    def collect(batch_values, batch_timings):
+        nonlocal done
+        values.extend(batch_values)
+        timings.extend(batch_timings)
+        done += len(batch_values)
+        if verbose:
+            print(f"   {done}/{n_iterations} resamples complete.")
+
+    if workers == 1:
+        for batch in batches:
+            collect(*_run_batch(scheme, n, d, batch, statistic, data))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(statistic, data)) as pool:
+            # map preserves the iteration order regardless of completion order
+            for batch_values, batch_timings in pool.map(_run_batch, itertools.repeat(scheme), itertools.repeat(n), itertools.repeat(d), batches):
+                collect(batch_values, batch_timings)
+
+    return ResamplingResult(scheme, values, timings, time.perf_counter() - start, workers, root.entropy)
+
+# ------------------------------------------------------------------------------
+# PERMUTATION NULL FOR A PEARSON CORRELATION (EXACT OR BATCHED MONTE CARLO)
+# With centered vectors x_c, y_c the correlation of a permutation is
+#     r = (y_c[perm] @ x_c) / (|x_c| |y_c|),
+# so a whole block of permutations is one fancy-index plus one matrix product.
+# Small samples enumerate all n! permutations (prefix x precomputed tail table);
+# larger ones draw a batch permutation matrix per round trip.
+# ------------------------------------------------------------------------------
+
+EXACT_PERMUTATION_MAX_N = 10
+PERMUTATION_TAIL = 8          # Permutations of the last 8 positions are tabulated (40320 rows)
+PERMUTATION_BATCH = 100000    # Monte Carlo permutations per matrix product
+_TIE_TOLERANCE = 1e-12
+
+def iter_all_permutations(n, tail=PERMUTATION_TAIL):
+    """
+    Yields every permutation of 0..n-1 exactly once, as (chunk, n) index arrays.
+    Each ordered prefix of the first n - tail positions is combined with a table
+    of all permutations of the remaining elements.
+    """
+    tail = min(tail, n)
+    table = np.array(list(itertools.permutations(range(tail))), dtype=np.intp).reshape(-1, tail)
+    for prefix in itertools.permutations(range(n), n - tail):
+        rest = np.setdiff1d(np.arange(n), prefix)
+        chunk = np.empty((len(table), n), dtype=np.intp)
+        chunk[:, :n - tail] = prefix
+        chunk[:, n - tail:] = rest[table]
+        yield chunk
+
+class PermutationNull:
+    """Summary of a permutation null distribution for an observed correlation."""
+
+    def __init__(self, observed, total, sum_r, sum_r2, n_extreme, exact, wall_time):
+        self.observed = observed
+        self.n_permutations = total
+        self.exact = exact
+        self.mean = sum_r / total
+        self.std = np.sqrt(max(sum_r2 / total - self.mean**2, 0.0))
+        # Two-sided p-value; the Monte Carlo estimate counts the observed ordering
+        self.p_value = n_extreme / total if exact else (n_extreme + 1) / (total + 1)
+        self.wall_time = wall_time
+
+    def sigma(self):
+        """Distance of the observed correlation from the null mean, in null standard deviations."""
+        return (self.observed - self.mean) / self.std
+
+    def summary(self):
+        mode = "exact enumeration" if self.exact else "Monte Carlo"
+        return f"{self.n_permutations} permutations ({mode}) in {self.wall_time:.2f} s | p = {self.p_value:.3e}"
+
+def permutation_null_correlation(x, y, n_monte_carlo=10000, seed=None,
+                                 exact_max_n=EXACT_PERMUTATION_MAX_N, batch_size=PERMUTATION_BATCH):
+    """
+    Permutation null of the Pearson correlation between x and y (y is permuted).
+    n <= exact_max_n: all n! permutations are enumerated (exact mean, std and p-value).
+    Otherwise n_monte_carlo random permutations are drawn in batches of batch_size.
+    Returns a PermutationNull.
+    """
+    x_c = np.asarray(x, dtype=float) - np.mean(x)
+    y_c = np.asarray(y, dtype=float) - np.mean(y)
+    n = len(x_c)
+    scale = np.sqrt((x_c @ x_c) * (y_c @ y_c))
+    observed = (y_c @ x_c) / scale
+    threshold = abs(observed) * (1 - _TIE_TOLERANCE)
+
+    start = time.perf_counter()
+    exact = n <= exact_max_n
+    if exact:
+        chunks = iter_all_permutations(n)
+    else:
+        rng = np.random.default_rng(seed)
+        sizes = [min(batch_size, n_monte_carlo - i) for i in range(0, n_monte_carlo, batch_size)]
+        chunks = (rng.permuted(np.broadcast_to(np.arange(n), (size, n)), axis=1) for size in sizes)
+
+    total, sum_r, sum_r2, n_extreme = 0, 0.0, 0.0, 0
+    for perms in chunks:
+        r = (y_c[perms] @ x_c) / scale
+        total += len(r)
+        sum_r += r.sum()
+        sum_r2 += (r * r).sum()
+        n_extreme += int(np.count_nonzero(np.abs(r) >= threshold))
+    return PermutationNull(observed, total, sum_r, sum_r2, n_extreme, exact, time.perf_counter() - start)
@@ -0,0 +1,275 @@
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from trr_core import catalogs, dataset_cache, instrumentation, sp3, sparc
+
+# ==============================================================================
+# RRT AUDIT RUNNER: ONE PASS OVER EVERY AUDIT, SHARED DATA LOADS
+# Used by: full audit passes (python -m trr_core.runner <data_dir>).
+# Logic: The audits and the datasets they read form a dependency graph. Each
+# dataset node is loaded once (SDSS: the union of the columns read by the five
+# SDSS scripts is decoded into the shared dataset cache; SP3: parsed records
+# cached the same way; SPARC: the columnar .trrcol cache is built before its
+# two readers start, so they never race to build it). An audit node becomes
+# ready as soon as its own datasets are; ready nodes run in parallel worker
+# processes (one fresh process per node, cwd = data directory, matplotlib on
+# Agg), with stdout/stderr captured per audit. The verdict lines of every log
+# are collected into one summary, so a full pass costs about one SDSS read
+# plus the slowest audit instead of the sum of all of them.
+#
+# A missing input never blocks the graph: the audit runs as it would alone and
+# reports the missing file itself. Logs: <data_dir>/trr_audit_logs/.
+# --instrument writes a per-stage run report of every audit (trr_core.instrumentation)
+# to <log dir>/reports/ and lists them in the summary.
+# ==============================================================================
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_DIR = 'Core Cosmological Audits'
+CRITICAL_DIR = 'Critical Falsification Tests'
+EXPERIMENTAL_DIR = 'Experimental & Robustness'
+
+SDSS_FILE = 'DR16Q_Superset_v3.fits'
+SP3_FILE = 'asi.orb.lageos2.251220.v80.sp3'
+SPARC_DIR = 'Rotmod_LTG'
+KIDS_FILE = 'KiDS_DR4_QSO_candidates.fits'
+LOG_DIR = 'trr_audit_logs'
+
+# Every SDSS column read by the jackknife, chronology, topological and SMBH audits
+SDSS_COLUMNS = ['RA', 'DEC', 'Z', 'Z_MGII', 'Z_VI', ('PSFMAG', 2), ('PSFMAG', 3)]
+
+VERDICT_PATTERN = re.compile(r'VERDICT|VEREDITO|STATUS:|RESULTADO:|CONCLUSION:')
+REPORT_PATTERN = re.compile(r'^-> Run report: (.+)$', re.MULTILINE)
+REPORT_SUBDIR = 'reports'
+
+def _load_sdss(path, cache_root):
+    data = catalogs.share_fits_columns(path, SDSS_COLUMNS, root=cache_root)
+    return f"{len(data['RA'])} rows x {len(SDSS_COLUMNS)} columns"
+
+def _load_sp3(path, cache_root):
+    return f"{len(sp3.share_sp3(path, root=cache_root))} position records"
+
+def _load_sparc(path, cache_root):
+    _, names, _ = sparc.load_catalog(path)
+    return f"{len(names)} galaxies"
+
+# name: (input path relative to the data directory, loader)
+DATASETS = {
+    'sdss': (SDSS_FILE, _load_sdss),
+    'sp3': (SP3_FILE, _load_sp3),
+    'sparc': (SPARC_DIR, _load_sparc),
+}
+
+# Each audit: script (folder, file), calls [(function, args)] in order, shared datasets it reads
+# ('verdict': False for products without a verdict line, e.g. the prediction map)
+AUDITS = [
+    {'name': 'core-1-lageos', 'script': (CORE_DIR, '1-trr_lageos_pnb_shielding_audit.py'),
+     'calls': [('run_lageos_shielding_audit', ())], 'datasets': ['sp3']},
+    {'name': 'core-2-micius', 'script': (CORE_DIR, '2-trr_micius_quantum_decoherence_audit.py'),
+     'calls': [('run_quantum_birefringence_audit', ())], 'datasets': []},
+    {'name': 'core-3-jackknife', 'script': (CORE_DIR, '3-trr_sdss_jackknife_stability_audit.py'),
+     'calls': [('run_jackknife_stability_test', (SDSS_FILE,))], 'datasets': ['sdss']},
+    {'name': 'core-4-sparc', 'script': (CORE_DIR, '4-trr_sparc_rotation_audit.py'),
+     'calls': [('run_strict_sparc_audit', ())], 'datasets': ['sparc']},
+    {'name': 'core-5-phase-drag', 'script': (CORE_DIR, '5-trr_phase_drag_and_magnitude_audit.py'),
+     'calls': [('run_phase_drag_audit', (KIDS_FILE,))], 'datasets': []},
+    {'name': 'critical-1-gw170817', 'script': (CRITICAL_DIR, '1-trr_gw170817_consistency_audit.py'),
+     'calls': [('run_gw170817_consistency_test', ())], 'datasets': []},
+    {'name': 'critical-2-chronology', 'script': (CRITICAL_DIR, '2-trr_lcdm_chronology_audit.py'),
+     'calls': [('run_chronology_stress_audit', ())], 'datasets': ['sdss', 'sparc']},
+    {'name': 'critical-3-gw-map', 'script': (CRITICAL_DIR, '3-trr_gw_anisotropy_prediction_map.py'),
+     'calls': [('generate_rrt_prediction_map', ())], 'datasets': [], 'verdict': False},
+    {'name': 'critical-4-topological', 'script': (CRITICAL_DIR, '4-trr_topological_anisotropy_audit.py'),
+     'calls': [('run_topological_alignment_audit', ())], 'datasets': ['sdss']},
+    {'name': 'critical-5-smbh-growth', 'script': (CRITICAL_DIR, '5-trr_blackhole_growth_causality_audit.py'),
+     'calls': [('run_causality_growth_audit', (SDSS_FILE,))], 'datasets': ['sdss']},
+    {'name': 'exp-1-lageos', 'script': (EXPERIMENTAL_DIR, '1-trr_lageos_pnb_blindness_test.py'),
+     'calls': [('auditoria_lageos_v3', ())], 'datasets': ['sp3']},
+    {'name': 'exp-2-micius', 'script': (EXPERIMENTAL_DIR, '2-trr_micius_hardware_filter_audit.py'),
+     'calls': [('gerar_dados_micius', ()), ('auditoria_quântica_final', ())], 'datasets': []},
+    {'name': 'exp-3-jackknife', 'script': (EXPERIMENTAL_DIR, '3-trr_jackknife_stability_analysis.py'),
+     'calls': [('executar_jackknife', (SDSS_FILE,))], 'datasets': ['sdss']},
+    {'name': 'exp-4-eft-regime', 'script': (EXPERIMENTAL_DIR, '4-trr_eft_regime_transition_audit.py'),
+     'calls': [('run_regime_calibration_audit', ())], 'datasets': []},
+]
+
+def _init_worker(cache_root, report_dir=None):
+    os.environ['MPLBACKEND'] = 'Agg'
+    if cache_root:
+        os.environ[dataset_cache.ENV_VAR] = cache_root
+    if report_dir:
+        os.environ[instrumentation.ENV_ENABLE] = report_dir
+
+def _load_dataset(name, data_dir, cache_root):
+    """Worker: loads one dataset node. Returns (status, seconds, detail)."""
+    start = time.perf_counter()
+    relative_path, loader = DATASETS[name]
+    path = os.path.join(data_dir, relative_path)
+    if not os.path.exists(path):
+        return 'absent', 0.0, f"{relative_path} not found"
+    try:
+        detail = loader(path, cache_root)
+    except Exception as exc:
+        # The readers then decode the file themselves, as they would alone
+        return 'failed', time.perf_counter() - start, f"{type(exc).__name__}: {exc}"
+    return 'loaded', time.perf_counter() - start, detail
+
+def extract_verdicts(log_text):
+    """Verdict / status lines of an audit log (a bare '[... VERDICT]' header takes its next line)."""
+    lines = [line.strip() for line in log_text.splitlines()]
+    verdicts = []
+    for i, line in enumerate(lines):
+        if VERDICT_PATTERN.search(line):
+            if line.startswith('[') and line.endswith(']') and i + 1 < len(lines) and lines[i + 1]:
+                line = f"{line} {lines[i + 1]}"
+            verdicts.append(line)
+    return verdicts
+
+def run_reports(log_path):
+    """Run report paths announced in an audit log (instrumented passes)."""
+    try:
+        with open(log_path, 'r', encoding='utf-8') as log:
+            return REPORT_PATTERN.findall(log.read())
+    except OSError:
+        return []
+
+def _run_audit(audit, data_dir, log_path):
+    """Worker: imports the audit script and runs its calls in the data directory. Returns (status, seconds, verdicts)."""
+    start = time.perf_counter()
+    status = 'ok'
+    os.chdir(data_dir)
+    with open(log_path, 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            folder, filename = audit['script']
+            spec = importlib.util.spec_from_file_location(
+                'trr_audit_' + audit['name'].replace('-', '_'), os.path.join(REPO_ROOT, folder, filename))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            for function, args in audit['calls']:
+                getattr(module, function)(*args)
+        except Exception:
+            traceback.print_exc()
+            status = 'failed'
+    with open(log_path, 'r', encoding='utf-8') as log:
+        verdicts = extract_verdicts(log.read())
+    if status == 'ok' and not verdicts and audit.get('verdict', True):
+        status = 'no verdict'
+    return status, time.perf_counter() - start, verdicts
+
+def run_all(data_dir='.', names=None, workers=None, cache_dir=None, log_dir=None, verbose=True, instrument=False):
+    """
+    Runs the selected audits (default: all) over one data directory.
+    cache_dir keeps the shared dataset cache between passes (default: a temporary
+    directory removed at the end). instrument=True writes per-stage run reports.
+    Returns the summary dict (also written as JSON).
+    """
+    data_dir = os.path.abspath(data_dir)
+    audits = [a for a in AUDITS if names is None or a['name'] in names]
+    datasets = sorted({d for a in audits for d in a['datasets']})
+    log_dir = os.path.abspath(log_dir or os.path.join(data_dir, LOG_DIR))
+    os.makedirs(log_dir, exist_ok=True)
+    cache_root = os.path.abspath(cache_dir) if cache_dir else tempfile.mkdtemp(prefix='trr_dataset_cache_')
+    workers = max(1, workers or os.cpu_count() or 1)
+    report_dir = os.path.join(log_dir, REPORT_SUBDIR) if instrument else None
+
+    summary = {'data_dir': data_dir, 'workers': workers, 'datasets': {}, 'audits': {}}
+    waiting = {a['name']: set(a['datasets']) for a in audits}
+    by_name = {a['name']: a for a in audits}
+    pass_start = time.perf_counter()
+    try:
+        # One fresh process per node: audit modules set globals and matplotlib state
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_root, report_dir),
+                                 max_tasks_per_child=1) as pool:
+            running = {}
+            for name in datasets:
+                running[pool.submit(_load_dataset, name, data_dir, cache_root)] = ('dataset', name)
+
+            def submit_ready():
+                for name in [n for n, deps in waiting.items() if not deps]:
+                    del waiting[name]
+                    log_path = os.path.join(log_dir, name + '.log')
+                    running[pool.submit(_run_audit, by_name[name], data_dir, log_path)] = ('audit', name)
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, name = running.pop(future)
+                    try:
+                        status, seconds, detail = future.result()
+                    except Exception as exc:
+                        status, seconds, detail = 'failed', 0.0, f"{type(exc).__name__}: {exc}"
+                    if kind == 'dataset':
+                        summary['datasets'][name] = {'status': status, 'seconds': seconds, 'detail': detail}
+                        for deps in waiting.values():
+                            deps.discard(name)
+                        if verbose:
+                            print(f"-> dataset {name}: {status} in {seconds:.1f} s ({detail})")
+                    else:
+                        verdicts = detail if isinstance(detail, list) else [detail]
+                        log_path = os.path.join(log_dir, name + '.log')
+                        summary['audits'][name] = {'status': status, 'seconds': seconds, 'verdicts': verdicts,
+                                                   'log': log_path}
+                        if instrument:
+                            summary['audits'][name]['reports'] = run_reports(log_path)
+                        if verbose:
+                            print(f"-> audit {name}: {status} in {seconds:.1f} s")
+                submit_ready()
+    finally:
+        if not cache_dir:
+            shutil.rmtree(cache_root, ignore_errors=True)
+
+    summary['wall_seconds'] = time.perf_counter() - pass_start
+    summary['audit_seconds_total'] = sum(a['seconds'] for a in summary['audits'].values())
+    with open(os.path.join(log_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+def print_summary(summary):
+    print("=" * 80)
+    print("RRT AUDIT PASS: SUMMARY OF VERDICTS")
+    print(f"Data: {summary['data_dir']} | Workers: {summary['workers']}")
+    print("=" * 80)
+    for name in [a['name'] for a in AUDITS if a['name'] in summary['audits']]:
+        audit = summary['audits'][name]
+        print(f"{name:<26} {audit['status']:<10} {audit['seconds']:>7.1f} s")
+        for verdict in audit['verdicts']:
+            print(f"    {verdict}")
+    print("-" * 80)
+    print(f"-> Wall clock: {summary['wall_seconds']:.1f} s "
+          f"(sum of audit times: {summary['audit_seconds_total']:.1f} s)")
+    print(f"-> Logs: {os.path.dirname(next(iter(summary['audits'].values()))['log']) if summary['audits'] else '-'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the RRT audits over one data directory with shared data loads")
+    parser.add_argument('data_dir', nargs='?', default='.',
+                        help=f"Directory holding {SDSS_FILE}, {SP3_FILE}, {SPARC_DIR}/, {KIDS_FILE}")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel worker processes (default: CPU count)")
+    parser.add_argument('--only', default=None, help="Comma-separated audit names (default: all)")
+    parser.add_argument('--cache-dir', default=None, help="Keep the shared dataset cache here between passes")
+    parser.add_argument('--instrument', action='store_true',
+                        help=f"Writes per-stage run reports of every audit to <log dir>/{REPORT_SUBDIR}/")
+    parser.add_argument('--list', action='store_true', help="Lists the audits and their shared datasets")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for audit in AUDITS:
+            print(f"{audit['name']:<26} {', '.join(audit['datasets']) or '-'}")
+        return
+    names = set(args.only.split(',')) if args.only else None
+    unknown = (names or set()) - {a['name'] for a in AUDITS}
+    if unknown:
+        parser.error(f"unknown audit(s): {', '.join(sorted(unknown))}")
+    print_summary(run_all(args.data_dir, names, args.workers, args.cache_dir, instrument=args.instrument))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import gzip
+import numpy as np
+
+from trr_core import dataset_cache
+
+# ==============================================================================
+# RRT SHARED SP3 EPHEMERIS READER (ASI / ILRS ORBIT PRODUCTS)
+# Used by: LAGEOS-2 shielding audit and the LAGEOS blindness test.
+# Logic: The file is scanned once as raw bytes. Line starts come from the
+# newline positions, epoch ('*') records are mapped to every position ('P')
+# record with searchsorted, and the fixed-width SP3 columns are sliced straight
+# into NumPy arrays (no per-line Python work):
+#     P record: col 1 'P' | 2-4 satellite ID | 5-18 x | 19-32 y | 33-46 z (km)
+#               | 47-60 clock (microseconds)
+#     * record: cols 4-7 year | 9-10 month | 12-13 day | 15-16 hour
+#               | 18-19 minute | 21-31 seconds
+# Positions are kept as written (SP3 flags missing positions as 0.000000 and
+# missing clocks as 999999.999999). Records already parsed into the shared
+# dataset cache (trr_core.dataset_cache) are memory-mapped instead.
+# ==============================================================================
+
+LAGEOS2_ID = 'L52'
+
+RECORD_DTYPE = np.dtype([('sat', 'U3'), ('epoch', 'datetime64[us]'),
+                         ('x', 'f8'), ('y', 'f8'), ('z', 'f8'), ('clock', 'f8')])
+
+def _read_bytes(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return f.read()
+
+def _field(buf, starts, first, last, dtype):
+    """Fixed-width field (1-based inclusive columns) of every line in starts, parsed as dtype."""
+    width = last - first + 1
+    cols = buf[starts[:, None] + np.arange(first - 1, last)]
+    raw = np.ascontiguousarray(cols).view(f'S{width}').ravel()
+    return raw.astype(dtype)
+
+def _parse_epochs(buf, starts):
+    """SP3 epoch records -> datetime64[us]."""
+    if len(starts) == 0:
+        return np.empty(0, dtype='datetime64[us]')
+    year = _field(buf, starts, 4, 7, np.int64)
+    month = _field(buf, starts, 9, 10, np.int64)
+    day = _field(buf, starts, 12, 13, np.int64)
+    hour = _field(buf, starts, 15, 16, np.int64)
+    minute = _field(buf, starts, 18, 19, np.int64)
+    second = _field(buf, starts, 21, 31, np.float64)
+    months = (year - 1970) * 12 + (month - 1)
+    dates = months.astype('datetime64[M]').astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+    micros = (hour * 3600 + minute * 60) * 1_000_000 + np.round(second * 1e6).astype(np.int64)
+    return dates.astype('datetime64[us]') + micros.astype('timedelta64[us]')
+
+def parse_sp3_bytes(data):
+    """
+    Parses SP3 content (bytes) into a structured array of RECORD_DTYPE,
+    one row per position record, sorted by satellite and then epoch.
+    """
+    # Pad so that every fixed-width slice stays inside the buffer
+    buf = np.frombuffer(data + b' ' * 64, dtype=np.uint8)
+    size = len(data)
+    newlines = np.flatnonzero(buf[:size] == ord('\n'))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [size]))
+    keep = starts < size
+    starts, ends = starts[keep], ends[keep]
+    first = buf[starts]
+
+    epoch_starts = starts[first == ord('*')]
+    is_pos = (first == ord('P')) & (ends - starts >= 46)
+    pos_starts, pos_ends = starts[is_pos], ends[is_pos]
+
+    records = np.empty(len(pos_starts), dtype=RECORD_DTYPE)
+    if len(pos_starts) == 0:
+        return records
+    # Mask the bytes past each line end (short lines, CR) before slicing fixed columns
+    cols = buf[pos_starts[:, None] + np.arange(60)]
+    cols = np.where(np.arange(60)[None, :] < (pos_ends - pos_starts)[:, None], cols, ord(' '))
+    cols[cols == ord('\r')] = ord(' ')
+    line_buf = np.ascontiguousarray(cols, dtype=np.uint8).ravel()
+    line_starts = np.arange(len(pos_starts)) * 60
+
+    records['sat'] = _field(line_buf, line_starts, 2, 4, 'U3')
+    records['x'] = _field(line_buf, line_starts, 5, 18, np.float64)
+    records['y'] = _field(line_buf, line_starts, 19, 32, np.float64)
+    records['z'] = _field(line_buf, line_starts, 33, 46, np.float64)
+    has_clock = (pos_ends - pos_starts) >= 60
+    records['clock'] = np.nan
+    if has_clock.any():
+        records['clock'][has_clock] = _field(line_buf, line_starts[has_clock], 47, 60, np.float64)
+
+    # Every P record belongs to the last epoch record above it
+    # (records before the first epoch header get NaT)
+    epochs = np.append(np.datetime64('NaT', 'us'), _parse_epochs(buf, epoch_starts))
+    records['epoch'] = epochs[np.searchsorted(epoch_starts, pos_starts, side='right')]
+    return records[np.lexsort((records['epoch'], records['sat']))]
+
+SHARED_KEY = 'sp3_records'
+
+def read_sp3(path):
+    """
+    Reads an SP3 file (plain or .gz) into a structured array (see parse_sp3_bytes).
+    Records already parsed into the shared dataset cache are reused.
+    """
+    shared = dataset_cache.load(path, SHARED_KEY)
+    if shared is not None:
+        return np.array(shared)
+    return parse_sp3_bytes(_read_bytes(path))
+
+def share_sp3(path, root=None):
+    """Parses an SP3 file once and stores its records in the shared dataset cache (see trr_core.runner)."""
+    records = read_sp3(path)
+    dataset_cache.save(path, SHARED_KEY, records, root=root)
+    return records
+
+def satellite_index(records):
+    """{satellite ID: slice} over records sorted by satellite (as returned by read_sp3)."""
+    sats, first = np.unique(records['sat'], return_index=True)
+    bounds = np.append(first, len(records))
+    return {sat: slice(bounds[i], bounds[i + 1]) for i, sat in enumerate(sats)}
+
+def select_satellite(records, sat_id=LAGEOS2_ID):
+    """Records of one satellite (exact ID match), in epoch order."""
+    return records[satellite_index(records).get(sat_id, slice(0, 0))]
+
+def positions(records):
+    """(n, 3) array of x, y, z in km."""
+    return np.column_stack((records['x'], records['y'], records['z']))
@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# RRT SPARC ROTMOD_LTG COLUMNAR CACHE
+# Used by: Core 4 (SPARC rotation audit) and Critical 2 (LCDM chronology).
+# Logic: Every *_rotmod.dat file is parsed once and packed into a single binary
+# file (all galaxies concatenated, one contiguous float64 block per column)
+# with a galaxy-name/offset index and the source mtimes. Later runs memory-map
+# the block; the cache is rebuilt automatically when any source file changes.
+#
+# Layout: MAGIC | header length (uint64 LE) | JSON header | padding | float64[8, N]
+# One-time conversion: python -m trr_core.sparc ./Rotmod_LTG
+# ==============================================================================
+
+COLUMNS = ['Rad', 'Vobs', 'errV', 'Vgas', 'Vdisk', 'Vbul', 'SBdis', 'SBbul']
+MAGIC = b'TRRSPARC1\n'
+CACHE_SUFFIX = '.trrcol'
+ALIGNMENT = 64
+
+def default_cache_path(data_folder):
+    """Cache file sitting next to the Rotmod folder (./Rotmod_LTG -> ./Rotmod_LTG.trrcol)."""
+    return os.path.normpath(data_folder) + CACHE_SUFFIX
+
+def _source_files(data_folder):
+    """Rotmod files and their (mtime_ns, size) signature, sorted by name."""
+    sources = {}
+    for name in sorted(os.listdir(data_folder)):
+        if name.endswith('.dat'):
+            st = os.stat(os.path.join(data_folder, name))
+            sources[name] = [st.st_mtime_ns, st.st_size]
+    return sources
+
+def parse_rotmod(path):
+    """Parses one SPARC Rotmod file into an (n_rows, 8) float64 array (non-numeric -> NaN)."""
+    df = pd.read_csv(path, sep=r'\s+', comment='#', header=None, names=COLUMNS)
+    return df.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+def build_cache(data_folder, cache_path=None):
+    """
+    Parses the whole Rotmod folder and writes the columnar cache.
+    Unreadable files are skipped (as in the original per-file audits).
+    Returns the cache path.
+    """
+    cache_path = cache_path or default_cache_path(data_folder)
+    sources = _source_files(data_folder)
+    blocks, galaxies, start = [], [], 0
+    for name in sources:
+        try:
+            block = parse_rotmod(os.path.join(data_folder, name))
+        except Exception:
+            continue
+        blocks.append(block)
+        galaxies.append({'name': name, 'start': start, 'stop': start + len(block)})
+        start += len(block)
+
+    data = np.concatenate(blocks).T if blocks else np.empty((len(COLUMNS), 0))
+    header = {'columns': COLUMNS, 'n_rows': start, 'galaxies': galaxies, 'sources': sources}
+    raw = json.dumps(header).encode('utf-8')
+    prefix = len(MAGIC) + 8 + len(raw)
+
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.array(len(raw), dtype='<u8').tobytes())
+        f.write(raw)
+        f.write(b'\0' * (_data_offset(len(raw)) - prefix))
+        f.write(np.ascontiguousarray(data, dtype='<f8').tobytes())
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+def _data_offset(header_length):
+    """Start of the float64 block: first ALIGNMENT boundary after the header."""
+    prefix = len(MAGIC) + 8 + header_length
+    return -(-prefix // ALIGNMENT) * ALIGNMENT
+
+def read_header(cache_path):
+    """Reads the JSON header of a cache file (None if the file is not a SPARC cache)."""
+    with open(cache_path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        length = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+        header = json.loads(f.read(length).decode('utf-8'))
+    header['data_offset'] = _data_offset(length)
+    return header
+
+def is_stale(data_folder, header):
+    """True when the cached source signature no longer matches the folder."""
+    return header is None or header.get('columns') != COLUMNS or header.get('sources') != _source_files(data_folder)
+
+def load_catalog(data_folder, cache_path=None, rebuild=True):
+    """
+    Memory-maps the SPARC cache, (re)building it first if missing or stale.
+    Returns (columns, names, offsets): columns maps each of COLUMNS to a
+    read-only 1-D view; galaxy i spans rows offsets[i]:offsets[i+1].
+    """
+    cache_path = cache_path or default_cache_path(data_folder)
+    header = read_header(cache_path) if os.path.exists(cache_path) else None
+    if rebuild and is_stale(data_folder, header):
+        build_cache(data_folder, cache_path)
+        header = read_header(cache_path)
+    if header is None:
+        raise FileNotFoundError(f"SPARC cache not found: {cache_path}")
+
+    n_rows = header['n_rows']
+    if n_rows:
+        block = np.memmap(cache_path, dtype='<f8', mode='r', offset=header['data_offset'], shape=(len(COLUMNS), n_rows))
+    else:
+        block = np.empty((len(COLUMNS), 0))
+    columns = {name: block[i] for i, name in enumerate(header['columns'])}
+    names = [g['name'] for g in header['galaxies']]
+    offsets = np.array([0] + [g['stop'] for g in header['galaxies']], dtype=np.int64)
+    return columns, names, offsets
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    data_folder = argv[0] if argv else './Rotmod_LTG'
+    cache_path = argv[1] if len(argv) > 1 else None
+    path = build_cache(data_folder, cache_path)
+    header = read_header(path)
+    print(f"-> {len(header['galaxies'])} galaxies / {header['n_rows']} rows packed into {path}")
+
+if __name__ == "__main__":
+    main()